@@ -12,14 +12,14 @@ CRM销售平台 - 主应用文件
 
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from flask import Flask, request, jsonify, g, make_response
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity, get_jwt
-import pymysql
 from werkzeug.exceptions import HTTPException
 import logging
-from logging.handlers import RotatingFileHandler
+import click
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -27,17 +27,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # 导入配置和工具
 from config import Config
 
-from utils.auth import AuthManager
 from utils.helpers import ResponseHelper
-from utils.logger import setup_logger
 
-# 导入路由蓝图
-from routes.auth import auth_bp
-from routes.customers import customers_bp
-from routes.quotes import quotes_bp
-from routes.contracts import contracts_bp
-from routes.orders import orders_bp
-from routes.dashboard import dashboard_bp
+# 路由蓝图、数据库驱动等在create_app()中按需导入，缩短工作进程冷启动时间
 
 # 创建Flask应用
 def create_app(config_class=Config):
@@ -57,9 +49,9 @@ def create_app(config_class=Config):
     CORS(app, 
          origins=['http://localhost:3000', 'http://127.0.0.1:3000', 'http://localhost:8080', 'http://127.0.0.1:8080', 'http://localhost:8000'],
          supports_credentials=True,
-         allow_headers=['Content-Type', 'Authorization', 'Access-Control-Allow-Credentials'],
+         allow_headers=['Content-Type', 'Authorization', 'Access-Control-Allow-Credentials', 'If-None-Match', 'If-Modified-Since', 'X-Read-Primary-Until'],
          methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'OPTIONS'],
-         expose_headers=['Content-Type', 'Authorization'],
+         expose_headers=['Content-Type', 'Authorization', 'ETag', 'Last-Modified', 'X-Read-Primary-Until'],
          send_wildcard=False,
          vary_header=True)
     
@@ -79,12 +71,53 @@ def create_app(config_class=Config):
     # 注册请求钩子
     register_request_hooks(app)
     
+    # 注册请求指标采集
+    from utils.metrics import init_metrics
+    init_metrics(app)
+    
+    # 注册按路由类别的并发限制和限流（在指标采集之后注册，被拒绝的请求同样计入指标）
+    from utils.shedding import init_load_shedding
+    init_load_shedding(app)
+    
+    # 注册只读副本路由（配置SQLALCHEMY_BINDS['replica']时生效）
+    from utils.replica import init_replica_routing
+    init_replica_routing(app)
+    
+    # 并发查询线程池（FANOUT_ENABLED开启时生效，首次使用时创建）
+    from utils.fanout import init_fanout
+    init_fanout(app)
+    
+    # 客户概览缓存（CUSTOMER_OVERVIEW_CACHE_SIZE为0时不缓存）
+    from utils.overview import init_customer_overview_cache
+    init_customer_overview_cache(app)
+    
+    # 注册SQL分析器（SQL_PROFILER_ENABLED开启时生效）
+    from utils.profiler import init_profiler
+    init_profiler(app)
+    
+    # 注册后台定时任务（由服务入口在工作进程中启动）
+    from utils.scheduler import init_follow_up_scheduler, init_quote_expiry_sweeper, init_document_archiver
+    init_follow_up_scheduler(app)
+    init_quote_expiry_sweeper(app)
+    init_document_archiver(app)
+    
+    # 注册健康检查路由和后台探测任务
+    from utils.health import init_health
+    init_health(app)
+    
+    # 注册前端打包产物路由（配置FRONTEND_DIST_DIR时生效）
+    from utils.frontend import init_frontend
+    init_frontend(app)
+    
     # 注册错误处理器
     register_error_handlers(app)
     
     # 注册蓝图
     register_blueprints(app)
     
+    # 注册核心路由
+    register_core_routes(app)
+    
     # 添加全局OPTIONS处理
     @app.before_request
     def handle_preflight():
@@ -108,6 +141,8 @@ def setup_logging(app):
         app: Flask应用实例
     """
     if not app.debug and not app.testing:
+        from logging.handlers import RotatingFileHandler
+        
         # 创建日志目录
         log_dir = os.path.join(os.path.dirname(app.instance_path), 'logs')
         if not os.path.exists(log_dir):
@@ -128,8 +163,6 @@ def setup_logging(app):
         app.logger.setLevel(logging.INFO)
         app.logger.info('CRM应用启动')
 
-
-
 def register_jwt_callbacks(jwt):
     """
     注册JWT回调函数
@@ -191,19 +224,18 @@ def register_request_hooks(app):
         app: Flask应用实例
     """
     
+    # 记录访问日志
+    if app.config.get('LOG_REQUESTS', False):
+        from utils.logger import RequestLogger
+        RequestLogger(app)
+    
     @app.before_request
     def before_request():
         """
         请求前处理
         """
-        # 记录请求信息
-        if app.config.get('LOG_REQUESTS', False):
-            app.logger.info(f'{request.method} {request.url} - {request.remote_addr}')
-        
-
-        
         # 设置请求开始时间
-        g.start_time = datetime.now()
+        g.start_ns = time.perf_counter_ns()
     
     @app.after_request
     def after_request(response):
@@ -211,10 +243,10 @@ def register_request_hooks(app):
         请求后处理
         """
         
-        # 记录响应时间
-        if hasattr(g, 'start_time'):
-            duration = datetime.now() - g.start_time
-            response.headers['X-Response-Time'] = str(duration.total_seconds())
+        # 记录响应时间（秒）
+        if 'start_ns' in g:
+            duration_ns = time.perf_counter_ns() - g.start_ns
+            response.headers['X-Response-Time'] = f'{duration_ns / 1e9:.6f}'
         
         # 添加安全头
         response.headers['X-Content-Type-Options'] = 'nosniff'
@@ -222,8 +254,6 @@ def register_request_hooks(app):
         response.headers['X-XSS-Protection'] = '1; mode=block'
         
         return response
-    
-
 
 def register_error_handlers(app):
     """
@@ -294,6 +324,13 @@ def register_blueprints(app):
     Args:
         app: Flask应用实例
     """
+    from routes.auth import auth_bp
+    from routes.customers import customers_bp
+    from routes.quotes import quotes_bp
+    from routes.contracts import contracts_bp
+    from routes.orders import orders_bp
+    from routes.dashboard import dashboard_bp
+    
     # API版本前缀
     api_prefix = '/api/v1'
     
@@ -323,6 +360,8 @@ def register_cli_commands(app):
         初始化数据库
         """
         try:
+            from utils.database import DatabaseManager
+            
             db_manager = DatabaseManager(app.config)
             
             # 读取并执行初始化SQL脚本
@@ -365,6 +404,7 @@ def register_cli_commands(app):
         """
         try:
             from models.user import User
+            from utils.database import DatabaseManager
             
             username = input('请输入管理员用户名: ')
             email = input('请输入管理员邮箱: ')
@@ -393,108 +433,161 @@ def register_cli_commands(app):
             
         except Exception as e:
             print(f'创建管理员用户失败: {str(e)}')
+    
+    @app.cli.command('import-profile')
+    @click.option('--top', default=20, help='列出的模块数量')
+    def import_profile(top):
+        """
+        分析应用导入耗时（python -X importtime）
+        """
+        from benchmarks.startup import profile_imports, format_import_profile
+        
+        print(format_import_profile(profile_imports(top=top)))
 
-# 创建应用实例
-app = create_app()
+    @app.cli.command('expire-quotes')
+    @click.option('--chunk-size', default=500, help='每批更新的报价数')
+    def expire_quotes(chunk_size):
+        """
+        将已过有效期的草稿/已发送报价置为过期
+        """
+        from models import Quote
+        
+        print(f'已置为过期: {Quote.expire_overdue(chunk_size=chunk_size)} 条报价')
 
-# 添加根路由
-@app.route('/')
-def index():
-    """
-    根路由 - 返回API信息
-    """
-    return ResponseHelper.success({
-        'name': 'CRM销售平台API',
-        'version': '1.0.0',
-        'description': '一个功能完整的CRM销售管理系统',
-        'endpoints': {
-            'auth': '/api/v1/auth',
-            'customers': '/api/v1/customers',
-            'quotes': '/api/v1/quotes',
-            'contracts': '/api/v1/contracts',
-            'orders': '/api/v1/orders'
-        },
-        'timestamp': datetime.now().isoformat()
-    })
+    @app.cli.command('backfill-customer-tags')
+    @click.option('--chunk-size', default=1000, help='每批处理的客户数')
+    @click.option('--start-after', default=0, help='从该客户ID之后继续（中断后恢复）')
+    def backfill_customer_tags(chunk_size, start_after):
+        """
+        从customers.tags回填标签表和客户标签关联表
+        """
+        from models import db
+        from migrations.customer_tags import backfill_customer_tags as backfill
 
-# 健康检查路由
-@app.route('/health')
-def health_check():
-    """
-    健康检查路由
-    """
-    try:
-        # 检查数据库连接
-        db_manager = DatabaseManager(app.config)
-        connection = db_manager.get_connection()
-        if connection:
-            connection.close()
-            db_status = 'healthy'
-        else:
-            db_status = 'unhealthy'
-    except Exception:
-        db_status = 'unhealthy'
-    
-    status = 'healthy' if db_status == 'healthy' else 'unhealthy'
-    
-    return ResponseHelper.success({
-        'status': status,
-        'database': db_status,
-        'timestamp': datetime.now().isoformat()
-    })
+        db.create_all()
+        result = backfill(db.engine, chunk_size=chunk_size, start_after=start_after)
+        print(f"回填完成: 客户 {result['customers']} 个，关联 {result['links']} 条，最后ID {result['last_id']}")
+
+    @app.cli.command('archive-documents')
+    @click.option('--days', default=None, type=int, help='保留在原表中的天数（默认ARCHIVE_AFTER_DAYS）')
+    @click.option('--chunk-size', default=500, help='每批移动的单据数')
+    @click.option('--kind', type=click.Choice(['all', 'quotes', 'orders']), default='all', help='归档的单据类型')
+    def archive_documents(days, chunk_size, kind):
+        """
+        将已结束的历史报价、订单移入归档表（可随时中断，重新执行时继续）
+        """
+        from models import db
+        from models.archive import DOCUMENT_ARCHIVES
+        from utils.scheduler import archive_cutoff
+
+        db.create_all()
+        before = archive_cutoff(days if days is not None else app.config.get('ARCHIVE_AFTER_DAYS', 730))
+        for name, archive in DOCUMENT_ARCHIVES.items():
+            if kind in ('all', name):
+                moved = archive.run(db.engine, before, chunk_size=chunk_size)
+                print(f"{name}: 归档 {moved['documents']} 条（明细 {moved['items']} 条），{before} 之前")
 
-# API信息路由
-@app.route('/api/v1')
-def api_info():
+def register_core_routes(app):
     """
-    API信息路由
+    注册根路由、健康检查和API信息路由
+    
+    Args:
+        app: Flask应用实例
     """
-    return ResponseHelper.success({
-        'version': '1.0.0',
-        'description': 'CRM销售平台API v1.0',
-        'endpoints': {
-            'auth': {
-                'login': 'POST /api/v1/auth/login',
-                'register': 'POST /api/v1/auth/register',
-                'logout': 'POST /api/v1/auth/logout',
-                'refresh': 'POST /api/v1/auth/refresh',
-                'profile': 'GET/PUT /api/v1/auth/profile'
-            },
-            'customers': {
-                'list': 'GET /api/v1/customers',
-                'create': 'POST /api/v1/customers',
-                'detail': 'GET /api/v1/customers/{id}',
-                'update': 'PUT /api/v1/customers/{id}',
-                'delete': 'DELETE /api/v1/customers/{id}'
-            },
-            'quotes': {
-                'list': 'GET /api/v1/quotes',
-                'create': 'POST /api/v1/quotes',
-                'detail': 'GET /api/v1/quotes/{id}',
-                'update': 'PUT /api/v1/quotes/{id}',
-                'delete': 'DELETE /api/v1/quotes/{id}'
-            },
-            'contracts': {
-                'list': 'GET /api/v1/contracts',
-                'create': 'POST /api/v1/contracts',
-                'detail': 'GET /api/v1/contracts/{id}',
-                'update': 'PUT /api/v1/contracts/{id}',
-                'delete': 'DELETE /api/v1/contracts/{id}'
+    
+    # 添加根路由
+    @app.route('/')
+    def index():
+        """
+        根路由 - 返回API信息
+        """
+        return ResponseHelper.success({
+            'name': 'CRM销售平台API',
+            'version': '1.0.0',
+            'description': '一个功能完整的CRM销售管理系统',
+            'endpoints': {
+                'auth': '/api/v1/auth',
+                'customers': '/api/v1/customers',
+                'quotes': '/api/v1/quotes',
+                'contracts': '/api/v1/contracts',
+                'orders': '/api/v1/orders'
             },
-            'orders': {
-                'list': 'GET /api/v1/orders',
-                'create': 'POST /api/v1/orders',
-                'detail': 'GET /api/v1/orders/{id}',
-                'update': 'PUT /api/v1/orders/{id}',
-                'delete': 'DELETE /api/v1/orders/{id}'
+            'timestamp': datetime.now().isoformat()
+        })
+
+    # API信息路由
+    @app.route('/api/v1')
+    def api_info():
+        """
+        API信息路由
+        """
+        return ResponseHelper.success({
+            'version': '1.0.0',
+            'description': 'CRM销售平台API v1.0',
+            'endpoints': {
+                'auth': {
+                    'login': 'POST /api/v1/auth/login',
+                    'register': 'POST /api/v1/auth/register',
+                    'logout': 'POST /api/v1/auth/logout',
+                    'refresh': 'POST /api/v1/auth/refresh',
+                    'profile': 'GET/PUT /api/v1/auth/profile'
+                },
+                'customers': {
+                    'list': 'GET /api/v1/customers',
+                    'create': 'POST /api/v1/customers',
+                    'detail': 'GET /api/v1/customers/{id}',
+                    'update': 'PUT /api/v1/customers/{id}',
+                    'delete': 'DELETE /api/v1/customers/{id}'
+                },
+                'quotes': {
+                    'list': 'GET /api/v1/quotes',
+                    'create': 'POST /api/v1/quotes',
+                    'detail': 'GET /api/v1/quotes/{id}',
+                    'update': 'PUT /api/v1/quotes/{id}',
+                    'delete': 'DELETE /api/v1/quotes/{id}'
+                },
+                'contracts': {
+                    'list': 'GET /api/v1/contracts',
+                    'create': 'POST /api/v1/contracts',
+                    'detail': 'GET /api/v1/contracts/{id}',
+                    'update': 'PUT /api/v1/contracts/{id}',
+                    'delete': 'DELETE /api/v1/contracts/{id}'
+                },
+                'orders': {
+                    'list': 'GET /api/v1/orders',
+                    'create': 'POST /api/v1/orders',
+                    'detail': 'GET /api/v1/orders/{id}',
+                    'update': 'PUT /api/v1/orders/{id}',
+                    'delete': 'DELETE /api/v1/orders/{id}'
+                }
             }
-        }
-    })
+        })
+
+def __getattr__(name):
+    """
+    按需创建模块级应用实例（兼容 `app:app` 和 FLASK_APP=app.py）
+    
+    导入本模块不再立即创建应用，避免gunicorn等通过create_app()加载时重复初始化。
+    """
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 if __name__ == '__main__':
+    app = create_app()
+    debug = app.config.get('DEBUG', True)
+    
+    # 调试模式开启自动重载：父进程只监视文件并重启子进程，定时任务（及其独占锁）
+    # 只在实际处理请求的子进程（WERKZEUG_RUN_MAIN=true）中启动
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from utils.scheduler import start_background_tasks
+        start_background_tasks(app)
+    
     # 开发环境运行
     app.run(
         host=app.config.get('HOST', '0.0.0.0'),
         port=app.config.get('PORT', 5000),
-        debug=app.config.get('DEBUG', True)
+        debug=debug
     )
\ No newline at end of file
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 性能基准测试
+
+在backend目录下运行：
+    python -m benchmarks.startup                                  # 应用启动耗时
+    python -m benchmarks generate --uri <URI> --scale 100000      # 生成确定性测试数据
+    python -m benchmarks run --uri <URI> --output result.json     # 执行请求场景
+    python -m benchmarks compare base.json result.json            # 对比两次结果
+    python -m benchmarks consistency --uri <URI>                  # 混合属性Python/SQL一致性
+    python -m benchmarks replica --uri <SQLite URI>               # 读写分离路由（两份SQLite替身）
+"""
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 基准测试命令行
+
+在backend目录下运行：
+    python -m benchmarks generate --uri sqlite:////tmp/crm_bench.db --scale 10000 --reset
+    python -m benchmarks run --uri sqlite:////tmp/crm_bench.db --output result.json
+    python -m benchmarks compare base.json result.json --threshold 10
+    python -m benchmarks consistency --uri sqlite:////tmp/crm_bench.db
+    python -m benchmarks replica --uri sqlite:////tmp/crm_bench.db
+    python -m benchmarks explain --uri sqlite:////tmp/crm_bench.db
+    python -m benchmarks pricing --quotes 200 --scenarios 50
+"""
+
+import sys
+import json
+import logging
+import argparse
+
+from . import consistency, datagen, explain, pricing, replica, scenarios
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='CRM性能基准测试')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    gen = subparsers.add_parser('generate', help='生成基准测试数据')
+    gen.add_argument('--uri', required=True, help='目标数据库SQLAlchemy URI')
+    gen.add_argument('--scale', type=int, default=10000, help='总行数（10k ~ 10M）')
+    gen.add_argument('--seed', type=int, default=42, help='随机种子')
+    gen.add_argument('--chunk-size', type=int, default=5000, help='每批插入行数')
+    gen.add_argument('--reset', action='store_true', help='先删除并重建表')
+
+    run = subparsers.add_parser('run', help='执行基准测试场景')
+    run.add_argument('--uri', required=True, help='数据库SQLAlchemy URI')
+    run.add_argument('--scenarios', default='all', help=f"逗号分隔的场景名，可选: {','.join(scenarios.SCENARIOS)}")
+    run.add_argument('--iterations', type=int, default=200, help='每个场景的计时迭代次数')
+    run.add_argument('--warmup', type=int, default=20, help='每个场景的预热次数')
+    run.add_argument('--seed', type=int, default=42, help='随机种子')
+    run.add_argument('--output', help='结果JSON输出文件')
+
+    cmp = subparsers.add_parser('compare', help='对比两次结果')
+    cmp.add_argument('base', help='基线结果JSON')
+    cmp.add_argument('head', help='新结果JSON')
+    cmp.add_argument('--threshold', type=float, default=10.0, help='允许的退化百分比')
+
+    check = subparsers.add_parser('consistency', help='比较混合属性的Python与SQL计算结果')
+    check.add_argument('--uri', required=True, help='数据库SQLAlchemy URI')
+    check.add_argument('--limit', type=int, default=0, help='每个模型最多检查的行数，0表示全部')
+
+    rw = subparsers.add_parser('replica', help='用两份SQLite数据库检查读写分离路由')
+    rw.add_argument('--uri', required=True, help='已生成数据的SQLite数据库URI（不会被修改）')
+
+    plan = subparsers.add_parser('explain', help='检查热点查询的执行计划（全表扫描、排序）')
+    plan.add_argument('--uri', required=True, help='已生成数据的数据库SQLAlchemy URI')
+    plan.add_argument('--verbose', action='store_true', help='输出所有语句的执行计划')
+
+    price = subparsers.add_parser('pricing', help='比较向量化报价计价与Decimal逐条计算的结果')
+    price.add_argument('--quotes', type=int, default=200, help='报价数')
+    price.add_argument('--scenarios', type=int, default=50, help='折扣/税率方案数')
+    price.add_argument('--max-items', type=int, default=30, help='每张报价的最多明细数')
+    price.add_argument('--seed', type=int, default=42, help='随机种子')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    if args.command == 'generate':
+        inserted = datagen.generate(args.uri, args.scale, args.seed, args.chunk_size, args.reset)
+        print(f'生成完成: {inserted}')
+        return 0
+
+    if args.command == 'run':
+        names = list(scenarios.SCENARIOS) if args.scenarios == 'all' else args.scenarios.split(',')
+        unknown = [name for name in names if name not in scenarios.SCENARIOS]
+        if unknown:
+            parser.error(f"未知场景: {','.join(unknown)}")
+        logging.getLogger().setLevel(logging.WARNING)
+        result = scenarios.run(args.uri, names, args.iterations, args.warmup, args.seed)
+        scenarios.write_result(result, args.output)
+        return 0
+
+    if args.command == 'consistency':
+        logging.getLogger().setLevel(logging.WARNING)
+        report = consistency.check(args.uri, args.limit)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 1 if any(item['mismatch_count'] for item in report.values()) else 0
+
+    if args.command == 'replica':
+        logging.getLogger().setLevel(logging.WARNING)
+        report = replica.check(args.uri)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0 if report['passed'] else 1
+
+    if args.command == 'explain':
+        logging.getLogger().setLevel(logging.WARNING)
+        report = explain.check(args.uri, args.verbose)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0 if report['passed'] else 1
+
+    if args.command == 'pricing':
+        report = pricing.check(args.quotes, args.scenarios, args.max_items, args.seed)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 1 if report['mismatch_count'] else 0
+
+    regressions = scenarios.compare(scenarios.load_result(args.base), scenarios.load_result(args.head), args.threshold)
+    for item in regressions:
+        print(f'退化: {item}')
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 混合属性一致性检查
+
+逐行比较模型混合属性的Python计算结果和SQL表达式在数据库中的计算结果，
+修改 is_overdue / payment_progress / delivery_progress 后用于确认两边规则一致：
+    python -m benchmarks consistency --uri sqlite:////tmp/crm_bench.db
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, List
+
+# 模型 -> 需要比较的混合属性
+HYBRID_PROPERTIES = {
+    'Contract': ['is_overdue', 'payment_progress'],
+    'Order': ['is_overdue', 'delivery_progress']
+}
+
+# 数值比较容差（数据库除法的中间精度可能与Decimal不同）
+TOLERANCE = Decimal('0.01')
+
+def _same(python_value: Any, sql_value: Any) -> bool:
+    if isinstance(python_value, bool):
+        return python_value == bool(sql_value)
+    return abs(Decimal(str(python_value)) - Decimal(str(sql_value or 0))) <= TOLERANCE
+
+def check(uri: str, limit: int = 0) -> Dict[str, Any]:
+    """
+    执行一致性检查
+
+    Args:
+        uri: 数据库URI
+        limit: 每个模型最多检查的行数，0表示全部
+
+    Returns:
+        Dict[str, Any]: 每个模型的检查行数和不一致的行
+    """
+    import models
+    from .scenarios import make_app
+
+    app = make_app(uri)
+    report = {}
+    with app.app_context():
+        for model_name, properties in HYBRID_PROPERTIES.items():
+            model = getattr(models, model_name)
+            query = models.db.session.query(
+                model, *[getattr(model, name).label(name) for name in properties]
+            ).order_by(model.id)
+            if limit:
+                query = query.limit(limit)
+
+            checked = 0
+            mismatches: List[Dict[str, Any]] = []
+            for row in query:
+                instance = row[0]
+                for name in properties:
+                    python_value = getattr(instance, name)
+                    sql_value = getattr(row, name)
+                    if not _same(python_value, sql_value):
+                        mismatches.append({
+                            'id': instance.id,
+                            'property': name,
+                            'python': str(python_value),
+                            'sql': str(sql_value)
+                        })
+                checked += 1
+            report[model_name] = {'checked': checked, 'mismatches': mismatches[:50], 'mismatch_count': len(mismatches)}
+    return report
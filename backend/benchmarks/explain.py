@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 执行计划检查
+
+通过Flask测试客户端请求热点接口（各列表的默认排序和常用筛选、客户游标和客户概览），
+记录请求中执行的每条SELECT，逐条执行EXPLAIN，出现全表扫描或为ORDER BY排序
+（MySQL的filesort、SQLite的TEMP B-TREE）时检查失败：
+    python -m benchmarks explain --uri sqlite:////tmp/crm_bench.db
+
+数据库需由 generate 生成（表结构来自模型，包含模型中声明的索引）；
+已有的MySQL库先执行 database/migrations 中的索引迁移。
+关键字搜索（LIKE '%...%'）和按派生字段排序无法走索引，不在检查范围内。
+"""
+
+from typing import Any, Dict, List, Tuple
+
+# 热点请求：(名称, URL模板)，模板中的变量来自数据库中的样本值
+HOT_REQUESTS = (
+    ('客户列表', '/api/v1/customers/?page=2&per_page=20'),
+    ('客户列表-状态', '/api/v1/customers/?status={customer_status}&per_page=20'),
+    ('客户列表-等级', '/api/v1/customers/?level={customer_level}&per_page=20'),
+    ('客户列表-销售员', '/api/v1/customers/?sales_user_id={sales_user_id}&per_page=20'),
+    ('客户游标', '/api/v1/customers/feed?limit=50'),
+    ('客户游标-下一批', '/api/v1/customers/feed?limit=50&after={feed_cursor}'),
+    ('客户游标-状态', '/api/v1/customers/feed?limit=50&status={customer_status}'),
+    ('客户概览', '/api/v1/customers/{customer_id}/overview'),
+    ('报价列表', '/api/v1/quotes/?page=2&per_page=20'),
+    ('报价列表-状态', '/api/v1/quotes/?status={quote_status}&per_page=20'),
+    ('报价列表-客户', '/api/v1/quotes/?customer_id={customer_id}&per_page=20'),
+    ('报价列表-销售员', '/api/v1/quotes/?sales_user_id={sales_user_id}&per_page=20'),
+    ('合同列表', '/api/v1/contracts/?page=2&per_page=20'),
+    ('合同列表-状态', '/api/v1/contracts/?status={contract_status}&per_page=20'),
+    ('合同列表-客户', '/api/v1/contracts/?customer_id={customer_id}&per_page=20'),
+    ('合同列表-销售员', '/api/v1/contracts/?sales_user_id={sales_user_id}&per_page=20'),
+    ('订单列表', '/api/v1/orders/?page=2&per_page=20'),
+    ('订单列表-状态', '/api/v1/orders/?status={order_status}&per_page=20'),
+    ('订单列表-客户', '/api/v1/orders/?customer_id={customer_id}&per_page=20'),
+    ('订单列表-销售员', '/api/v1/orders/?sales_user_id={sales_user_id}&per_page=20')
+)
+
+class StatementRecorder:
+    """
+    记录引擎上执行的SELECT语句（语句, 参数）
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.statements: List[Tuple[str, Any]] = []
+        self.active = False
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and not executemany and statement.lstrip().upper().startswith('SELECT'):
+            self.statements.append((statement, parameters))
+
+def explain(conn, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    """
+    执行EXPLAIN并找出全表扫描和排序
+
+    Args:
+        conn: 数据库连接
+        statement: SQL语句（驱动参数格式）
+        parameters: 参数
+
+    Returns:
+        Tuple[List[str], List[str]]: (执行计划, 问题列表)
+    """
+    from models import db
+
+    plan, problems = [], []
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters):
+            detail = row[-1]
+            plan.append(detail)
+            # 只检查实际的表（子查询、UNION结果的扫描由内层查询决定）
+            scanned = detail.split()[1] if detail.startswith('SCAN ') else None
+            if scanned in db.metadata.tables and ' USING ' not in detail:
+                problems.append(f'全表扫描: {detail}')
+            elif 'TEMP B-TREE' in detail and 'ORDER BY' in detail:
+                problems.append(f'排序: {detail}')
+    elif dialect == 'mysql':
+        for row in conn.exec_driver_sql(f'EXPLAIN {statement}', parameters).mappings():
+            table, access, extra = row.get('table') or '', row.get('type'), row.get('Extra') or ''
+            plan.append(f"{table} type={access} key={row.get('key')} rows={row.get('rows')} {extra}".strip())
+            # 派生表（分页计数的子查询等）的扫描由内层查询决定
+            if table.startswith('<'):
+                continue
+            if access == 'ALL':
+                problems.append(f'全表扫描: {table}')
+            if 'Using filesort' in extra:
+                problems.append(f'排序: {table}')
+    else:
+        raise ValueError(f'不支持的数据库: {dialect}')
+    return plan, problems
+
+def _sample_values(client, headers) -> Dict[str, Any]:
+    from models import db, Customer, Quote, Contract, Order
+
+    def most_common(column):
+        row = db.session.query(column, db.func.count()).filter(column.isnot(None)).group_by(column).order_by(
+            db.func.count().desc()
+        ).first()
+        return row[0] if row else ''
+
+    customer_id = db.session.query(Quote.customer_id).filter(Quote.is_deleted.is_(False)).order_by(Quote.id).first()
+    values = {
+        'customer_status': most_common(Customer.status),
+        'customer_level': most_common(Customer.level),
+        'sales_user_id': most_common(Customer.sales_user_id),
+        'quote_status': most_common(Quote.status),
+        'contract_status': most_common(Contract.status),
+        'order_status': most_common(Order.status),
+        'customer_id': customer_id[0] if customer_id else 1
+    }
+    response = client.get('/api/v1/customers/feed?limit=50', headers=headers)
+    values['feed_cursor'] = (response.get_json() or {}).get('next_cursor') or ''
+    return values
+
+def check(uri: str, verbose: bool = False) -> Dict[str, Any]:
+    """
+    检查热点请求的执行计划
+
+    Args:
+        uri: 已生成数据的数据库URI
+        verbose: 是否输出所有语句（默认只输出有问题的语句）
+
+    Returns:
+        Dict[str, Any]: 各请求的语句、执行计划和问题
+    """
+    from flask_jwt_extended import create_access_token
+    from models import db
+    from .scenarios import make_app
+
+    app = make_app(uri, CONDITIONAL_GET_ENABLED=False, CUSTOMER_OVERVIEW_CACHE_SIZE=0)
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+        recorder = StatementRecorder(engine)
+        headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+        values = _sample_values(client, headers)
+        db.session.remove()
+
+    results = []
+    with engine.connect() as conn:
+        for name, template in HOT_REQUESTS:
+            recorder.statements = []
+            recorder.active = True
+            try:
+                response = client.get(template.format(**values), headers=headers)
+            finally:
+                recorder.active = False
+
+            statements = []
+            for statement, parameters in recorder.statements:
+                plan, problems = explain(conn, statement, parameters)
+                statements.append({'sql': ' '.join(statement.split()), 'plan': plan, 'problems': problems})
+            passed = response.status_code == 200 and not any(item['problems'] for item in statements)
+            results.append({
+                'request': name,
+                'status': response.status_code,
+                'passed': passed,
+                'queries': len(statements),
+                'statements': [item for item in statements if verbose or item['problems']]
+            })
+
+    return {
+        'dialect': engine.dialect.name,
+        'passed': all(item['passed'] for item in results),
+        'failed': [item['request'] for item in results if not item['passed']],
+        'requests': results
+    }
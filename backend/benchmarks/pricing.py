@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 报价计价引擎一致性检查
+
+随机生成报价明细和折扣/税率方案，比较向量化引擎（utils.pricing.price_quotes）
+与逐条Decimal计算（price_decimal）的结果，并记录两者的耗时：
+    python -m benchmarks pricing --quotes 200 --scenarios 50
+不需要数据库。
+"""
+
+import random
+import time
+from decimal import Decimal
+from typing import Any, Dict
+
+def _random_amount(rng: random.Random, max_digits: int) -> int:
+    # 按位数均匀取值，覆盖小额和大额
+    return rng.randint(1, 10 ** rng.randint(1, max_digits))
+
+def check(quotes: int = 200, scenarios: int = 50, max_items: int = 30, seed: int = 42) -> Dict[str, Any]:
+    """
+    执行一致性检查
+
+    Args:
+        quotes: 报价数
+        scenarios: 方案数
+        max_items: 每张报价的最多明细数
+        seed: 随机种子
+
+    Returns:
+        Dict[str, Any]: 比较的金额数、不一致的样例和耗时（毫秒）
+    """
+    from utils.pricing import AMOUNT_FIELDS, from_cents, price_decimal, price_quotes
+
+    rng = random.Random(seed)
+    quote_index, quantities, unit_prices = [], [], []
+    for index in range(quotes):
+        for _ in range(rng.randint(0, max_items)):
+            quote_index.append(index)
+            quantities.append(_random_amount(rng, 7))
+            unit_prices.append(_random_amount(rng, 9))
+    # 含0、100%和容易出现半分的折扣率/税率
+    discounts = [rng.choice([0, 5, 50, 125, 1000, 9999, 10000, rng.randint(0, 10000)]) for _ in range(scenarios)]
+    taxes = [rng.choice([0, 5, 600, 900, 1300, rng.randint(0, 99999)]) for _ in range(scenarios)]
+
+    # 预热（导入numpy）
+    price_quotes([0], [100], [100], 1, [0], [0])
+    start = time.perf_counter()
+    result = price_quotes(quote_index, quantities, unit_prices, quotes, discounts, taxes)
+    vectorized_ms = (time.perf_counter() - start) * 1000
+
+    items = [[] for _ in range(quotes)]
+    for index, quantity, unit_price in zip(quote_index, quantities, unit_prices):
+        items[index].append((Decimal(quantity).scaleb(-2), Decimal(unit_price).scaleb(-2)))
+
+    mismatches = []
+    start = time.perf_counter()
+    expected = [
+        [price_decimal(items[row], Decimal(discount).scaleb(-2), Decimal(tax).scaleb(-2))
+         for discount, tax in zip(discounts, taxes)]
+        for row in range(quotes)
+    ]
+    decimal_ms = (time.perf_counter() - start) * 1000
+
+    for row in range(quotes):
+        for column in range(scenarios):
+            for name in AMOUNT_FIELDS:
+                actual = from_cents(result[name][row, column])
+                if actual != expected[row][column][name]:
+                    mismatches.append({
+                        'quote': row, 'scenario': column, 'field': name,
+                        'decimal': str(expected[row][column][name]), 'vectorized': str(actual)
+                    })
+
+    return {
+        'quotes': quotes,
+        'scenarios': scenarios,
+        'items': len(quote_index),
+        'amounts_compared': quotes * scenarios * len(AMOUNT_FIELDS),
+        'mismatch_count': len(mismatches),
+        'mismatches': mismatches[:20],
+        'decimal_ms': round(decimal_ms, 2),
+        'vectorized_ms': round(vectorized_ms, 2)
+    }
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 读写分离检查
+
+把基准测试的SQLite数据库复制为两份，分别作为主库和只读副本的替身，
+通过Flask测试客户端检查路由规则：
+    python -m benchmarks replica --uri sqlite:////tmp/crm_bench.db
+
+副本替身不会同步主库的写入，相当于一个无限延迟的副本：写入后不带读己之写头的
+GET读到旧数据，带上头后读到新数据；副本延迟由 REPLICA_LAG_QUERY 读取副本中的
+replica_lag 表模拟。
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List
+
+LAG_TABLE = 'replica_lag'
+
+def _sqlite_path(uri: str) -> str:
+    prefix = 'sqlite:///'
+    if not uri.startswith(prefix) or uri == prefix:
+        raise ValueError('读写分离检查需要SQLite文件数据库作为替身')
+    return uri[len(prefix):]
+
+def _set_lag(path: str, seconds: float):
+    import sqlite3
+
+    with sqlite3.connect(path) as conn:
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {LAG_TABLE} (seconds REAL)')
+        conn.execute(f'DELETE FROM {LAG_TABLE}')
+        conn.execute(f'INSERT INTO {LAG_TABLE} (seconds) VALUES (?)', (seconds,))
+
+def check(uri: str) -> Dict[str, Any]:
+    """
+    执行读写分离检查
+
+    Args:
+        uri: 已生成数据的SQLite数据库URI（不会被修改）
+
+    Returns:
+        Dict[str, Any]: 各项检查结果
+    """
+    from flask_jwt_extended import create_access_token
+    from models import db, Customer
+    from utils.replica import PRIMARY_UNTIL_HEADER
+    from .scenarios import QueryCounter, make_app
+
+    workdir = tempfile.mkdtemp(prefix='crm_replica_')
+    primary_path = os.path.join(workdir, 'primary.db')
+    replica_path = os.path.join(workdir, 'replica.db')
+    shutil.copyfile(_sqlite_path(uri), primary_path)
+    shutil.copyfile(primary_path, replica_path)
+    _set_lag(replica_path, 0)
+
+    checks: List[Dict[str, Any]] = []
+
+    def record(title: str, passed: bool, **detail):
+        checks.append({'check': title, 'passed': bool(passed), **detail})
+
+    try:
+        app = make_app(
+            f'sqlite:///{primary_path}',
+            SQLALCHEMY_BINDS={'replica': f'sqlite:///{replica_path}'},
+            REPLICA_MAX_LAG_SECONDS=5,
+            REPLICA_CHECK_INTERVAL=0,
+            REPLICA_LAG_QUERY=f'SELECT MAX(seconds) FROM {LAG_TABLE}',
+            CONDITIONAL_GET_ENABLED=False
+        )
+        with app.app_context():
+            primary = QueryCounter(db.engines[None])
+            replica = QueryCounter(db.engines['replica'])
+            customer = Customer.query.filter_by(is_deleted=False).order_by(Customer.id).first()
+            customer_id, original_name = customer.id, customer.name
+            headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+            db.session.remove()
+
+        client = app.test_client()
+        monitor = app.extensions['crm_replica']
+
+        def get(extra=None):
+            primary.count = replica.count = 0
+            response = client.get(f'/api/v1/customers/{customer_id}', headers={**headers, **(extra or {})})
+            name = (response.get_json() or {}).get('customer', {}).get('name')
+            return response.status_code, name, primary.count, replica.count
+
+        status, name, on_primary, on_replica = get()
+        record('GET走副本', status == 200 and on_replica > 0 and on_primary == 0,
+               status=status, primary_queries=on_primary, replica_queries=on_replica)
+
+        primary.count = replica.count = 0
+        new_name = f'{original_name}-已更新'
+        response = client.put(f'/api/v1/customers/{customer_id}', json={'name': new_name}, headers=headers)
+        primary_until = response.headers.get(PRIMARY_UNTIL_HEADER)
+        record('写请求走主库并返回读己之写窗口',
+               response.status_code == 200 and primary.count > 0 and replica.count == 0 and bool(primary_until),
+               status=response.status_code, primary_queries=primary.count, replica_queries=replica.count)
+
+        status, name, on_primary, on_replica = get()
+        record('窗口外GET读副本（旧数据）', name == original_name and on_primary == 0, name=name)
+
+        status, name, on_primary, on_replica = get({PRIMARY_UNTIL_HEADER: primary_until})
+        record('窗口内GET读主库（新数据）', name == new_name and on_replica == 0, name=name)
+
+        _set_lag(replica_path, 60)
+        status, name, on_primary, on_replica = get()
+        record('延迟超限时切换到主库', name == new_name and not monitor.healthy and monitor.reason == 'lag',
+               name=name, lag=monitor.lag)
+
+        _set_lag(replica_path, 1)
+        status, name, on_primary, on_replica = get()
+        record('延迟恢复后切回副本', name == original_name and monitor.healthy, name=name, lag=monitor.lag)
+
+        down = make_app(
+            f'sqlite:///{primary_path}',
+            SQLALCHEMY_BINDS={'replica': f'sqlite:///{os.path.join(workdir, "missing", "replica.db")}'},
+            REPLICA_CHECK_INTERVAL=60,
+            CONDITIONAL_GET_ENABLED=False
+        )
+        response = down.test_client().get(f'/api/v1/customers/{customer_id}', headers=headers)
+        down_monitor = down.extensions['crm_replica']
+        record('副本不可用时切换到主库',
+               response.status_code == 200 and not down_monitor.healthy and down_monitor.reason == 'unreachable',
+               status=response.status_code)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {'passed': all(item['passed'] for item in checks), 'checks': checks}
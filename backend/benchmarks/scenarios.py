@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 基准测试场景
+
+在进程内通过Flask测试客户端重复执行典型请求，统计吞吐量、
+p50/p95/p99延迟、每请求SQL查询数和从数据库读取的字节数，结果输出为JSON，便于在提交之间对比：
+    python -m benchmarks run --uri sqlite:////tmp/crm_bench.db --output before.json
+    python -m benchmarks compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from .datagen import BENCH_PASSWORD, SURNAMES
+
+class BenchmarkConfig(Config):
+    """基准测试配置：数据库由命令行指定，关闭调试和文件日志"""
+    DEBUG = False
+    TESTING = True
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': False}
+    METRICS_DIR = os.path.join(tempfile.gettempdir(), 'crm_bench_metrics')
+
+def make_app(uri: str, **overrides):
+    """
+    创建连接到指定数据库的应用
+
+    Args:
+        uri: SQLAlchemy URI
+        **overrides: 其他配置项
+
+    Returns:
+        Flask: 应用实例
+    """
+    from app import create_app
+
+    config_class = type('BenchmarkRunConfig', (BenchmarkConfig,), {'SQLALCHEMY_DATABASE_URI': uri, **overrides})
+    return create_app(config_class)
+
+class QueryCounter:
+    """
+    统计引擎上执行的SQL语句数
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+    def _after_execute(self, *args):
+        self.count += 1
+
+class TransferMeter:
+    """
+    统计从数据库读取的数据量
+
+    row_bytes：ORM加载的实例中已读取列值的字节数（与数据库类型无关的估算）
+    wire_bytes：MySQL服务端 Bytes_sent 状态的增量（仅MySQL，基准库应无其他连接）
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        from models import db
+
+        self.engine = engine
+        self.row_bytes = 0
+        event.listen(db.Model, 'load', self._on_load, propagate=True)
+
+    def _on_load(self, instance, context):
+        for key, value in instance.__dict__.items():
+            if key.startswith('_') or value is None:
+                continue
+            if isinstance(value, (str, bytes)):
+                self.row_bytes += len(value.encode('utf-8') if isinstance(value, str) else value)
+            elif not isinstance(value, (list, dict)) and not hasattr(value, '__table__'):
+                self.row_bytes += len(str(value))
+
+    def wire_bytes(self) -> Optional[int]:
+        if self.engine.dialect.name != 'mysql':
+            return None
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            row = conn.execute(text("SHOW GLOBAL STATUS LIKE 'Bytes_sent'")).first()
+        return int(row[1]) if row else None
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """
+    最近秩法计算百分位数
+
+    Args:
+        sorted_samples: 已排序样本
+        pct: 百分位（0-100）
+
+    Returns:
+        float: 百分位数
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_samples) + 0.5)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+# 场景函数签名：(client, rng, context) -> response
+Scenario = Callable[[Any, random.Random, Dict[str, Any]], Any]
+
+def scenario_customer_list(client, rng, context):
+    page = rng.randint(1, context['customer_pages'])
+    return client.get(f'/api/v1/customers/?page={page}&per_page=20', headers=context['headers'])
+
+def scenario_customer_list_fields(client, rng, context):
+    page = rng.randint(1, context['customer_pages'])
+    fields = 'name,company,contact_person,phone,level,status'
+    return client.get(f'/api/v1/customers/?page={page}&per_page=20&fields={fields}', headers=context['headers'])
+
+def scenario_customer_list_revalidate(client, rng, context):
+    # 模拟前端轮询：携带上次的ETag，数据未变化时服务器返回304
+    page = rng.randint(1, min(5, context['customer_pages']))
+    url = f'/api/v1/customers/?page={page}&per_page=20'
+    etags = context.setdefault('etags', {})
+    headers = dict(context['headers'])
+    if url in etags:
+        headers['If-None-Match'] = etags[url]
+    response = client.get(url, headers=headers)
+    if response.headers.get('ETag'):
+        etags[url] = response.headers['ETag']
+    return response
+
+def scenario_customer_feed(client, rng, context):
+    # 模拟无限滚动：沿游标连续向下翻，到末尾后从头开始
+    cursor = context.get('feed_cursor')
+    url = '/api/v1/customers/feed?limit=50&fields=name,company,contact_person,phone,level,status'
+    response = client.get(url + (f'&after={cursor}' if cursor else '&with_total=1'), headers=context['headers'])
+    if response.status_code == 200:
+        context['feed_cursor'] = response.get_json()['next_cursor']
+    return response
+
+def scenario_quote_list(client, rng, context):
+    page = rng.randint(1, context['document_pages'])
+    return client.get(f'/api/v1/quotes/?page={page}&per_page=20', headers=context['headers'])
+
+def scenario_contract_list(client, rng, context):
+    page = rng.randint(1, context['document_pages'])
+    return client.get(f'/api/v1/contracts/?page={page}&per_page=20', headers=context['headers'])
+
+def scenario_order_list(client, rng, context):
+    page = rng.randint(1, context['document_pages'])
+    return client.get(f'/api/v1/orders/?page={page}&per_page=20', headers=context['headers'])
+
+def scenario_customer_search(client, rng, context):
+    term = rng.choice(SURNAMES)
+    return client.get(f'/api/v1/customers/?search={term}&per_page=20', headers=context['headers'])
+
+def scenario_customer_overview(client, rng, context):
+    # 模拟反复打开少量常用客户的详情：首次生成概览，之后命中按客户的缓存
+    customer_id = rng.choice(context['hot_customer_ids'])
+    return client.get(f'/api/v1/customers/{customer_id}/overview', headers=context['headers'])
+
+def scenario_customer_stats(client, rng, context):
+    return client.get('/api/v1/customers/stats', headers=context['headers'])
+
+def scenario_login(client, rng, context):
+    return client.post('/api/v1/auth/login', json={'username': 'admin', 'password': BENCH_PASSWORD})
+
+def scenario_dashboard(client, rng, context):
+    return client.get('/api/v1/stats/dashboard', headers=context['headers'])
+
+def scenario_export(client, rng, context):
+    # 暂无导出接口：取一页最大条数的客户并转换为CSV，覆盖查询+序列化+导出路径
+    from utils.helpers import ExportHelper
+
+    page = rng.randint(1, max(1, context['customer_pages'] // 5))
+    response = client.get(f'/api/v1/customers/?page={page}&per_page=100', headers=context['headers'])
+    if response.status_code == 200:
+        ExportHelper.to_csv(response.get_json()['customers'])
+    return response
+
+SCENARIOS: Dict[str, Scenario] = {
+    'customer_list': scenario_customer_list,
+    'customer_list_fields': scenario_customer_list_fields,
+    'customer_list_revalidate': scenario_customer_list_revalidate,
+    'customer_feed': scenario_customer_feed,
+    'customer_search': scenario_customer_search,
+    'quote_list': scenario_quote_list,
+    'contract_list': scenario_contract_list,
+    'order_list': scenario_order_list,
+    'customer_overview': scenario_customer_overview,
+    'customer_stats': scenario_customer_stats,
+    'login': scenario_login,
+    'dashboard': scenario_dashboard,
+    'export': scenario_export
+}
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def run_scenario(app, counter: QueryCounter, meter: TransferMeter, name: str, scenario: Scenario,
+                 context: Dict[str, Any], iterations: int, warmup: int, seed: int) -> Dict[str, Any]:
+    """
+    执行单个场景
+
+    Args:
+        app: Flask应用
+        counter: SQL计数器
+        meter: 数据量统计
+        name: 场景名
+        scenario: 场景函数
+        context: 场景上下文（认证头等）
+        iterations: 计时迭代次数
+        warmup: 预热次数
+        seed: 随机种子
+
+    Returns:
+        Dict[str, Any]: 场景结果
+    """
+    client = app.test_client()
+    rng = random.Random(f'{seed}:{name}')
+
+    for _ in range(warmup):
+        scenario(client, rng, context)
+
+    latencies, queries = [], []
+    errors = 0
+    wire_start = meter.wire_bytes()
+    row_start = meter.row_bytes
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        before = counter.count
+        start = time.perf_counter_ns()
+        response = scenario(client, rng, context)
+        latencies.append((time.perf_counter_ns() - start) / 1e6)
+        queries.append(counter.count - before)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = (time.perf_counter_ns() - started) / 1e9
+    row_bytes = meter.row_bytes - row_start
+    wire_end = meter.wire_bytes()
+
+    ordered = sorted(latencies)
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'throughput_rps': round(iterations / elapsed, 2) if elapsed else 0,
+        'latency_ms': {
+            'mean': round(sum(ordered) / len(ordered), 3),
+            'p50': round(percentile(ordered, 50), 3),
+            'p95': round(percentile(ordered, 95), 3),
+            'p99': round(percentile(ordered, 99), 3),
+            'max': round(ordered[-1], 3)
+        },
+        'queries_per_request': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries)
+        },
+        'bytes_per_request': {
+            'rows': round(row_bytes / iterations),
+            'wire': round((wire_end - wire_start) / iterations) if wire_start is not None else None
+        }
+    }
+
+def run(uri: str, scenarios: List[str], iterations: int = 200, warmup: int = 20, seed: int = 42) -> Dict[str, Any]:
+    """
+    执行基准测试场景
+
+    Args:
+        uri: 数据库URI（需已通过generate生成数据）
+        scenarios: 场景名列表
+        iterations: 每个场景的计时迭代次数
+        warmup: 每个场景的预热次数
+        seed: 随机种子
+
+    Returns:
+        Dict[str, Any]: 结果（meta + scenarios）
+    """
+    from flask_jwt_extended import create_access_token
+    from models import db, Customer, Quote
+
+    app = make_app(uri)
+    with app.app_context():
+        engine = db.engine
+        counter = QueryCounter(engine)
+        meter = TransferMeter(engine)
+        customers = Customer.query.filter_by(is_deleted=False).count()
+        quotes = Quote.query.filter_by(is_deleted=False).count()
+        context = {
+            'headers': {'Authorization': f'Bearer {create_access_token(identity=1)}'},
+            'customer_pages': max(1, min(500, customers // 20)),
+            'document_pages': max(1, min(500, quotes // 40)),
+            'hot_customer_ids': [customer_id for (customer_id,) in db.session.query(Customer.id).filter_by(
+                is_deleted=False
+            ).order_by(Customer.id).limit(20)] or [1]
+        }
+        dialect = engine.dialect.name
+
+    results = {}
+    for name in scenarios:
+        results[name] = run_scenario(app, counter, meter, name, SCENARIOS[name], context, iterations, warmup, seed)
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'dialect': dialect,
+            'customers': customers,
+            'python': platform.python_version(),
+            'iterations': iterations,
+            'seed': seed
+        },
+        'scenarios': results
+    }
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float = 10.0) -> List[str]:
+    """
+    对比两次结果，返回超过阈值的退化项
+
+    Args:
+        base: 基线结果
+        head: 新结果
+        threshold: 允许的退化百分比
+
+    Returns:
+        List[str]: 退化描述，空列表表示无退化
+    """
+    regressions = []
+    print(f"{'场景':<22}{'p95(ms)':>22}{'吞吐(rps)':>22}{'查询/请求':>18}{'读取字节/请求':>24}")
+    for name, head_result in head['scenarios'].items():
+        base_result = base['scenarios'].get(name)
+        if base_result is None:
+            continue
+        base_p95, head_p95 = base_result['latency_ms']['p95'], head_result['latency_ms']['p95']
+        base_rps, head_rps = base_result['throughput_rps'], head_result['throughput_rps']
+        base_q, head_q = base_result['queries_per_request']['mean'], head_result['queries_per_request']['mean']
+        base_bytes = base_result.get('bytes_per_request', {}).get('rows') or 0
+        head_bytes = head_result.get('bytes_per_request', {}).get('rows') or 0
+        print(f'{name:<22}{base_p95:>10.2f} -> {head_p95:<9.2f}{base_rps:>10.1f} -> {head_rps:<9.1f}'
+              f'{base_q:>7.1f} -> {head_q:<7.1f}{base_bytes:>11} -> {head_bytes:<10}')
+
+        if base_p95 and (head_p95 - base_p95) / base_p95 * 100 > threshold:
+            regressions.append(f'{name}: p95 {base_p95}ms -> {head_p95}ms')
+        if base_rps and (base_rps - head_rps) / base_rps * 100 > threshold:
+            regressions.append(f'{name}: 吞吐 {base_rps} -> {head_rps} rps')
+        if head_q > base_q:
+            regressions.append(f'{name}: 查询数 {base_q} -> {head_q}')
+        if base_bytes and (head_bytes - base_bytes) / base_bytes * 100 > threshold:
+            regressions.append(f'{name}: 读取字节 {base_bytes} -> {head_bytes}')
+    return regressions
+
+def load_result(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_result(result: Dict[str, Any], path: Optional[str] = None):
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    sys.stdout.write(text + '\n')
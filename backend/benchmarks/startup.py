@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 启动耗时基准测试
+
+1. 导入耗时分析：解析 `python -X importtime` 的输出，汇总最耗时的模块
+2. create_app 基准：在全新子进程中测量冷启动耗时，并在当前进程中测量重复创建耗时
+
+使用方式（在backend目录下）：
+    python -m benchmarks.startup --runs 5
+    flask import-profile --top 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程中执行的启动代码
+STARTUP_SNIPPET = (
+    'import time; _t = time.perf_counter(); '
+    'from app import create_app; _i = time.perf_counter(); '
+    'create_app(); _c = time.perf_counter(); '
+    'print(f"{_i - _t} {_c - _i}")'
+)
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    解析 `-X importtime` 输出
+
+    Args:
+        output: 标准错误输出文本
+
+    Returns:
+        List[Dict[str, Any]]: 模块耗时列表（微秒），包含 module、self_us、cumulative_us、depth
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            parts = line[len('import time:'):].split('|')
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+            raw_name = parts[2].rstrip()
+        except (ValueError, IndexError):
+            continue
+        module = raw_name.lstrip()
+        records.append({
+            'module': module,
+            'self_us': self_us,
+            'cumulative_us': cumulative_us,
+            'depth': (len(raw_name) - len(module)) // 2
+        })
+    return records
+
+def profile_imports(target: str = 'from app import create_app; create_app()', top: int = 20) -> Dict[str, Any]:
+    """
+    在子进程中以 `-X importtime` 运行目标代码并汇总结果
+
+    Args:
+        target: 要分析的Python代码
+        top: 返回最耗时模块的数量
+
+    Returns:
+        Dict[str, Any]: 总耗时、顶层包耗时和最耗时模块
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', target],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'FLASK_ENV': os.environ.get('FLASK_ENV', 'production')}
+    )
+    records = parse_importtime(result.stderr)
+
+    # 顶层导入（depth为0）的累计时间之和即总导入耗时
+    top_level = [r for r in records if r['depth'] == 0]
+    total_us = sum(r['cumulative_us'] for r in top_level)
+
+    # 按顶层包汇总自身耗时
+    packages: Dict[str, int] = {}
+    for record in records:
+        package = record['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + record['self_us']
+
+    return {
+        'total_ms': round(total_us / 1000, 2),
+        'module_count': len(records),
+        'packages': [
+            {'package': name, 'self_ms': round(us / 1000, 2)}
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        'cumulative': [
+            {'module': r['module'], 'cumulative_ms': round(r['cumulative_us'] / 1000, 2)}
+            for r in sorted(top_level, key=lambda r: r['cumulative_us'], reverse=True)[:top]
+        ],
+        'self': [
+            {'module': r['module'], 'self_ms': round(r['self_us'] / 1000, 2)}
+            for r in sorted(records, key=lambda r: r['self_us'], reverse=True)[:top]
+        ]
+    }
+
+def format_import_profile(profile: Dict[str, Any]) -> str:
+    """
+    格式化导入耗时分析结果
+
+    Args:
+        profile: profile_imports的返回值
+
+    Returns:
+        str: 可读文本
+    """
+    lines = [f"导入总耗时: {profile['total_ms']}ms（{profile['module_count']}个模块）", '', '按包汇总（自身耗时）:']
+    lines += [f"  {item['self_ms']:>9.2f}ms  {item['package']}" for item in profile['packages']]
+    lines += ['', '顶层导入（累计耗时）:']
+    lines += [f"  {item['cumulative_ms']:>9.2f}ms  {item['module']}" for item in profile['cumulative']]
+    lines += ['', '单个模块（自身耗时）:']
+    lines += [f"  {item['self_ms']:>9.2f}ms  {item['module']}" for item in profile['self']]
+    return '\n'.join(lines)
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    """
+    计算耗时样本的统计值（毫秒）
+    """
+    ordered = sorted(samples)
+    return {
+        'min_ms': round(ordered[0] * 1000, 2),
+        'median_ms': round(statistics.median(ordered) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2)
+    }
+
+def bench_cold_start(runs: int = 5) -> Dict[str, Any]:
+    """
+    在全新子进程中测量导入和create_app耗时
+
+    Args:
+        runs: 运行次数
+
+    Returns:
+        Dict[str, Any]: 导入、创建和总耗时统计
+    """
+    import_samples, create_samples, total_samples = [], [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SNIPPET],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip().splitlines()[-1]
+        import_s, create_s = (float(value) for value in output.split())
+        import_samples.append(import_s)
+        create_samples.append(create_s)
+        total_samples.append(import_s + create_s)
+
+    return {
+        'runs': runs,
+        'import': _summary(import_samples),
+        'create_app': _summary(create_samples),
+        'total': _summary(total_samples)
+    }
+
+def bench_warm_create(runs: int = 20) -> Dict[str, Any]:
+    """
+    在当前进程中重复调用create_app（模块已导入）
+
+    Args:
+        runs: 运行次数
+
+    Returns:
+        Dict[str, Any]: create_app耗时统计
+    """
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        create_app()
+        samples.append(time.perf_counter() - start)
+
+    return {'runs': runs, 'create_app': _summary(samples)}
+
+def main(argv=None):
+    """
+    命令行入口
+    """
+    parser = argparse.ArgumentParser(description='CRM应用启动耗时基准测试')
+    parser.add_argument('--runs', type=int, default=5, help='冷启动测量次数')
+    parser.add_argument('--warm-runs', type=int, default=20, help='进程内重复创建次数')
+    parser.add_argument('--top', type=int, default=10, help='导入分析中列出的模块数')
+    parser.add_argument('--output', help='结果JSON输出文件')
+    args = parser.parse_args(argv)
+
+    result = {
+        'benchmark': 'startup',
+        'python': sys.version.split()[0],
+        'cold': bench_cold_start(args.runs),
+        'warm': bench_warm_create(args.warm_runs),
+        'imports': profile_imports(top=args.top)
+    }
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return result
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,18 @@ class Config:
         'pool_recycle': 300,
     }
     
+    # 只读副本（MySQL复制从库，账号和库名与主库相同）。配置后GET请求的查询走副本，
+    # 写请求和写后的读己之写窗口走主库，副本延迟超限或不可用时切换到主库
+    MYSQL_REPLICA_HOST = os.environ.get('MYSQL_REPLICA_HOST')
+    MYSQL_REPLICA_PORT = int(os.environ.get('MYSQL_REPLICA_PORT') or MYSQL_PORT)
+    SQLALCHEMY_BINDS = {
+        'replica': f'mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_REPLICA_HOST}:{MYSQL_REPLICA_PORT}/{MYSQL_DATABASE}'
+    } if MYSQL_REPLICA_HOST else {}
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', 10))
+    REPLICA_READ_YOUR_WRITES_SECONDS = float(os.environ.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10))
+    REPLICA_LAG_QUERY = os.environ.get('REPLICA_LAG_QUERY')
+    
     # JWT配置
     JWT_SECRET_KEY = SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
@@ -47,6 +59,70 @@ class Config:
     # 日志配置
     LOG_LEVEL = 'INFO'
     LOG_FILE = 'logs/crm.log'
+    LOG_REQUESTS = os.environ.get('LOG_REQUESTS', 'false').lower() in ['true', 'on', '1']
+    
+    # 监控指标配置（多进程部署时METRICS_DIR需为所有工作进程共享的目录）
+    # /metrics 不需要登录，默认关闭，开启后只允许内部网段直接访问
+    METRICS_ENABLED = os.environ.get('MONITORING_ENABLED', 'false').lower() in ['true', 'on', '1']
+    METRICS_ENDPOINT = os.environ.get('MONITORING_ENDPOINT', '/metrics')
+    METRICS_ALLOWED_NETWORKS = os.environ.get(
+        'METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16'
+    )
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+    
+    # 过载保护：每个工作进程内按路由类别（cheap/heavy/write/export）限制并发，
+    # 格式 类别=并发上限:排队上限，未列出的类别不限制；并发加排队应小于GUNICORN_THREADS
+    LOAD_SHEDDING_ENABLED = os.environ.get('LOAD_SHEDDING_ENABLED', 'true').lower() in ['true', 'on', '1']
+    LOAD_SHEDDING_LIMITS = os.environ.get('LOAD_SHEDDING_LIMITS', 'heavy=2:1,export=1:0,write=3:2')
+    LOAD_SHEDDING_QUEUE_TIMEOUT = float(os.environ.get('LOAD_SHEDDING_QUEUE_TIMEOUT', 1))
+    LOAD_SHEDDING_RETRY_AFTER = float(os.environ.get('LOAD_SHEDDING_RETRY_AFTER', 1))
+    LOAD_SHEDDING_LATENCY_TOLERANCE = float(os.environ.get('LOAD_SHEDDING_LATENCY_TOLERANCE', 2))
+    
+    # 按用户令牌桶限流（可选），格式 类别=每秒令牌数:桶容量；存储为 memory:// 或 redis://host:6379/0
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'false').lower() in ['true', 'on', '1']
+    RATE_LIMITS = os.environ.get('RATE_LIMITS', 'heavy=1:10,export=0.1:3,write=5:20')
+    RATE_LIMIT_STORAGE_URL = os.environ.get('RATE_LIMIT_STORAGE_URL', 'memory://')
+    
+    # 并发查询（仪表盘/统计接口中互不依赖的查询并发执行；线程数应小于连接池可用连接数）
+    FANOUT_ENABLED = os.environ.get('FANOUT_ENABLED', 'true').lower() in ['true', 'on', '1']
+    FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', 8))
+    FANOUT_TIMEOUT = float(os.environ.get('FANOUT_TIMEOUT', 5))
+    
+    # 客户概览缓存（每个工作进程缓存的客户数，0表示不缓存）
+    CUSTOMER_OVERVIEW_CACHE_SIZE = int(os.environ.get('CUSTOMER_OVERVIEW_CACHE_SIZE', 1000))
+    
+    # 条件请求（GET接口返回ETag/Last-Modified，未变化时返回304）
+    CONDITIONAL_GET_ENABLED = os.environ.get('CONDITIONAL_GET_ENABLED', 'true').lower() in ['true', 'on', '1']
+    
+    # 前端打包产物目录（frontend/build.py 的输出，配置后由Flask在 /app/ 下提供）
+    FRONTEND_DIST_DIR = os.environ.get('FRONTEND_DIST_DIR')
+    
+    # SQL分析器配置（默认关闭）
+    SQL_PROFILER_ENABLED = os.environ.get('SQL_PROFILER_ENABLED', 'false').lower() in ['true', 'on', '1']
+    SQL_PROFILER_SLOW_MS = float(os.environ.get('SQL_PROFILER_SLOW_MS', 100))
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_PROFILER_N_PLUS_ONE_THRESHOLD', 5))
+    
+    # 健康检查：每个工作进程的后台探测间隔（秒），/health/ready 返回最近一次结果
+    HEALTH_PROBE_INTERVAL = float(os.environ.get('HEALTH_PROBE_INTERVAL', 10))
+    
+    # Redis（可选，配置后就绪检查包含其连通性）
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # 后台定时任务配置（TASK_LOCK_DIR用于多进程间选出唯一执行者）
+    TASK_LOCK_DIR = os.environ.get('TASK_LOCK_DIR')
+    FOLLOW_UP_REMINDERS_ENABLED = os.environ.get('FOLLOW_UP_REMINDERS_ENABLED', 'false').lower() in ['true', 'on', '1']
+    FOLLOW_UP_HEAP_SIZE = int(os.environ.get('FOLLOW_UP_HEAP_SIZE', 500))
+    FOLLOW_UP_POLL_INTERVAL = float(os.environ.get('FOLLOW_UP_POLL_INTERVAL', 60))
+    QUOTE_EXPIRY_SWEEP_ENABLED = os.environ.get('QUOTE_EXPIRY_SWEEP_ENABLED', 'true').lower() in ['true', 'on', '1']
+    QUOTE_EXPIRY_SWEEP_INTERVAL = float(os.environ.get('QUOTE_EXPIRY_SWEEP_INTERVAL', 300))
+    QUOTE_EXPIRY_SWEEP_CHUNK_SIZE = int(os.environ.get('QUOTE_EXPIRY_SWEEP_CHUNK_SIZE', 500))
+    # 历史单据归档：已结束且超过ARCHIVE_AFTER_DAYS天的报价、订单移入归档表（每次最多ARCHIVE_MAX_CHUNKS批）
+    ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'false').lower() in ['true', 'on', '1']
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 730))
+    ARCHIVE_INTERVAL = float(os.environ.get('ARCHIVE_INTERVAL', 3600))
+    ARCHIVE_CHUNK_SIZE = int(os.environ.get('ARCHIVE_CHUNK_SIZE', 500))
+    ARCHIVE_MAX_CHUNKS = int(os.environ.get('ARCHIVE_MAX_CHUNKS', 20))
 
 class DevelopmentConfig(Config):
     """开发环境配置"""
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - Gunicorn配置
+
+生产环境WSGI服务配置，所有参数均可通过环境变量覆盖：
+1. 根据CPU核数计算工作进程数
+2. 选择gthread/gevent/sync工作模式
+3. 预加载应用，fork后重置数据库连接池
+4. 请求数上限加抖动，避免工作进程同时重启
+5. 优雅退出超时
+
+使用方式：
+    cd backend && gunicorn -c gunicorn_conf.py "app:create_app()"
+或直接运行 python backend/serve.py
+"""
+
+import os
+import multiprocessing
+
+def _env_int(name: str, default: int) -> int:
+    """
+    读取整数类型的环境变量
+
+    Args:
+        name: 环境变量名
+        default: 默认值
+
+    Returns:
+        int: 环境变量值，无效时返回默认值
+    """
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def _cpu_count() -> int:
+    """
+    获取当前进程可用的CPU核数（容器中以CPU亲和性为准）
+
+    Returns:
+        int: CPU核数
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return multiprocessing.cpu_count()
+
+def _select_worker_class(requested: str) -> str:
+    """
+    选择工作进程类型，gevent未安装时回退到gthread
+
+    Args:
+        requested: 期望的工作进程类型
+
+    Returns:
+        str: 实际使用的工作进程类型
+    """
+    requested = (requested or 'gthread').lower()
+    if requested == 'gevent':
+        try:
+            import gevent  # noqa: F401
+            return 'gevent'
+        except ImportError:
+            return 'gthread'
+    if requested in ('gthread', 'sync'):
+        return requested
+    return 'gthread'
+
+cores = _cpu_count()
+
+# 监听地址
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{_env_int('PORT', 5000)}"
+
+# 工作进程
+worker_class = _select_worker_class(os.environ.get('GUNICORN_WORKER_CLASS', 'gthread'))
+
+if worker_class == 'gevent':
+    # 协程模式：I/O由协程复用，进程数与核数一致即可
+    workers = _env_int('GUNICORN_WORKERS', cores)
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+elif worker_class == 'gthread':
+    # 线程模式：少量进程，每个进程多个线程处理阻塞的数据库I/O
+    workers = _env_int('GUNICORN_WORKERS', max(2, cores))
+    threads = _env_int('GUNICORN_THREADS', 4)
+else:
+    workers = _env_int('GUNICORN_WORKERS', cores * 2 + 1)
+
+# 预加载应用：在主进程中导入一次，工作进程通过fork共享内存页
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ['true', 'on', '1']
+
+# 处理一定数量请求后重启工作进程，抖动避免所有进程同时重启
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max(1, max_requests // 10))
+
+# 超时配置
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# 日志配置
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+
+def on_starting(server):
+    """
+    主进程启动回调：清空上次运行遗留的指标快照
+    """
+    from serve import clear_metrics_store
+
+    clear_metrics_store()
+
+def post_fork(server, worker):
+    """
+    工作进程fork后的回调
+
+    预加载模式下数据库连接池在主进程中创建，fork后的连接套接字
+    会被多个进程共享，这里丢弃继承的连接，让每个工作进程重新建立。
+    """
+    from serve import reset_after_fork
+
+    reset_after_fork(worker.app.wsgi())
+    server.log.info(f'工作进程 {worker.pid} 已重置数据库连接池')
+
+def post_worker_init(worker):
+    """
+    工作进程初始化完成后启动后台定时任务（线程不能跨fork继承，需在每个工作进程内启动）
+    """
+    from serve import start_background_tasks
+
+    start_background_tasks(worker.app.wsgi())
+
+def worker_exit(server, worker):
+    """
+    工作进程退出前写入最后一次指标快照
+    """
+    from serve import flush_metrics
+
+    flush_metrics(worker.app.wsgi())
+
+def child_exit(server, worker):
+    """
+    主进程回收工作进程后，把它的指标快照并入累计文件
+    """
+    from serve import retire_metrics
+
+    retire_metrics(worker.pid)
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 数据迁移
+
+结构变更的DDL见 database/migrations/*.sql，
+需要在应用层分批处理的数据回填放在本包中，通过flask命令执行。
+"""
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 客户标签回填
+
+从 customers.tags（逗号分隔）回填 tags / customer_tags：
+1. 按主键分批读取客户，每批一个事务，可从上次中断的 customers.id 继续
+2. 每批先删除这些客户已有的关联再重建，重复执行结果不变
+3. 全部完成后用一条集合UPDATE重算 tags.customer_count
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+
+from models import Customer, Tag, customer_tags
+
+logger = logging.getLogger(__name__)
+
+def _split_tags(value: Optional[str]) -> List[str]:
+    return Tag.normalize_names(value.split(',')) if value else []
+
+def _ensure_tags(conn, names: Iterable[str]) -> Dict[str, int]:
+    """
+    获取标签ID，缺失的批量插入
+
+    Args:
+        conn: 数据库连接
+        names: 标签名
+
+    Returns:
+        Dict[str, int]: 标签名 -> ID
+    """
+    tags = Tag.__table__
+    names = sorted(set(names))
+    if not names:
+        return {}
+
+    existing = dict(conn.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(names))).all())
+    missing = [name for name in names if name not in existing]
+    if missing:
+        conn.execute(tags.insert(), [
+            {'name': name, 'customer_count': 0, 'is_deleted': False}
+            for name in missing
+        ])
+        existing.update(conn.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(missing))).all())
+    return existing
+
+def recount_tags(conn):
+    """
+    按关联表重算标签计数（只统计未删除客户）
+
+    Args:
+        conn: 数据库连接
+    """
+    tags = Tag.__table__
+    customers = Customer.__table__
+    count = (
+        select(func.count())
+        .select_from(customer_tags.join(customers, customers.c.id == customer_tags.c.customer_id))
+        .where(customer_tags.c.tag_id == tags.c.id, customers.c.is_deleted.is_(False))
+        .scalar_subquery()
+    )
+    conn.execute(tags.update().values(customer_count=count))
+
+def backfill_customer_tags(engine, chunk_size: int = 1000, start_after: int = 0) -> Dict[str, int]:
+    """
+    分批回填客户标签
+
+    Args:
+        engine: SQLAlchemy引擎
+        chunk_size: 每批客户数
+        start_after: 从该客户ID之后开始（用于中断后继续）
+
+    Returns:
+        Dict[str, int]: 处理的客户数、写入的关联数和最后处理的客户ID
+    """
+    customers = Customer.__table__
+    last_id = start_after
+    processed = linked = 0
+
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(customers.c.id, customers.c.tags)
+                .where(customers.c.id > last_id)
+                .order_by(customers.c.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            parsed = {row.id: _split_tags(row.tags) for row in rows}
+            tag_ids = _ensure_tags(conn, (name for names in parsed.values() for name in names))
+
+            conn.execute(customer_tags.delete().where(customer_tags.c.customer_id.in_(list(parsed))))
+            links = [
+                {'customer_id': customer_id, 'tag_id': tag_ids[name]}
+                for customer_id, names in parsed.items()
+                for name in names
+            ]
+            if links:
+                conn.execute(customer_tags.insert(), links)
+
+            processed += len(rows)
+            linked += len(links)
+            last_id = rows[-1].id
+
+        logger.info(f'客户标签回填: 已处理 {processed} 个客户，最后ID {last_id}')
+
+    with engine.begin() as conn:
+        recount_tags(conn)
+
+    return {'customers': processed, 'links': linked, 'last_id': last_id}
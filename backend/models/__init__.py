@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from .serializer import get_serializer_plan
+from .routing import RoutingSession
 
-# 创建数据库实例
-db = SQLAlchemy()
+# 创建数据库实例（配置只读副本时，请求内的只读查询路由到副本）
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class BaseModel(db.Model):
     """基础模型类，包含公共字段"""
@@ -13,17 +15,52 @@ class BaseModel(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
     
-    def to_dict(self):
+    # 派生字段：字段名 -> {'columns': 依赖的列, 'relation': (多对一关系, 关联表需要的列)}
+    serializer_extras = {}
+    # 可通过include展开的集合关系：名称 -> 关系属性（延迟加载组名也可用于include）
+    serializer_includes = {}
+    # 未指定include时默认展开的关系和延迟加载组（to_dict()不带参数时输出完整数据）
+    serializer_default_includes = ()
+    
+    @classmethod
+    def serializer_plan(cls, fields=None, include=None):
+        """获取序列化计划（按字段组合缓存）"""
+        return get_serializer_plan(cls, fields, include)
+    
+    @classmethod
+    def query_options(cls, fields=None, include=None):
+        """获取与序列化计划匹配的查询加载选项"""
+        return cls.serializer_plan(fields, include).load_options
+    
+    def to_dict(self, fields=None, include=None):
         """将模型转换为字典"""
+        plan = self.serializer_plan(fields, include)
         result = {}
-        for column in self.__table__.columns:
-            value = getattr(self, column.name)
+        for name in plan.columns:
+            value = getattr(self, name)
             if isinstance(value, datetime):
-                result[column.name] = value.isoformat()
+                result[name] = value.isoformat()
             else:
-                result[column.name] = value
+                result[name] = value
         return result
     
+    @classmethod
+    def reserve_numbers(cls, column_name, prefix, count=1):
+        """
+        一次分配当天的count个单据编号（前缀+日期+4位序号）
+        
+        按当天已有的最大序号顺延（删除、归档后不会重复），并发分配到相同编号时
+        插入会违反唯一约束，由调用方重试整个事务。
+        """
+        column = getattr(cls, column_name)
+        stem = f"{prefix}{datetime.utcnow().strftime('%Y%m%d')}"
+        last = db.session.query(db.func.max(column)).filter(
+            column.like(f'{stem}%'),
+            db.func.length(column) == len(stem) + 4
+        ).scalar()
+        start = int(last[len(stem):]) + 1 if last else 1
+        return [f'{stem}{number:04d}' for number in range(start, start + count)]
+    
     def save(self):
         """保存模型到数据库"""
         db.session.add(self)
@@ -45,9 +82,12 @@ class BaseModel(db.Model):
 
 # 导入所有模型
 from .user import User
+from .tag import Tag, customer_tags
 from .customer import Customer
 from .quote import Quote, QuoteItem
 from .contract import Contract
 from .order import Order, OrderItem
+from .archive import quotes_archive, quote_items_archive, orders_archive, order_items_archive
 
-__all__ = ['db', 'BaseModel', 'User', 'Customer', 'Quote', 'QuoteItem', 'Contract', 'Order', 'OrderItem']
\ No newline at end of file
+__all__ = ['db', 'BaseModel', 'User', 'Tag', 'customer_tags', 'Customer', 'Quote', 'QuoteItem', 'Contract', 'Order', 'OrderItem',
+           'quotes_archive', 'quote_items_archive', 'orders_archive', 'order_items_archive']
\ No newline at end of file
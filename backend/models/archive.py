@@ -0,0 +1,231 @@
+"""
+历史单据归档
+
+报价、订单及其明细表只增不减，早已结束的单据很少再读取，却与活跃数据共用索引和缓冲池。
+超过归档期限（按 quote_date / order_date）且已结束的单据（报价：已接受/已拒绝/已过期，
+订单：已完成/已取消，以及已删除的单据）分批移入 *_archive 表：
+1. 每批一个事务：锁定并复核本批单据，INSERT ... SELECT 复制单据和明细，再删除原表中的行，
+   中断后重新执行即从剩余的单据继续，已移动的单据不会重复处理
+2. 已被合同引用的报价保留在原表（contracts.quote_id 外键）
+3. 详情接口在原表中找不到时读取归档表，返回的结构与原表一致（带 archived 标记）
+
+归档表结构与原表相同，另加 archived_at，没有外键；列表、统计和客户概览只统计原表中的单据。
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.orm import MANYTOONE, configure_mappers
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import db
+from .quote import Quote, QuoteItem
+from .contract import Contract
+from .order import Order, OrderItem
+
+def _archive_table(source, name, *indexes):
+    # 复制原表的列（不含默认值、自增和外键，值全部来自原表）
+    columns = [
+        db.Column(column.name, column.type, primary_key=column.primary_key, autoincrement=False,
+                  nullable=column.nullable, comment=column.comment)
+        for column in source.columns
+    ]
+    return db.Table(
+        name,
+        *columns,
+        db.Column('archived_at', db.DateTime, nullable=False, comment='归档时间'),
+        *indexes
+    )
+
+quotes_archive = _archive_table(
+    Quote.__table__, 'quotes_archive',
+    db.Index('idx_quotes_archive_customer', 'customer_id'),
+    db.Index('idx_quotes_archive_quote_date', 'quote_date'),
+    db.Index('idx_quotes_archive_archived_at', 'archived_at')
+)
+quote_items_archive = _archive_table(
+    QuoteItem.__table__, 'quote_items_archive',
+    db.Index('idx_quote_items_archive_quote', 'quote_id')
+)
+orders_archive = _archive_table(
+    Order.__table__, 'orders_archive',
+    db.Index('idx_orders_archive_customer', 'customer_id'),
+    db.Index('idx_orders_archive_order_date', 'order_date'),
+    db.Index('idx_orders_archive_archived_at', 'archived_at')
+)
+order_items_archive = _archive_table(
+    OrderItem.__table__, 'order_items_archive',
+    db.Index('idx_order_items_archive_order', 'order_id')
+)
+
+class DocumentArchive:
+    """
+    一类单据（含明细）的归档
+    """
+
+    def __init__(self, model, item_model, table, item_table, items_relation: str, item_key: str,
+                 date_column: str, closed_statuses: tuple, pinned: Optional[Callable] = None):
+        """
+        Args:
+            model: 单据模型
+            item_model: 明细模型
+            table: 单据归档表
+            item_table: 明细归档表
+            items_relation: 单据上的明细关系名
+            item_key: 明细表中的单据ID列
+            date_column: 判断是否超过归档期限的日期列
+            closed_statuses: 已结束的状态
+            pinned: 返回"必须保留在原表"条件的函数（参数为原表）
+        """
+        self.model = model
+        self.item_model = item_model
+        self.table = table
+        self.item_table = item_table
+        self.items_relation = items_relation
+        self.item_key = item_key
+        self.date_column = date_column
+        self.closed_statuses = closed_statuses
+        self.pinned = pinned
+
+    @property
+    def name(self) -> str:
+        return self.model.__tablename__
+
+    def _eligible(self, before):
+        source = self.model.__table__
+        conditions = [
+            source.c[self.date_column] < before,
+            db.or_(source.c.status.in_(self.closed_statuses), source.c.is_deleted.is_(True))
+        ]
+        if self.pinned is not None:
+            conditions.append(db.not_(self.pinned(source)))
+        return conditions
+
+    def archive_chunk(self, conn, before, chunk_size: int) -> Dict[str, int]:
+        """
+        归档一批单据（在调用方的事务中执行）
+
+        Args:
+            conn: 数据库连接（事务中）
+            before: 归档该日期之前的单据
+            chunk_size: 每批单据数
+
+        Returns:
+            Dict[str, int]: 本批移动的单据数和明细数
+        """
+        source = self.model.__table__
+        items = self.item_model.__table__
+        conditions = self._eligible(before)
+
+        # 按日期索引取本批ID，再锁定并复核条件（期间被修改的单据留到下次）
+        candidates = conn.execute(
+            select(source.c.id).where(*conditions)
+            .order_by(source.c[self.date_column], source.c.id).limit(chunk_size)
+        ).scalars().all()
+        if not candidates:
+            return {'documents': 0, 'items': 0, 'candidates': 0}
+        ids = conn.execute(
+            select(source.c.id).where(source.c.id.in_(candidates), *conditions).with_for_update()
+        ).scalars().all()
+        if not ids:
+            return {'documents': 0, 'items': 0, 'candidates': len(candidates)}
+
+        archived_at = datetime.utcnow()
+        conn.execute(self.table.insert().from_select(
+            [column.name for column in source.columns] + ['archived_at'],
+            select(*source.columns, db.literal(archived_at)).where(source.c.id.in_(ids))
+        ))
+        item_count = conn.execute(self.item_table.insert().from_select(
+            [column.name for column in items.columns] + ['archived_at'],
+            select(*items.columns, db.literal(archived_at)).where(items.c[self.item_key].in_(ids))
+        )).rowcount
+        conn.execute(items.delete().where(items.c[self.item_key].in_(ids)))
+        documents = conn.execute(source.delete().where(source.c.id.in_(ids))).rowcount
+        return {'documents': documents, 'items': item_count, 'candidates': len(candidates)}
+
+    def run(self, engine, before, chunk_size: int = 500, max_chunks: Optional[int] = None) -> Dict[str, int]:
+        """
+        分批归档，每批一个事务
+
+        Args:
+            engine: SQLAlchemy引擎
+            before: 归档该日期之前的单据
+            chunk_size: 每批单据数
+            max_chunks: 最多执行的批数，None表示直到没有可归档的单据
+
+        Returns:
+            Dict[str, int]: 移动的单据数、明细数和批数
+        """
+        totals = {'documents': 0, 'items': 0, 'chunks': 0}
+        while max_chunks is None or totals['chunks'] < max_chunks:
+            with engine.begin() as conn:
+                moved = self.archive_chunk(conn, before, chunk_size)
+            totals['documents'] += moved['documents']
+            totals['items'] += moved['items']
+            totals['chunks'] += 1
+            if moved['candidates'] < chunk_size:
+                break
+        return totals
+
+    def find(self, document_id: int):
+        """
+        从归档表读取单据，构造与原表查询结果相同的（不属于会话的）模型对象
+
+        Args:
+            document_id: 单据ID
+
+        Returns:
+            单据对象，不存在或已删除时返回None
+        """
+        row = db.session.execute(
+            select(self.table).where(self.table.c.id == document_id, self.table.c.is_deleted.is_(False))
+        ).mappings().first()
+        if row is None:
+            return None
+
+        item_rows = db.session.execute(
+            select(self.item_table).where(self.item_table.c[self.item_key] == document_id)
+            .order_by(self.item_table.c.sort_order, self.item_table.c.id)
+        ).mappings().all()
+
+        document = self._detached(self.model, row)
+        set_committed_value(document, self.items_relation, [self._detached(self.item_model, item) for item in item_rows])
+
+        # 派生字段用到的多对一关系（客户、销售员、合同）仍在原表中
+        configure_mappers()
+        for prop in self.model.__mapper__.relationships:
+            if prop.direction is not MANYTOONE:
+                continue
+            local_key = next(iter(prop.local_columns)).key
+            target_id = row.get(local_key)
+            set_committed_value(
+                document, prop.key,
+                db.session.get(prop.mapper.class_, target_id) if target_id is not None else None
+            )
+        return document
+
+    @staticmethod
+    def _detached(model, row):
+        instance = model.__mapper__.class_manager.new_instance()
+        for column in model.__table__.columns:
+            set_committed_value(instance, column.key, row[column.name])
+        return instance
+
+def _quote_in_contract(source):
+    contracts = Contract.__table__
+    return exists().where(contracts.c.quote_id == source.c.id)
+
+QUOTE_ARCHIVE = DocumentArchive(
+    Quote, QuoteItem, quotes_archive, quote_items_archive,
+    items_relation='quote_items', item_key='quote_id', date_column='quote_date',
+    closed_statuses=('accepted', 'rejected', 'expired'), pinned=_quote_in_contract
+)
+ORDER_ARCHIVE = DocumentArchive(
+    Order, OrderItem, orders_archive, order_items_archive,
+    items_relation='order_items', item_key='order_id', date_column='order_date',
+    closed_statuses=('completed', 'cancelled')
+)
+
+# 名称 -> 归档（先报价后订单，与命令行参数对应）
+DOCUMENT_ARCHIVES = {archive.name: archive for archive in (QUOTE_ARCHIVE, ORDER_ARCHIVE)}
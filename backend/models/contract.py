@@ -1,10 +1,23 @@
 from . import db, BaseModel
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy.ext.hybrid import hybrid_property
 
 class Contract(BaseModel):
     """合同模型"""
     __tablename__ = 'contracts'
     
+    # 列表接口：is_deleted = FALSE [AND status/customer_id/sales_user_id = ?] ORDER BY created_at DESC, id DESC
+    # （索引末尾隐含主键，见 database/migrations/005_soft_delete_composite_indexes.sql）
+    __table_args__ = (
+        db.Index('idx_contracts_deleted_created', 'is_deleted', 'created_at'),
+        db.Index('idx_contracts_deleted_status_created', 'is_deleted', 'status', 'created_at'),
+        db.Index('idx_contracts_deleted_customer_created', 'is_deleted', 'customer_id', 'created_at'),
+        db.Index('idx_contracts_deleted_sales_created', 'is_deleted', 'sales_user_id', 'created_at'),
+        # 条件请求的表指纹：MAX(updated_at) 只读取索引末端
+        db.Index('idx_contracts_updated_at', 'updated_at'),
+    )
+    
     # 基本信息
     contract_number = db.Column(db.String(50), unique=True, nullable=False, comment='合同编号')
     title = db.Column(db.String(200), nullable=False, comment='合同标题')
@@ -30,13 +43,13 @@ class Contract(BaseModel):
     priority = db.Column(db.Enum('low', 'normal', 'high', 'urgent', name='contract_priority'), 
                         default='normal', nullable=False, comment='优先级')
     
-    # 合同内容
-    content = db.Column(db.Text, nullable=True, comment='合同内容')
-    terms_conditions = db.Column(db.Text, nullable=True, comment='条款和条件')
-    payment_terms = db.Column(db.Text, nullable=True, comment='付款条件')
-    delivery_terms = db.Column(db.Text, nullable=True, comment='交付条件')
-    warranty_terms = db.Column(db.Text, nullable=True, comment='保修条款')
-    notes = db.Column(db.Text, nullable=True, comment='备注')
+    # 合同内容（大文本，延迟加载组text，仅详情或include=text时读取）
+    content = db.deferred(db.Column(db.Text, nullable=True, comment='合同内容'), group='text')
+    terms_conditions = db.deferred(db.Column(db.Text, nullable=True, comment='条款和条件'), group='text')
+    payment_terms = db.deferred(db.Column(db.Text, nullable=True, comment='付款条件'), group='text')
+    delivery_terms = db.deferred(db.Column(db.Text, nullable=True, comment='交付条件'), group='text')
+    warranty_terms = db.deferred(db.Column(db.Text, nullable=True, comment='保修条款'), group='text')
+    notes = db.deferred(db.Column(db.Text, nullable=True, comment='备注'), group='text')
     
     # 签署信息
     signed_date = db.Column(db.DateTime, nullable=True, comment='签署日期')
@@ -52,6 +65,16 @@ class Contract(BaseModel):
     quote = db.relationship('Quote', backref='contracts', lazy=True)
     orders = db.relationship('Order', backref='contract', lazy=True)
     
+    # 序列化派生字段
+    serializer_extras = {
+        'payment_progress': {'columns': ('contract_amount', 'paid_amount')},
+        'is_overdue': {'columns': ('end_date', 'status')},
+        'customer_name': {'columns': ('customer_id',), 'relation': ('customer', ('name',))},
+        'sales_user_name': {'columns': ('sales_user_id',), 'relation': ('sales_user', ('real_name', 'username'))},
+        'quote_number': {'columns': ('quote_id',), 'relation': ('quote', ('quote_number',))}
+    }
+    serializer_default_includes = ('text',)
+    
     def __init__(self, title, customer_id, sales_user_id, contract_amount, **kwargs):
         self.title = title
         self.customer_id = customer_id
@@ -110,28 +133,55 @@ class Contract(BaseModel):
             self.remaining_amount = 0
         db.session.commit()
     
+    @hybrid_property
+    def payment_progress(self):
+        """付款进度百分比（保留两位小数）"""
+        if self.contract_amount and self.contract_amount > 0:
+            progress = Decimal(self.paid_amount or 0) * 100 / Decimal(self.contract_amount)
+            return progress.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return Decimal('0.00')
+    
+    @payment_progress.expression
+    def payment_progress(cls):
+        """付款进度的SQL表达式，可用于排序和筛选"""
+        return db.case(
+            (cls.contract_amount > 0, db.func.round(db.func.coalesce(cls.paid_amount, 0) * 100 / cls.contract_amount, 2)),
+            else_=0
+        )
+    
     def get_payment_progress(self):
         """获取付款进度百分比"""
-        if self.contract_amount > 0:
-            return (self.paid_amount / self.contract_amount) * 100
-        return 0
+        return self.payment_progress
     
+    @hybrid_property
     def is_overdue(self):
         """检查是否逾期"""
         if self.end_date and self.status in ['signed', 'executing']:
             return datetime.utcnow().date() > self.end_date
         return False
     
-    def to_dict(self):
+    @is_overdue.expression
+    def is_overdue(cls):
+        """逾期条件的SQL表达式（end_date范围条件可走idx_contracts_end_date）"""
+        return db.and_(
+            cls.end_date.isnot(None),
+            cls.end_date < datetime.utcnow().date(),
+            cls.status.in_(['signed', 'executing'])
+        )
+    
+    def to_dict(self, fields=None, include=None):
         """转换为字典"""
-        result = super().to_dict()
-        result['payment_progress'] = self.get_payment_progress()
-        result['is_overdue'] = self.is_overdue()
-        if self.customer:
+        plan = self.serializer_plan(fields, include)
+        result = super().to_dict(plan)
+        if plan.wants('payment_progress'):
+            result['payment_progress'] = self.payment_progress
+        if plan.wants('is_overdue'):
+            result['is_overdue'] = self.is_overdue
+        if plan.wants('customer_name') and self.customer:
             result['customer_name'] = self.customer.name
-        if self.sales_user:
+        if plan.wants('sales_user_name') and self.sales_user:
             result['sales_user_name'] = self.sales_user.real_name or self.sales_user.username
-        if self.quote:
+        if plan.wants('quote_number') and self.quote:
             result['quote_number'] = self.quote.quote_number
         return result
     
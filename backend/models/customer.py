@@ -1,10 +1,22 @@
 from . import db, BaseModel
+from .tag import Tag, customer_tags
 from datetime import datetime
 
 class Customer(BaseModel):
     """客户模型"""
     __tablename__ = 'customers'
     
+    # 列表/游标接口：is_deleted = FALSE [AND status/level/sales_user_id = ?] ORDER BY created_at DESC, id DESC
+    # （索引末尾隐含主键，见 database/migrations/005_soft_delete_composite_indexes.sql）
+    __table_args__ = (
+        db.Index('idx_customers_deleted_created', 'is_deleted', 'created_at'),
+        db.Index('idx_customers_deleted_status_created', 'is_deleted', 'status', 'created_at'),
+        db.Index('idx_customers_deleted_level_created', 'is_deleted', 'level', 'created_at'),
+        db.Index('idx_customers_deleted_sales_created', 'is_deleted', 'sales_user_id', 'created_at'),
+        # 条件请求的表指纹：MAX(updated_at) 只读取索引末端
+        db.Index('idx_customers_updated_at', 'updated_at'),
+    )
+    
     # 基本信息
     name = db.Column(db.String(100), nullable=False, comment='客户名称')
     company = db.Column(db.String(200), nullable=True, comment='公司名称')
@@ -44,13 +56,20 @@ class Customer(BaseModel):
     # 备注信息
     description = db.Column(db.Text, nullable=True, comment='客户描述')
     notes = db.Column(db.Text, nullable=True, comment='备注信息')
-    tags = db.Column(db.String(500), nullable=True, comment='标签（逗号分隔）')
+    tags = db.Column(db.String(500), nullable=True, comment='标签（逗号分隔，与customer_tags同步，用于展示）')
     
     # 关联关系
     sales_user = db.relationship('User', backref='customers', lazy=True)
     quotes = db.relationship('Quote', backref='customer', lazy=True)
     contracts = db.relationship('Contract', backref='customer', lazy=True)
     orders = db.relationship('Order', backref='customer', lazy=True)
+    tag_items = db.relationship('Tag', secondary=customer_tags, lazy=True)
+    
+    # 序列化派生字段
+    serializer_extras = {
+        'tags_list': {'columns': ('tags',)},
+        'sales_user_name': {'columns': ('sales_user_id',), 'relation': ('sales_user', ('real_name', 'username'))}
+    }
     
     def __init__(self, name, **kwargs):
         self.name = name
@@ -70,17 +89,91 @@ class Customer(BaseModel):
         return []
     
     def set_tags_list(self, tags_list):
-        """设置标签列表"""
-        if tags_list:
-            self.tags = ','.join([tag.strip() for tag in tags_list if tag.strip()])
-        else:
-            self.tags = None
+        """设置标签列表（同步标签关联表和标签计数，随客户一起提交）"""
+        names = Tag.normalize_names(tags_list or [])
+        self.tags = ','.join(names) if names else None
+        Tag.assign_to_customer(self, names)
+    
+    def delete(self):
+        """软删除客户，同时扣减标签计数"""
+        Tag.adjust_customer_count([tag.id for tag in self.tag_items], -1)
+        return super().delete()
+    
+    @classmethod
+    def deletion_blockers(cls, customer_ids, lock=False):
+        """
+        检查客户是否存在关联的报价、合同或订单（一条查询，每张关联表一个EXISTS子查询，
+        走各表的customer_id索引，不加载关联集合）
+        
+        Args:
+            customer_ids: 客户ID列表
+            lock: 是否锁定客户行（SELECT ... FOR UPDATE，检查到删除之间不能新增关联单据）
+            
+        Returns:
+            dict: 未删除的客户ID -> 存在关联数据的类型列表（quotes/contracts/orders，空列表表示可删除）
+        """
+        from .quote import Quote
+        from .contract import Contract
+        from .order import Order
+        
+        if not customer_ids:
+            return {}
+        dependents = (('quotes', Quote), ('contracts', Contract), ('orders', Order))
+        query = db.session.query(
+            cls.id,
+            *[db.exists().where(model.customer_id == cls.id).label(name) for name, model in dependents]
+        ).filter(cls.id.in_(customer_ids), cls.is_deleted.is_(False))
+        if lock:
+            query = query.with_for_update(of=cls)
+        return {
+            row.id: [name for name, _ in dependents if getattr(row, name)]
+            for row in query
+        }
+    
+    @classmethod
+    def bulk_soft_delete(cls, customer_ids):
+        """
+        批量软删除没有关联业务数据的客户：一条UPDATE删除，按标签分组扣减标签计数（不提交事务）
+        
+        批量UPDATE不触发ORM事件，概览缓存和跟进提醒通过updated_at感知变化。
+        
+        Args:
+            customer_ids: 客户ID列表
+            
+        Returns:
+            tuple: (已删除的ID列表, 不能删除的客户ID -> 关联数据类型列表, 不存在或已删除的ID列表)
+        """
+        blockers = cls.deletion_blockers(customer_ids, lock=True)
+        deleted = sorted(customer_id for customer_id, reasons in blockers.items() if not reasons)
+        blocked = {customer_id: reasons for customer_id, reasons in blockers.items() if reasons}
+        missing = sorted(set(customer_ids) - set(blockers))
+        if not deleted:
+            return deleted, blocked, missing
+        
+        # 每个标签扣减的数量 = 被删除客户中带该标签的客户数，扣减量相同的标签合并为一条UPDATE
+        tag_counts = db.session.query(
+            customer_tags.c.tag_id,
+            db.func.count()
+        ).filter(customer_tags.c.customer_id.in_(deleted)).group_by(customer_tags.c.tag_id).all()
+        
+        cls.query.filter(cls.id.in_(deleted), cls.is_deleted.is_(False)).update(
+            {cls.is_deleted: True, cls.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        by_delta = {}
+        for tag_id, count in tag_counts:
+            by_delta.setdefault(count, []).append(tag_id)
+        for count, tag_ids in by_delta.items():
+            Tag.adjust_customer_count(tag_ids, -count)
+        return deleted, blocked, missing
     
-    def to_dict(self):
+    def to_dict(self, fields=None, include=None):
         """转换为字典"""
-        result = super().to_dict()
-        result['tags_list'] = self.get_tags_list()
-        if self.sales_user:
+        plan = self.serializer_plan(fields, include)
+        result = super().to_dict(plan)
+        if plan.wants('tags_list'):
+            result['tags_list'] = self.get_tags_list()
+        if plan.wants('sales_user_name') and self.sales_user:
             result['sales_user_name'] = self.sales_user.real_name or self.sales_user.username
         return result
     
@@ -1,10 +1,33 @@
 from . import db, BaseModel
 from datetime import datetime
+from sqlalchemy.ext.hybrid import hybrid_property
+
+# 订单状态对应的交付进度
+DELIVERY_PROGRESS = {
+    'pending': 0,
+    'confirmed': 20,
+    'processing': 40,
+    'shipped': 70,
+    'delivered': 90,
+    'completed': 100,
+    'cancelled': 0
+}
 
 class Order(BaseModel):
     """订单模型"""
     __tablename__ = 'orders'
     
+    # 列表接口：is_deleted = FALSE [AND status/customer_id/sales_user_id = ?] ORDER BY created_at DESC, id DESC
+    # （索引末尾隐含主键，见 database/migrations/005_soft_delete_composite_indexes.sql）
+    __table_args__ = (
+        db.Index('idx_orders_deleted_created', 'is_deleted', 'created_at'),
+        db.Index('idx_orders_deleted_status_created', 'is_deleted', 'status', 'created_at'),
+        db.Index('idx_orders_deleted_customer_created', 'is_deleted', 'customer_id', 'created_at'),
+        db.Index('idx_orders_deleted_sales_created', 'is_deleted', 'sales_user_id', 'created_at'),
+        # 条件请求的表指纹：MAX(updated_at) 只读取索引末端
+        db.Index('idx_orders_updated_at', 'updated_at'),
+    )
+    
     # 基本信息
     order_number = db.Column(db.String(50), unique=True, nullable=False, comment='订单号')
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, comment='客户ID')
@@ -41,15 +64,26 @@ class Order(BaseModel):
     shipping_contact = db.Column(db.String(100), nullable=True, comment='收货联系人')
     shipping_phone = db.Column(db.String(20), nullable=True, comment='收货电话')
     
-    # 其他信息
-    description = db.Column(db.Text, nullable=True, comment='订单描述')
-    notes = db.Column(db.Text, nullable=True, comment='备注')
-    internal_notes = db.Column(db.Text, nullable=True, comment='内部备注')
+    # 其他信息（大文本，延迟加载组text，仅详情或include=text时读取）
+    description = db.deferred(db.Column(db.Text, nullable=True, comment='订单描述'), group='text')
+    notes = db.deferred(db.Column(db.Text, nullable=True, comment='备注'), group='text')
+    internal_notes = db.deferred(db.Column(db.Text, nullable=True, comment='内部备注'), group='text')
     
     # 关联关系
     sales_user = db.relationship('User', backref='orders', lazy=True)
     order_items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
     
+    # 序列化派生字段和可展开的关系
+    serializer_extras = {
+        'is_overdue': {'columns': ('required_date', 'status')},
+        'delivery_progress': {'columns': ('status',)},
+        'customer_name': {'columns': ('customer_id',), 'relation': ('customer', ('name',))},
+        'sales_user_name': {'columns': ('sales_user_id',), 'relation': ('sales_user', ('real_name', 'username'))},
+        'contract_number': {'columns': ('contract_id',), 'relation': ('contract', ('contract_number',))}
+    }
+    serializer_includes = {'order_items': 'order_items'}
+    serializer_default_includes = ('order_items', 'text')
+    
     def __init__(self, customer_id, sales_user_id, **kwargs):
         self.customer_id = customer_id
         self.sales_user_id = sales_user_id
@@ -67,8 +101,8 @@ class Order(BaseModel):
         ).count()
         return f'OD{today}{count + 1:04d}'
     
-    def calculate_totals(self):
-        """计算总金额"""
+    def calculate_totals(self, commit=True):
+        """计算总金额（commit=False时只修改对象，由调用方提交）"""
         # 计算小计
         self.subtotal = sum(item.total_price for item in self.order_items)
         
@@ -86,7 +120,8 @@ class Order(BaseModel):
         # 计算总金额
         self.total_amount = amount_before_tax + self.tax_amount + self.shipping_cost
         
-        db.session.commit()
+        if commit:
+            db.session.commit()
     
     def confirm_order(self):
         """确认订单"""
@@ -130,36 +165,51 @@ class Order(BaseModel):
             self.status = 'cancelled'
             db.session.commit()
     
+    @hybrid_property
     def is_overdue(self):
         """检查是否逾期"""
         if self.required_date and self.status not in ['delivered', 'completed', 'cancelled']:
             return datetime.utcnow().date() > self.required_date
         return False
     
+    @is_overdue.expression
+    def is_overdue(cls):
+        """逾期条件的SQL表达式（required_date范围条件可走idx_orders_required_date）"""
+        return db.and_(
+            cls.required_date.isnot(None),
+            cls.required_date < datetime.utcnow().date(),
+            cls.status.notin_(['delivered', 'completed', 'cancelled'])
+        )
+    
+    @hybrid_property
+    def delivery_progress(self):
+        """交付进度"""
+        return DELIVERY_PROGRESS.get(self.status, 0)
+    
+    @delivery_progress.expression
+    def delivery_progress(cls):
+        """交付进度的SQL表达式，可用于排序和筛选"""
+        return db.case(DELIVERY_PROGRESS, value=cls.status, else_=0)
+    
     def get_delivery_progress(self):
         """获取交付进度"""
-        status_progress = {
-            'pending': 0,
-            'confirmed': 20,
-            'processing': 40,
-            'shipped': 70,
-            'delivered': 90,
-            'completed': 100,
-            'cancelled': 0
-        }
-        return status_progress.get(self.status, 0)
-    
-    def to_dict(self):
+        return self.delivery_progress
+    
+    def to_dict(self, fields=None, include=None):
         """转换为字典"""
-        result = super().to_dict()
-        result['is_overdue'] = self.is_overdue()
-        result['delivery_progress'] = self.get_delivery_progress()
-        result['order_items'] = [item.to_dict() for item in self.order_items]
-        if self.customer:
+        plan = self.serializer_plan(fields, include)
+        result = super().to_dict(plan)
+        if plan.wants('is_overdue'):
+            result['is_overdue'] = self.is_overdue
+        if plan.wants('delivery_progress'):
+            result['delivery_progress'] = self.delivery_progress
+        if plan.wants('order_items'):
+            result['order_items'] = [item.to_dict() for item in self.order_items]
+        if plan.wants('customer_name') and self.customer:
             result['customer_name'] = self.customer.name
-        if self.sales_user:
+        if plan.wants('sales_user_name') and self.sales_user:
             result['sales_user_name'] = self.sales_user.real_name or self.sales_user.username
-        if self.contract:
+        if plan.wants('contract_number') and self.contract:
             result['contract_number'] = self.contract.contract_number
         return result
     
@@ -214,9 +264,9 @@ class OrderItem(BaseModel):
         """检查是否完全交付"""
         return self.delivered_quantity >= self.quantity
     
-    def to_dict(self):
+    def to_dict(self, fields=None, include=None):
         """转换为字典"""
-        result = super().to_dict()
+        result = super().to_dict(fields, include)
         result['remaining_quantity'] = self.get_remaining_quantity()
         result['is_fully_delivered'] = self.is_fully_delivered()
         return result
@@ -1,10 +1,45 @@
 from . import db, BaseModel
 from datetime import datetime, timedelta
 
+def copy_rows(target, source, where, columns, values):
+    """
+    用一条 INSERT ... SELECT 在数据库端复制多行（不把数据读到应用中）
+    
+    Args:
+        target: 目标表
+        source: 来源表
+        where: 来源行的条件
+        columns: 目标列 -> 来源列（同名或改名复制的列）
+        values: 目标列 -> 固定值
+    
+    Returns:
+        int: 复制的行数
+    """
+    names = list(columns) + list(values)
+    select = db.select(
+        *[source.c[columns[name]] for name in columns],
+        *[db.literal(value, target.c[name].type) for name, value in values.items()]
+    ).where(where).order_by(source.c.id)
+    return db.session.execute(target.insert().from_select(names, select)).rowcount
+
+def _same_columns(table, *excluded):
+    return {column.name: column.name for column in table.columns if column.name not in excluded}
+
 class Quote(BaseModel):
     """报价模型"""
     __tablename__ = 'quotes'
     
+    # 列表接口：is_deleted = FALSE [AND status/customer_id/sales_user_id = ?] ORDER BY created_at DESC, id DESC
+    # （索引末尾隐含主键，见 database/migrations/005_soft_delete_composite_indexes.sql）
+    __table_args__ = (
+        db.Index('idx_quotes_deleted_created', 'is_deleted', 'created_at'),
+        db.Index('idx_quotes_deleted_status_created', 'is_deleted', 'status', 'created_at'),
+        db.Index('idx_quotes_deleted_customer_created', 'is_deleted', 'customer_id', 'created_at'),
+        db.Index('idx_quotes_deleted_sales_created', 'is_deleted', 'sales_user_id', 'created_at'),
+        # 条件请求的表指纹：MAX(updated_at) 只读取索引末端
+        db.Index('idx_quotes_updated_at', 'updated_at'),
+    )
+    
     # 基本信息
     quote_number = db.Column(db.String(50), unique=True, nullable=False, comment='报价单号')
     title = db.Column(db.String(200), nullable=False, comment='报价标题')
@@ -31,10 +66,10 @@ class Quote(BaseModel):
     priority = db.Column(db.Enum('low', 'normal', 'high', 'urgent', name='quote_priority'), 
                         default='normal', nullable=False, comment='优先级')
     
-    # 其他信息
-    description = db.Column(db.Text, nullable=True, comment='报价描述')
-    terms_conditions = db.Column(db.Text, nullable=True, comment='条款和条件')
-    notes = db.Column(db.Text, nullable=True, comment='备注')
+    # 其他信息（大文本，延迟加载组text，仅详情或include=text时读取）
+    description = db.deferred(db.Column(db.Text, nullable=True, comment='报价描述'), group='text')
+    terms_conditions = db.deferred(db.Column(db.Text, nullable=True, comment='条款和条件'), group='text')
+    notes = db.deferred(db.Column(db.Text, nullable=True, comment='备注'), group='text')
     
     # 时间信息
     sent_date = db.Column(db.DateTime, nullable=True, comment='发送日期')
@@ -44,6 +79,15 @@ class Quote(BaseModel):
     sales_user = db.relationship('User', backref='quotes', lazy=True)
     quote_items = db.relationship('QuoteItem', backref='quote', lazy=True, cascade='all, delete-orphan')
     
+    # 序列化派生字段和可展开的关系
+    serializer_extras = {
+        'is_expired': {'columns': ('valid_until',)},
+        'customer_name': {'columns': ('customer_id',), 'relation': ('customer', ('name',))},
+        'sales_user_name': {'columns': ('sales_user_id',), 'relation': ('sales_user', ('real_name', 'username'))}
+    }
+    serializer_includes = {'quote_items': 'quote_items'}
+    serializer_default_includes = ('quote_items', 'text')
+    
     def __init__(self, title, customer_id, sales_user_id, **kwargs):
         self.title = title
         self.customer_id = customer_id
@@ -64,10 +108,10 @@ class Quote(BaseModel):
         ).count()
         return f'QT{today}{count + 1:04d}'
     
-    def calculate_totals(self):
-        """计算总金额"""
-        # 计算小计
-        self.subtotal = sum(item.total_price for item in self.quote_items)
+    def calculate_totals(self, commit=True):
+        """计算总金额（commit=False时只修改对象，由调用方提交）"""
+        # 计算小计（不含已删除的明细）
+        self.subtotal = sum(item.total_price for item in self.quote_items if not item.is_deleted)
         
         # 计算折扣金额
         if self.discount_rate > 0:
@@ -83,7 +127,8 @@ class Quote(BaseModel):
         # 计算总金额
         self.total_amount = amount_before_tax + self.tax_amount
         
-        db.session.commit()
+        if commit:
+            db.session.commit()
     
     def send_quote(self):
         """发送报价"""
@@ -103,20 +148,204 @@ class Quote(BaseModel):
         self.response_date = datetime.utcnow()
         db.session.commit()
     
+    @classmethod
+    def expire_overdue(cls, today=None, chunk_size=500):
+        """
+        将已过有效期的草稿/已发送报价批量置为expired
+        
+        按(status, valid_until)索引分批取ID，再用带状态条件的UPDATE更新，
+        多个进程同时执行时已被其他进程更新的行不会重复计数。
+        """
+        today = today or datetime.utcnow().date()
+        open_status = ('draft', 'sent')
+        total = 0
+        while True:
+            ids = [quote_id for (quote_id,) in db.session.query(cls.id).filter(
+                cls.status.in_(open_status),
+                cls.valid_until < today
+            ).order_by(cls.valid_until, cls.id).limit(chunk_size)]
+            if not ids:
+                break
+            
+            total += cls.query.filter(
+                cls.id.in_(ids),
+                cls.status.in_(open_status),
+                cls.valid_until < today
+            ).update(
+                {cls.status: 'expired', cls.updated_at: datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.session.commit()
+            
+            if len(ids) < chunk_size:
+                break
+        return total
+    
+    @classmethod
+    def copy_from(cls, quote_id, sales_user_id=None):
+        """
+        复制报价为新的草稿（不提交事务）
+        
+        表头和明细各用一条 INSERT ... SELECT 复制，单号一次分配，最后计算一次总金额，
+        往返次数与明细数量无关。
+        
+        Args:
+            quote_id: 来源报价ID
+            sales_user_id: 新报价的销售员，默认与来源相同
+        
+        Returns:
+            Quote: 新报价，来源不存在或已删除时返回None
+        """
+        if db.session.query(cls.id).filter_by(id=quote_id, is_deleted=False).first() is None:
+            return None
+        
+        quotes = cls.__table__
+        items = QuoteItem.__table__
+        now = datetime.utcnow()
+        quote_number = cls.reserve_numbers('quote_number', 'QT')[0]
+        values = {
+            'quote_number': quote_number,
+            'status': 'draft',
+            'quote_date': now.date(),
+            'valid_until': (now + timedelta(days=30)).date(),
+            'sent_date': None,
+            'response_date': None,
+            'created_at': now,
+            'updated_at': now,
+            'is_deleted': False
+        }
+        if sales_user_id is not None:
+            values['sales_user_id'] = sales_user_id
+        copy_rows(quotes, quotes, quotes.c.id == quote_id, _same_columns(quotes, 'id', *values), values)
+        new_id = db.session.query(cls.id).filter_by(quote_number=quote_number).scalar()
+        
+        item_values = {'quote_id': new_id, 'created_at': now, 'updated_at': now}
+        copy_rows(
+            items, items,
+            db.and_(items.c.quote_id == quote_id, items.c.is_deleted.is_(False)),
+            _same_columns(items, 'id', *item_values), item_values
+        )
+        
+        quote = db.session.get(cls, new_id)
+        quote.calculate_totals(commit=False)
+        # 读回写入DECIMAL列后（四舍五入到分）的金额
+        db.session.flush()
+        db.session.refresh(quote)
+        return quote
+    
+    def convert_to_contract(self, create_order=True, contract_values=None, order_values=None):
+        """
+        由报价生成合同（及订单和订单明细），不提交事务
+        
+        先按未删除的明细重新计算并写回报价金额，合同金额和订单金额都由此复制；
+        合同、订单表头和订单明细各用一条 INSERT ... SELECT 从报价复制，
+        编号一次分配，订单总金额最后计算一次。调用方负责检查报价状态并锁定报价行。
+        
+        Args:
+            create_order: 是否同时生成订单
+            contract_values: 合同的其他字段（标题、起止日期、付款/交付条件等）
+            order_values: 订单的其他字段（要求交付日期、配送信息、运费等）
+        
+        Returns:
+            tuple: (合同, 订单或None)
+        """
+        from .contract import Contract
+        from .order import Order, OrderItem
+        
+        quotes = Quote.__table__
+        now = datetime.utcnow()
+        self.calculate_totals(commit=False)
+        db.session.flush()
+        
+        contracts = Contract.__table__
+        contract_number = Contract.reserve_numbers('contract_number', 'CT')[0]
+        values = {
+            'title': self.title,
+            'contract_date': now.date(),
+            'paid_amount': 0,
+            'status': 'draft',
+            'created_at': now,
+            'updated_at': now,
+            'is_deleted': False
+        }
+        values.update(contract_values or {})
+        values['contract_number'] = contract_number
+        columns = {
+            'customer_id': 'customer_id',
+            'sales_user_id': 'sales_user_id',
+            'quote_id': 'id',
+            'currency': 'currency',
+            'exchange_rate': 'exchange_rate',
+            'contract_amount': 'total_amount',
+            'remaining_amount': 'total_amount',
+            'priority': 'priority',
+            'terms_conditions': 'terms_conditions',
+            'notes': 'notes'
+        }
+        copy_rows(contracts, quotes, quotes.c.id == self.id,
+                  {name: source for name, source in columns.items() if name not in values}, values)
+        contract = Contract.query.filter_by(contract_number=contract_number).one()
+        
+        if not create_order:
+            return contract, None
+        
+        orders = Order.__table__
+        order_number = Order.reserve_numbers('order_number', 'OD')[0]
+        values = {
+            'order_date': now.date(),
+            'shipping_cost': 0,
+            'status': 'pending',
+            'created_at': now,
+            'updated_at': now,
+            'is_deleted': False
+        }
+        values.update(order_values or {})
+        values.update({'order_number': order_number, 'contract_id': contract.id})
+        columns = {
+            name: name for name in (
+                'customer_id', 'sales_user_id', 'currency', 'exchange_rate', 'subtotal', 'discount_rate',
+                'discount_amount', 'tax_rate', 'tax_amount', 'total_amount', 'priority', 'description', 'notes'
+            )
+        }
+        copy_rows(orders, quotes, quotes.c.id == self.id,
+                  {name: source for name, source in columns.items() if name not in values}, values)
+        order = Order.query.filter_by(order_number=order_number).one()
+        
+        quote_items = QuoteItem.__table__
+        item_values = {'order_id': order.id, 'delivered_quantity': 0, 'created_at': now, 'updated_at': now}
+        copy_rows(
+            OrderItem.__table__, quote_items,
+            db.and_(quote_items.c.quote_id == self.id, quote_items.c.is_deleted.is_(False)),
+            {
+                name: name for name in (
+                    'product_name', 'product_code', 'description', 'specification', 'unit',
+                    'quantity', 'unit_price', 'total_price', 'sort_order', 'notes', 'is_deleted'
+                )
+            },
+            item_values
+        )
+        order.calculate_totals(commit=False)
+        db.session.flush()
+        db.session.refresh(order)
+        return contract, order
+    
     def is_expired(self):
         """检查是否过期"""
         if self.valid_until:
             return datetime.utcnow().date() > self.valid_until
         return False
     
-    def to_dict(self):
+    def to_dict(self, fields=None, include=None):
         """转换为字典"""
-        result = super().to_dict()
-        result['is_expired'] = self.is_expired()
-        result['quote_items'] = [item.to_dict() for item in self.quote_items]
-        if self.customer:
+        plan = self.serializer_plan(fields, include)
+        result = super().to_dict(plan)
+        if plan.wants('is_expired'):
+            result['is_expired'] = self.is_expired()
+        if plan.wants('quote_items'):
+            result['quote_items'] = [item.to_dict() for item in self.quote_items]
+        if plan.wants('customer_name') and self.customer:
             result['customer_name'] = self.customer.name
-        if self.sales_user:
+        if plan.wants('sales_user_name') and self.sales_user:
             result['sales_user_name'] = self.sales_user.real_name or self.sales_user.username
         return result
     
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 读写分离会话
+
+配置了 replica 绑定（SQLALCHEMY_BINDS['replica']）时，请求内的纯SELECT语句
+按 g.db_route 路由到只读副本，其余情况一律使用主库：
+- 请求外（命令行、后台任务）
+- INSERT/UPDATE/DELETE、文本SQL，以及flush期间和会话中有未提交修改时
+- g.db_route 不是 'replica'（由 utils.replica 按请求方法、读己之写窗口和副本状态决定）
+"""
+
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+
+# 只读副本在SQLALCHEMY_BINDS中的键
+REPLICA_BIND_KEY = 'replica'
+
+class RoutingSession(Session):
+    """
+    按请求路由只读查询的会话
+    """
+
+    def _use_replica(self, clause) -> bool:
+        if clause is None or not getattr(clause, 'is_select', False):
+            return False
+        if self._flushing or self.new or self.dirty or self.deleted:
+            return False
+        return has_request_context() and g.get('db_route') == REPLICA_BIND_KEY
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(clause):
+            engine = self._db.engines.get(REPLICA_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,131 @@
+"""
+模型序列化计划
+
+根据请求的字段（fields）和展开的关系（include）为每个模型生成序列化计划：
+1. 输出哪些列、哪些派生字段、展开哪些集合关系
+2. 对应的查询加载选项：主表只取需要的列（load_only），
+   派生字段依赖的多对一关系用joinedload一次取回，展开的集合用selectinload批量加载
+3. 延迟加载组（db.deferred(..., group=...)）中的大文本列默认不读取，
+   通过include指定组名或在fields中直接列出时才读取
+4. 未指定include时按模型的默认展开输出完整数据；指定了fields时不使用默认展开，
+   只读取fields和include中列出的列、关系和延迟加载组
+
+计划按 (模型, fields, include) 缓存，首次使用后重复请求不再重新计算。
+"""
+
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import configure_mappers, joinedload, load_only, selectinload
+
+class SerializerPlan:
+    """
+    单个模型的序列化计划
+    """
+
+    def __init__(self, model, fields: Optional[FrozenSet[str]], include: Optional[FrozenSet[str]]):
+        column_names = [column.name for column in model.__table__.columns]
+        extras = model.serializer_extras
+        includes = model.serializer_includes
+        deferred = {prop.key: prop.group for prop in inspect(model).column_attrs if prop.deferred}
+
+        # 默认展开的关系和延迟加载组只用于完整输出，指定了fields时只读取fields或include中列出的内容
+        if include is None:
+            include = frozenset(model.serializer_default_includes) if fields is None else frozenset()
+        unknown = [name for name in include if name not in includes and name not in deferred.values()]
+        if unknown:
+            raise ValueError(f"不支持展开的关系: {', '.join(sorted(unknown))}")
+        self.groups = frozenset(name for name in include if name in deferred.values())
+
+        if fields is None:
+            self.columns = tuple(
+                name for name in column_names
+                if name not in deferred or deferred[name] in self.groups
+            )
+            self.extras = frozenset(extras)
+            self.includes = frozenset(name for name in include if name in includes)
+        else:
+            unknown = [
+                name for name in fields
+                if name not in column_names and name not in extras and name not in includes
+            ]
+            if unknown:
+                raise ValueError(f"不支持的字段: {', '.join(sorted(unknown))}")
+            # 主键始终返回，便于前端定位记录
+            self.columns = tuple(
+                name for name in column_names
+                if name == 'id' or name in fields or deferred.get(name) in self.groups
+            )
+            self.extras = frozenset(name for name in extras if name in fields)
+            self.includes = frozenset(name for name in includes if name in include or name in fields)
+
+        self.model = model
+        self._options = None
+
+    def wants(self, name: str) -> bool:
+        """
+        是否输出指定的派生字段或展开关系
+        """
+        return name in self.extras or name in self.includes
+
+    @property
+    def load_options(self) -> tuple:
+        """
+        查询加载选项，与序列化实际访问的列和关系一致
+        """
+        if self._options is None:
+            self._options = self._build_options()
+        return self._options
+
+    def _build_options(self) -> tuple:
+        configure_mappers()
+        model = self.model
+
+        columns = set(self.columns)
+        relations = {}
+        for name in self.extras:
+            spec = model.serializer_extras[name]
+            columns.update(spec.get('columns', ()))
+            if 'relation' in spec:
+                relation, related_columns = spec['relation']
+                relations.setdefault(relation, set()).update(related_columns)
+
+        options = [load_only(*[getattr(model, name) for name in sorted(columns)])]
+        for relation, related_columns in sorted(relations.items()):
+            attribute = getattr(model, relation)
+            target = attribute.property.mapper.class_
+            options.append(
+                joinedload(attribute).load_only(*[getattr(target, name) for name in sorted(related_columns)])
+            )
+        for name in sorted(self.includes):
+            options.append(selectinload(getattr(model, model.serializer_includes[name])))
+        return tuple(options)
+
+@lru_cache(maxsize=256)
+def _cached_plan(model, fields, include) -> SerializerPlan:
+    return SerializerPlan(model, fields, include)
+
+def get_serializer_plan(model, fields: Optional[Iterable[str]] = None,
+                        include: Optional[Iterable[str]] = None) -> SerializerPlan:
+    """
+    获取模型的序列化计划
+
+    Args:
+        model: 模型类
+        fields: 需要的字段，None表示全部
+        include: 需要展开的关系，None表示模型默认展开的关系
+
+    Returns:
+        SerializerPlan: 序列化计划
+
+    Raises:
+        ValueError: 字段或关系不存在
+    """
+    if isinstance(fields, SerializerPlan):
+        return fields
+    if fields is not None and not isinstance(fields, frozenset):
+        fields = frozenset(fields)
+    if include is not None and not isinstance(include, frozenset):
+        include = frozenset(include)
+    return _cached_plan(model, fields, include)
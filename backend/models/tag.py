@@ -0,0 +1,85 @@
+from . import db, BaseModel
+from sqlalchemy.exc import IntegrityError
+
+# 客户-标签关联表（主键 customer_id+tag_id，另建 tag_id+customer_id 索引用于按标签筛选客户）
+customer_tags = db.Table(
+    'customer_tags',
+    db.Column('customer_id', db.Integer, db.ForeignKey('customers.id'), primary_key=True, comment='客户ID'),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True, comment='标签ID'),
+    db.Index('idx_customer_tags_tag', 'tag_id', 'customer_id')
+)
+
+class Tag(BaseModel):
+    """标签模型"""
+    __tablename__ = 'tags'
+
+    # 条件请求的表指纹：MAX(updated_at) 只读取索引末端
+    __table_args__ = (
+        db.Index('idx_tags_updated_at', 'updated_at'),
+    )
+
+    name = db.Column(db.String(50), unique=True, nullable=False, comment='标签名称')
+    customer_count = db.Column(db.Integer, default=0, nullable=False, comment='关联客户数（未删除）')
+
+    def __init__(self, name, **kwargs):
+        self.name = name
+        self.customer_count = 0
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+
+    @staticmethod
+    def normalize_names(names):
+        """规范化标签名：去空白、去重（保持顺序）、截断到列长度"""
+        result = []
+        for name in names:
+            name = (name or '').strip()[:50]
+            if name and name not in result:
+                result.append(name)
+        return result
+
+    @classmethod
+    def get_or_create(cls, names):
+        """按名称获取标签，不存在的创建（并发创建同名标签时回退为查询）"""
+        if not names:
+            return {}
+        tags = {tag.name: tag for tag in cls.query.filter(cls.name.in_(names)).all()}
+        for name in names:
+            if name in tags:
+                continue
+            tag = cls(name)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(tag)
+            except IntegrityError:
+                tag = cls.query.filter_by(name=name).one()
+            tags[name] = tag
+        return tags
+
+    @classmethod
+    def adjust_customer_count(cls, tag_ids, delta):
+        """在数据库端原子调整标签计数"""
+        if tag_ids:
+            cls.query.filter(cls.id.in_(tag_ids)).update(
+                {cls.customer_count: cls.customer_count + delta},
+                synchronize_session=False
+            )
+
+    @classmethod
+    def assign_to_customer(cls, customer, names):
+        """设置客户的标签关联，并按增减同步计数（不提交事务）"""
+        current = {tag.name: tag for tag in customer.tag_items}
+        tags = cls.get_or_create(names)
+        added = [tags[name].id for name in names if name not in current]
+        removed = [tag.id for name, tag in current.items() if name not in tags]
+        customer.tag_items = [tags[name] for name in names]
+        if not customer.is_deleted:
+            cls.adjust_customer_count(added, 1)
+            cls.adjust_customer_count(removed, -1)
+
+    def to_dict(self, fields=None, include=None):
+        """转换为字典"""
+        return {'id': self.id, 'name': self.name, 'customer_count': self.customer_count}
+
+    def __repr__(self):
+        return f'<Tag {self.name}>'
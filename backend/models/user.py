@@ -6,6 +6,11 @@ class User(BaseModel):
     """用户模型"""
     __tablename__ = 'users'
     
+    # 条件请求的表指纹：MAX(updated_at) 只读取索引末端
+    __table_args__ = (
+        db.Index('idx_users_updated_at', 'updated_at'),
+    )
+    
     username = db.Column(db.String(80), unique=True, nullable=False, comment='用户名')
     email = db.Column(db.String(120), unique=True, nullable=False, comment='邮箱')
     password_hash = db.Column(db.String(255), nullable=False, comment='密码哈希')
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from models import db, User
+from utils.shedding import route_class
 from datetime import timedelta
 import re
 
@@ -125,6 +126,7 @@ def login():
         return jsonify({'error': f'登录失败: {str(e)}'}), 500
 
 @auth_bp.route('/refresh', methods=['POST'])
+@route_class('cheap')
 @jwt_required(refresh=True)
 def refresh():
     """刷新访问令牌"""
@@ -1,16 +1,104 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Contract, Customer, Quote
+from models import db, Contract, Customer, Quote, User
+from sqlalchemy import or_
+from utils.helpers import parse_fieldset
+from utils.conditional import conditional_get, daily, row_fingerprint, table_fingerprint
+
+# 列表可排序字段（sort=字段 升序，sort=-字段 降序）
+SORT_FIELDS = {
+    'created_at': Contract.created_at,
+    'payment_progress': Contract.payment_progress,
+    'end_date': Contract.end_date,
+    'contract_amount': Contract.contract_amount
+}
 
 # 创建合同管理蓝图
 contracts_bp = Blueprint('contracts', __name__)
 
 @contracts_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: daily(table_fingerprint(Contract, Customer, User, Quote)))
 def get_contracts():
     """获取合同列表"""
-    # TODO: 实现合同列表获取功能
-    return jsonify({'message': '合同列表功能待实现'}), 200
+    try:
+        # 获取查询参数
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        search = request.args.get('search', '').strip()
+        status = request.args.get('status', '')
+        customer_id = request.args.get('customer_id', type=int)
+        sales_user_id = request.args.get('sales_user_id', type=int)
+        overdue = request.args.get('overdue', '').lower()
+        sort = request.args.get('sort', '-created_at')
+        fields = parse_fieldset(request.args.get('fields'))
+        # 列表默认不展开明细，需要时通过include指定
+        include = parse_fieldset(request.args.get('include')) or frozenset()
+        
+        try:
+            plan = Contract.serializer_plan(fields, include)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # 构建查询（只取序列化需要的列和关联）
+        query = Contract.query.options(*plan.load_options).filter_by(is_deleted=False)
+        
+        # 搜索条件
+        if search:
+            query = query.filter(
+                or_(
+                    Contract.contract_number.contains(search),
+                    Contract.title.contains(search)
+                )
+            )
+        
+        # 状态筛选
+        if status:
+            query = query.filter_by(status=status)
+        
+        # 客户筛选
+        if customer_id:
+            query = query.filter_by(customer_id=customer_id)
+        
+        # 销售员筛选
+        if sales_user_id:
+            query = query.filter_by(sales_user_id=sales_user_id)
+        
+        # 逾期筛选（SQL表达式，日期范围条件可走索引）
+        if overdue in ('true', '1'):
+            query = query.filter(Contract.is_overdue)
+        elif overdue in ('false', '0'):
+            query = query.filter(db.not_(Contract.is_overdue))
+        
+        # 排序
+        sort_column = SORT_FIELDS.get(sort.lstrip('-'))
+        if sort_column is None:
+            return jsonify({'error': f"不支持的排序字段: {sort.lstrip('-')}"}), 400
+        query = query.order_by(sort_column.desc() if sort.startswith('-') else sort_column.asc(), Contract.id.desc())
+        
+        # 分页
+        pagination = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        
+        contracts = [contract.to_dict(plan) for contract in pagination.items]
+        
+        return jsonify({
+            'contracts': contracts,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_prev': pagination.has_prev,
+                'has_next': pagination.has_next
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取合同列表失败: {str(e)}'}), 500
 
 @contracts_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -21,10 +109,32 @@ def create_contract():
 
 @contracts_bp.route('/<int:contract_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda contract_id: daily(row_fingerprint(Contract, contract_id)))
 def get_contract(contract_id):
     """获取合同详情"""
-    # TODO: 实现合同详情获取功能
-    return jsonify({'message': '合同详情功能待实现'}), 200
+    try:
+        try:
+            plan = Contract.serializer_plan(
+                parse_fieldset(request.args.get('fields')),
+                parse_fieldset(request.args.get('include'))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        contract = Contract.query.options(*plan.load_options).filter_by(
+            id=contract_id,
+            is_deleted=False
+        ).first()
+        
+        if not contract:
+            return jsonify({'error': '合同不存在'}), 404
+        
+        return jsonify({
+            'contract': contract.to_dict(plan)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取合同详情失败: {str(e)}'}), 500
 
 @contracts_bp.route('/<int:contract_id>', methods=['PUT'])
 @jwt_required()
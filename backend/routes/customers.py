@@ -1,51 +1,101 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Customer, User
+from models import db, Customer, User, Tag, customer_tags, Quote, Contract, Order
 from sqlalchemy import or_
-from datetime import datetime
+from datetime import datetime, timedelta
+from utils.helpers import parse_fieldset, encode_cursor, decode_cursor
+from utils.conditional import conditional_get, daily, row_fingerprint, table_fingerprint
+from utils.fanout import fan_out
+from utils.overview import get_overview_cache
+from utils.shedding import route_class
 
 # 创建客户管理蓝图
 customers_bp = Blueprint('customers', __name__)
 
+def _filter_customers(query):
+    """
+    按查询参数（search/status/level/sales_user_id/tags/tag_mode）筛选客户，列表和游标接口共用
+    
+    Args:
+        query: 客户查询
+        
+    Returns:
+        筛选后的查询
+        
+    Raises:
+        ValueError: 参数错误
+    """
+    search = request.args.get('search', '').strip()
+    status = request.args.get('status', '')
+    level = request.args.get('level', '')
+    sales_user_id = request.args.get('sales_user_id', type=int)
+    tag_names = Tag.normalize_names((request.args.get('tags') or '').split(','))
+    tag_mode = request.args.get('tag_mode', 'any')
+    
+    # 搜索条件
+    if search:
+        query = query.filter(
+            or_(
+                Customer.name.contains(search),
+                Customer.company.contains(search),
+                Customer.contact_person.contains(search),
+                Customer.phone.contains(search),
+                Customer.email.contains(search)
+            )
+        )
+    
+    # 状态筛选
+    if status:
+        query = query.filter_by(status=status)
+    
+    # 等级筛选
+    if level:
+        query = query.filter_by(level=level)
+    
+    # 销售员筛选
+    if sales_user_id:
+        query = query.filter_by(sales_user_id=sales_user_id)
+    
+    # 标签筛选（any: 含任一标签，all: 含全部标签），走customer_tags的tag_id索引
+    if tag_names:
+        if tag_mode not in ('any', 'all'):
+            raise ValueError('tag_mode只能为any或all')
+        tag_ids = [tag_id for (tag_id,) in db.session.query(Tag.id).filter(Tag.name.in_(tag_names))]
+        if tag_mode == 'all' and len(tag_ids) < len(tag_names):
+            tag_ids = []
+        tagged = db.session.query(customer_tags.c.customer_id).filter(customer_tags.c.tag_id.in_(tag_ids))
+        if tag_mode == 'all':
+            tagged = tagged.group_by(customer_tags.c.customer_id).having(
+                db.func.count(customer_tags.c.tag_id) == len(tag_ids)
+            )
+        query = query.filter(Customer.id.in_(tagged))
+    
+    return query
+
 @customers_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: table_fingerprint(Customer, User))
 def get_customers():
     """获取客户列表"""
     try:
         # 获取查询参数
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
-        search = request.args.get('search', '').strip()
-        status = request.args.get('status', '')
-        level = request.args.get('level', '')
-        sales_user_id = request.args.get('sales_user_id', type=int)
-        
-        # 构建查询
-        query = Customer.query.filter_by(is_deleted=False)
-        
-        # 搜索条件
-        if search:
-            query = query.filter(
-                or_(
-                    Customer.name.contains(search),
-                    Customer.company.contains(search),
-                    Customer.contact_person.contains(search),
-                    Customer.phone.contains(search),
-                    Customer.email.contains(search)
-                )
+        fields = parse_fieldset(request.args.get('fields'))
+        include = parse_fieldset(request.args.get('include'))
+        
+        try:
+            plan = Customer.serializer_plan(fields, include)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # 构建查询（只取序列化需要的列和关联）
+        try:
+            query = _filter_customers(
+                Customer.query.options(*plan.load_options).filter_by(is_deleted=False)
             )
-        
-        # 状态筛选
-        if status:
-            query = query.filter_by(status=status)
-        
-        # 等级筛选
-        if level:
-            query = query.filter_by(level=level)
-        
-        # 销售员筛选
-        if sales_user_id:
-            query = query.filter_by(sales_user_id=sales_user_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # 排序
         query = query.order_by(Customer.created_at.desc())
@@ -57,7 +107,7 @@ def get_customers():
             error_out=False
         )
         
-        customers = [customer.to_dict() for customer in pagination.items]
+        customers = [customer.to_dict(plan) for customer in pagination.items]
         
         return jsonify({
             'customers': customers,
@@ -74,12 +124,75 @@ def get_customers():
     except Exception as e:
         return jsonify({'error': f'获取客户列表失败: {str(e)}'}), 500
 
+@customers_bp.route('/feed', methods=['GET'])
+@jwt_required()
+@conditional_get(lambda: table_fingerprint(Customer, User))
+def get_customer_feed():
+    """
+    按游标获取客户列表（用于前端无限滚动）
+    
+    与列表接口排序相同（created_at、id倒序），以上一批最后一行的排序键作为游标，
+    走created_at索引定位，不随滚动深度变慢；total只在第一批（with_total=1）时计算。
+    """
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        after = request.args.get('after')
+        with_total = request.args.get('with_total', '').lower() in ('true', '1')
+        
+        try:
+            plan = Customer.serializer_plan(
+                parse_fieldset(request.args.get('fields')),
+                parse_fieldset(request.args.get('include'))
+            )
+            query = _filter_customers(Customer.query.filter_by(is_deleted=False))
+            created_at, last_id = decode_cursor(after, 2) if after else (None, None)
+            if after:
+                created_at = datetime.fromisoformat(created_at)
+                last_id = int(last_id)
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        total = query.order_by(None).count() if with_total else None
+        
+        if after:
+            query = query.filter(or_(
+                Customer.created_at < created_at,
+                db.and_(Customer.created_at == created_at, Customer.id < last_id)
+            ))
+        
+        # 多取一行判断是否还有下一批
+        rows = query.options(*plan.load_options).order_by(
+            Customer.created_at.desc(),
+            Customer.id.desc()
+        ).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return jsonify({
+            'customers': [customer.to_dict(plan) for customer in rows],
+            'next_cursor': encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+            'has_more': has_more,
+            'total': total
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取客户列表失败: {str(e)}'}), 500
+
 @customers_bp.route('/<int:customer_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda customer_id: row_fingerprint(Customer, customer_id))
 def get_customer(customer_id):
     """获取客户详情"""
     try:
-        customer = Customer.query.filter_by(
+        try:
+            plan = Customer.serializer_plan(
+                parse_fieldset(request.args.get('fields')),
+                parse_fieldset(request.args.get('include'))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        customer = Customer.query.options(*plan.load_options).filter_by(
             id=customer_id,
             is_deleted=False
         ).first()
@@ -88,12 +201,188 @@ def get_customer(customer_id):
             return jsonify({'error': '客户不存在'}), 404
         
         return jsonify({
-            'customer': customer.to_dict()
+            'customer': customer.to_dict(plan)
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'获取客户详情失败: {str(e)}'}), 500
 
+# 客户概览：单据类型 -> (模型, 金额列, 最近记录输出的字段)
+OVERVIEW_DOCUMENTS = {
+    'quotes': (Quote, Quote.total_amount, (
+        'quote_number', 'title', 'status', 'quote_date', 'valid_until', 'currency', 'total_amount', 'is_expired'
+    )),
+    'contracts': (Contract, Contract.contract_amount, (
+        'contract_number', 'title', 'status', 'contract_date', 'end_date', 'currency',
+        'contract_amount', 'paid_amount', 'remaining_amount', 'payment_progress', 'is_overdue'
+    )),
+    'orders': (Order, Order.total_amount, (
+        'order_number', 'status', 'order_date', 'required_date', 'currency', 'total_amount',
+        'delivery_progress', 'is_overdue'
+    ))
+}
+
+# 计入应收款的合同状态
+RECEIVABLE_CONTRACT_STATUSES = ('signed', 'executing', 'completed')
+
+# 最近记录默认和最多返回的条数
+OVERVIEW_RECENT_DEFAULT = 5
+OVERVIEW_RECENT_MAX = 20
+
+def overview_fingerprint(customer_id):
+    """
+    客户概览指纹：客户行、销售员行及各单据表中该客户未删除单据的 MAX(updated_at)、COUNT(*)，
+    一条 UNION ALL 查询（单据表走 (is_deleted, customer_id, created_at) 索引）
+    
+    Args:
+        customer_id: 客户ID
+        
+    Returns:
+        客户不存在时返回None
+    """
+    def part(name, model, *criteria, join=None):
+        query = db.session.query(
+            db.literal(name),
+            db.func.max(model.updated_at),
+            db.func.count()
+        ).select_from(model)
+        if join is not None:
+            query = query.join(*join)
+        return query.filter(*criteria)
+    
+    queries = [
+        part('customers', Customer, Customer.id == customer_id, Customer.is_deleted.is_(False)),
+        part('users', User, Customer.id == customer_id, join=(Customer, Customer.sales_user_id == User.id))
+    ]
+    queries.extend(
+        part(name, model, model.is_deleted.is_(False), model.customer_id == customer_id)
+        for name, (model, _, _) in OVERVIEW_DOCUMENTS.items()
+    )
+    rows = {name: (updated_at, count) for name, updated_at, count in queries[0].union_all(*queries[1:]).all()}
+    
+    if not rows.get('customers', (None, 0))[1]:
+        return None
+    last_modified = max((updated_at for updated_at, _ in rows.values() if updated_at is not None), default=None)
+    result = daily((last_modified, tuple(sorted(rows.items()))))
+    g.customer_overview_fingerprint = (customer_id, result)
+    return result
+
+def _document_summary(model, amount, customer_id):
+    # 按状态分组的数量和金额（一条查询）
+    def query():
+        rows = db.session.query(
+            model.status,
+            db.func.count(model.id),
+            db.func.coalesce(db.func.sum(amount), 0)
+        ).filter(
+            model.customer_id == customer_id,
+            model.is_deleted.is_(False)
+        ).group_by(model.status).all()
+        by_status = {status: {'count': count, 'amount': round(float(total), 2)} for status, count, total in rows}
+        return {
+            'count': sum(item['count'] for item in by_status.values()),
+            'amount': round(sum(item['amount'] for item in by_status.values()), 2),
+            'by_status': by_status
+        }
+    return query
+
+def _recent_documents(model, fields, customer_id, limit):
+    # 最近创建的单据，只读取列表需要的列（走 (is_deleted, customer_id, created_at) 索引）
+    plan = model.serializer_plan(fields, ())
+    
+    def query():
+        documents = model.query.options(*plan.load_options).filter(
+            model.customer_id == customer_id,
+            model.is_deleted.is_(False)
+        ).order_by(model.created_at.desc(), model.id.desc()).limit(limit).all()
+        return [document.to_dict(plan) for document in documents]
+    return query
+
+def _open_receivables(customer_id):
+    # 未收款合同的数量、金额和其中已逾期的金额（一条查询）
+    def query():
+        row = db.session.query(
+            db.func.count(Contract.id),
+            db.func.coalesce(db.func.sum(Contract.remaining_amount), 0),
+            db.func.coalesce(db.func.sum(db.case((Contract.is_overdue, Contract.remaining_amount), else_=0)), 0)
+        ).filter(
+            Contract.customer_id == customer_id,
+            Contract.is_deleted.is_(False),
+            Contract.status.in_(RECEIVABLE_CONTRACT_STATUSES),
+            Contract.remaining_amount > 0
+        ).one()
+        return {'contracts': row[0], 'amount': round(float(row[1]), 2), 'overdue_amount': round(float(row[2]), 2)}
+    return query
+
+def _build_overview(customer_id, limit):
+    """
+    生成客户概览：客户、各类单据的统计和最近记录、未收款（各查询互不依赖，并发执行）
+    
+    Args:
+        customer_id: 客户ID
+        limit: 每类单据的最近记录条数
+        
+    Returns:
+        (概览, FanOutResult)
+    """
+    plan = Customer.serializer_plan()
+    
+    def customer_query():
+        customer = Customer.query.options(*plan.load_options).filter_by(id=customer_id, is_deleted=False).first()
+        return customer.to_dict(plan) if customer else None
+    
+    queries = {'customer': customer_query, 'receivables': _open_receivables(customer_id)}
+    for name, (model, amount, fields) in OVERVIEW_DOCUMENTS.items():
+        queries[f'{name}_summary'] = _document_summary(model, amount, customer_id)
+        queries[f'{name}_recent'] = _recent_documents(model, fields, customer_id, limit)
+    result = fan_out(queries)
+    
+    overview = {
+        'customer': result['customer'],
+        'summary': {name: result[f'{name}_summary'] for name in OVERVIEW_DOCUMENTS},
+        'recent': {name: result[f'{name}_recent'] or [] for name in OVERVIEW_DOCUMENTS},
+        'receivables': result['receivables']
+    }
+    return overview, result
+
+@customers_bp.route('/<int:customer_id>/overview', methods=['GET'])
+@route_class('heavy')
+@jwt_required()
+@conditional_get(lambda customer_id: overview_fingerprint(customer_id))
+def get_customer_overview(customer_id):
+    """
+    获取客户概览（客户详情、各类单据统计、最近记录和未收款），按客户缓存
+    
+    查询参数 limit 指定每类单据返回的最近记录条数（默认5，最多20）
+    """
+    try:
+        limit = request.args.get('limit', OVERVIEW_RECENT_DEFAULT, type=int)
+        if limit < 1 or limit > OVERVIEW_RECENT_MAX:
+            return jsonify({'error': f'limit必须在1到{OVERVIEW_RECENT_MAX}之间'}), 400
+        
+        cached = g.get('customer_overview_fingerprint')
+        fingerprint = cached[1] if cached and cached[0] == customer_id else overview_fingerprint(customer_id)
+        if fingerprint is None:
+            return jsonify({'error': '客户不存在'}), 404
+        
+        cache = get_overview_cache()
+        overview = cache.get(customer_id, fingerprint, limit) if cache is not None else None
+        if overview is None:
+            overview, result = _build_overview(customer_id, limit)
+            if overview['customer'] is None and not result.partial:
+                return jsonify({'error': '客户不存在'}), 404
+            # 部分查询失败的结果不缓存
+            if cache is not None and not result.partial:
+                cache.put(customer_id, fingerprint, limit, overview)
+            overview = {**overview, **result.meta()}
+        else:
+            overview = {**overview, 'partial': False, 'failed': []}
+        
+        return jsonify(overview), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取客户概览失败: {str(e)}'}), 500
+
 @customers_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_customer():
@@ -141,10 +430,6 @@ def create_customer():
             'notes': data.get('notes', '').strip()
         }
         
-        # 处理标签
-        if data.get('tags_list'):
-            customer_data['tags'] = ','.join([tag.strip() for tag in data['tags_list'] if tag.strip()])
-        
         # 处理日期字段
         if data.get('first_contact_date'):
             try:
@@ -163,6 +448,11 @@ def create_customer():
                 return jsonify({'error': '下次跟进日期格式错误，应为YYYY-MM-DD'}), 400
         
         customer = Customer(**customer_data)
+        
+        # 处理标签
+        if data.get('tags_list'):
+            customer.set_tags_list(data['tags_list'])
+        
         customer.save()
         
         return jsonify({
@@ -216,10 +506,7 @@ def update_customer(customer_id):
         
         # 处理标签
         if 'tags_list' in data:
-            if data['tags_list']:
-                customer.tags = ','.join([tag.strip() for tag in data['tags_list'] if tag.strip()])
-            else:
-                customer.tags = None
+            customer.set_tags_list(data['tags_list'])
         
         # 处理日期字段
         date_fields = ['first_contact_date', 'next_follow_date']
@@ -256,9 +543,13 @@ def delete_customer(customer_id):
         if not customer:
             return jsonify({'error': '客户不存在'}), 404
         
-        # 检查是否有关联的报价、合同或订单
-        if customer.quotes or customer.contracts or customer.orders:
-            return jsonify({'error': '该客户存在关联的业务数据，无法删除'}), 400
+        # 检查是否有关联的报价、合同或订单（EXISTS查询，不加载关联集合）
+        reasons = Customer.deletion_blockers([customer_id], lock=True).get(customer_id)
+        if reasons:
+            return jsonify({
+                'error': f'该客户存在关联的{_blocker_text(reasons)}，无法删除',
+                'reasons': reasons
+            }), 400
         
         # 软删除
         customer.delete()
@@ -271,6 +562,56 @@ def delete_customer(customer_id):
         db.session.rollback()
         return jsonify({'error': f'删除客户失败: {str(e)}'}), 500
 
+# 关联数据类型的显示名称
+DELETE_BLOCKER_LABELS = {'quotes': '报价', 'contracts': '合同', 'orders': '订单'}
+
+# 批量删除每次最多处理的客户数
+BULK_DELETE_MAX = 500
+
+def _blocker_text(reasons):
+    return '、'.join(DELETE_BLOCKER_LABELS[reason] for reason in reasons)
+
+@customers_bp.route('/bulk-delete', methods=['POST'])
+@jwt_required()
+def bulk_delete_customers():
+    """
+    批量删除客户
+    
+    请求体 {"ids": [1, 2, 3]}：没有关联业务数据的客户用一条UPDATE软删除，
+    其余客户逐个返回不能删除的原因
+    """
+    try:
+        data = request.get_json() or {}
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return jsonify({'error': 'ids必须是非空数组'}), 400
+        if any(not isinstance(customer_id, int) or isinstance(customer_id, bool) for customer_id in ids):
+            return jsonify({'error': 'ids只能包含整数'}), 400
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > BULK_DELETE_MAX:
+            return jsonify({'error': f'每次最多删除{BULK_DELETE_MAX}个客户'}), 400
+        
+        deleted, blocked, missing = Customer.bulk_soft_delete(ids)
+        db.session.commit()
+        
+        return jsonify({
+            'message': f'已删除{len(deleted)}个客户' + (f'，{len(blocked)}个客户无法删除' if blocked else ''),
+            'deleted': deleted,
+            'blocked': [
+                {
+                    'id': customer_id,
+                    'reasons': reasons,
+                    'message': f'存在关联的{_blocker_text(reasons)}'
+                }
+                for customer_id, reasons in sorted(blocked.items())
+            ],
+            'not_found': missing
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'批量删除客户失败: {str(e)}'}), 500
+
 @customers_bp.route('/<int:customer_id>/contact', methods=['POST'])
 @jwt_required()
 def update_contact_date(customer_id):
@@ -296,37 +637,105 @@ def update_contact_date(customer_id):
         return jsonify({'error': f'更新接触日期失败: {str(e)}'}), 500
 
 @customers_bp.route('/stats', methods=['GET'])
+@route_class('heavy')
 @jwt_required()
+@conditional_get(lambda: table_fingerprint(Customer))
 def get_customer_stats():
-    """获取客户统计信息"""
+    """获取客户统计信息（各项统计互不依赖，并发执行）"""
     try:
-        # 总客户数
-        total_customers = Customer.query.filter_by(is_deleted=False).count()
-        
-        # 按状态统计
-        status_stats = db.session.query(
-            Customer.status,
-            db.func.count(Customer.id)
-        ).filter_by(is_deleted=False).group_by(Customer.status).all()
-        
-        # 按等级统计
-        level_stats = db.session.query(
-            Customer.level,
-            db.func.count(Customer.id)
-        ).filter_by(is_deleted=False).group_by(Customer.level).all()
-        
-        # 按客户类型统计
-        type_stats = db.session.query(
-            Customer.customer_type,
-            db.func.count(Customer.id)
-        ).filter_by(is_deleted=False).group_by(Customer.customer_type).all()
+        def group_count(column):
+            return lambda: db.session.query(
+                column,
+                db.func.count(Customer.id)
+            ).filter(Customer.is_deleted.is_(False)).group_by(column).all()
+        
+        result = fan_out({
+            # 总客户数
+            'total_customers': lambda: Customer.query.filter_by(is_deleted=False).count(),
+            # 按状态统计
+            'status_stats': group_count(Customer.status),
+            # 按等级统计
+            'level_stats': group_count(Customer.level),
+            # 按客户类型统计
+            'type_stats': group_count(Customer.customer_type)
+        }, defaults={'total_customers': 0})
+        
+        return jsonify({
+            'total_customers': result['total_customers'],
+            'status_stats': dict(result['status_stats'] or []),
+            'level_stats': dict(result['level_stats'] or []),
+            'type_stats': dict(result['type_stats'] or []),
+            **result.meta()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取客户统计失败: {str(e)}'}), 500
+
+@customers_bp.route('/tags', methods=['GET'])
+@jwt_required()
+@conditional_get(lambda: table_fingerprint(Tag))
+def get_customer_tags():
+    """获取标签及关联客户数（读取维护的计数，不做聚合查询）"""
+    try:
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        
+        tags = Tag.query.filter(
+            Tag.customer_count > 0
+        ).order_by(Tag.customer_count.desc(), Tag.name).limit(limit).all()
+        
+        return jsonify({
+            'tags': [tag.to_dict() for tag in tags]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取标签统计失败: {str(e)}'}), 500
+
+# 跟进列表默认返回的字段
+FOLLOW_UP_FIELDS = frozenset([
+    'name', 'company', 'contact_person', 'phone', 'mobile', 'level', 'status',
+    'last_contact_date', 'next_follow_date'
+])
+
+@customers_bp.route('/follow-ups', methods=['GET'])
+@jwt_required()
+def get_follow_ups():
+    """获取当前用户待跟进的客户（按next_follow_date索引范围查询）"""
+    try:
+        current_user_id = get_jwt_identity()
+        limit = min(request.args.get('limit', 200, type=int), 500)
+        
+        # 日期范围，默认今天起7天内
+        try:
+            date_from = datetime.strptime(request.args['from'], '%Y-%m-%d').date() \
+                if request.args.get('from') else datetime.utcnow().date()
+            date_to = datetime.strptime(request.args['to'], '%Y-%m-%d').date() \
+                if request.args.get('to') else date_from + timedelta(days=7)
+        except ValueError:
+            return jsonify({'error': '日期格式错误，应为YYYY-MM-DD'}), 400
+        
+        if date_to < date_from:
+            return jsonify({'error': '结束日期不能早于开始日期'}), 400
+        
+        try:
+            plan = Customer.serializer_plan(
+                parse_fieldset(request.args.get('fields')) or FOLLOW_UP_FIELDS,
+                frozenset()
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        customers = Customer.query.options(*plan.load_options).filter_by(
+            sales_user_id=current_user_id,
+            is_deleted=False
+        ).filter(
+            Customer.next_follow_date.between(date_from, date_to)
+        ).order_by(Customer.next_follow_date, Customer.id).limit(limit).all()
         
         return jsonify({
-            'total_customers': total_customers,
-            'status_stats': dict(status_stats),
-            'level_stats': dict(level_stats),
-            'type_stats': dict(type_stats)
+            'from': date_from.isoformat(),
+            'to': date_to.isoformat(),
+            'customers': [customer.to_dict(plan) for customer in customers]
         }), 200
         
     except Exception as e:
-        return jsonify({'error': f'获取客户统计失败: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'获取跟进列表失败: {str(e)}'}), 500
\ No newline at end of file
@@ -3,25 +3,76 @@
 仪表盘路由
 """
 
+from datetime import date, timedelta
+
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required
 
+from models import db, Customer, Quote, Contract
+from utils.fanout import fan_out
 from utils.helpers import ResponseHelper
+from utils.shedding import route_class
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+# 计入营业额的合同状态
+REVENUE_CONTRACT_STATUSES = ('signed', 'executing', 'completed')
+
+def _month_starts():
+    this_month = date.today().replace(day=1)
+    return this_month, (this_month - timedelta(days=1)).replace(day=1)
+
+def _monthly_summary(model, date_column, value=None, *criteria):
+    """
+    生成汇总查询：总量、本月和上月新增（一条聚合查询）
+
+    Args:
+        model: 模型类
+        date_column: 按月划分的日期列
+        value: 求和的列，None表示计数
+        *criteria: 其他过滤条件
+
+    Returns:
+        无参查询函数，返回 (总量, 本月, 上月)
+    """
+    this_month, last_month = _month_starts()
+    measure = value if value is not None else db.literal(1)
+
+    def monthly(condition):
+        return db.func.coalesce(db.func.sum(db.case((condition, measure), else_=0)), 0)
+
+    def query():
+        return tuple(db.session.query(
+            db.func.coalesce(db.func.sum(measure), 0),
+            monthly(date_column >= this_month),
+            monthly(db.and_(date_column >= last_month, date_column < this_month))
+        ).filter(model.is_deleted.is_(False), *criteria).one())
+    return query
+
+def _summary_card(row):
+    total, current, previous = (float(value or 0) for value in row or (0, 0, 0))
+    if previous:
+        change = round((current - previous) * 100 / previous, 1)
+    else:
+        change = 100.0 if current else 0.0
+    return {'total': int(total) if total.is_integer() else round(total, 2), 'change': change}
+
 @dashboard_bp.route('/dashboard', methods=['GET'])
+@route_class('heavy')
 @jwt_required()
 def get_dashboard_data():
-    """获取仪表盘数据"""
-    # 在这里，您可以从数据库或其他来源获取实际的仪表盘数据。
-    # 现在，我们只返回一些模拟数据。
-    dashboard_data = {
-        'customers': {'total': 120, 'change': 5},
-        'quotes': {'total': 80, 'change': -2},
-        'contracts': {'total': 50, 'change': 10},
-        'revenue': {'total': 120000, 'change': 15}
-    }
+    """获取仪表盘数据：各项总量及本月新增较上月的变化（%），四条汇总查询并发执行"""
+    result = fan_out({
+        'customers': _monthly_summary(Customer, Customer.created_at),
+        'quotes': _monthly_summary(Quote, Quote.created_at),
+        'contracts': _monthly_summary(Contract, Contract.created_at),
+        'revenue': _monthly_summary(
+            Contract, Contract.contract_date, Contract.contract_amount,
+            Contract.status.in_(REVENUE_CONTRACT_STATUSES)
+        )
+    })
+    dashboard_data = {name: _summary_card(result[name]) for name in ('customers', 'quotes', 'contracts', 'revenue')}
+    dashboard_data.update(result.meta())
     return ResponseHelper.success(dashboard_data)
 
 @dashboard_bp.route('/recent-activities', methods=['GET'])
@@ -1,16 +1,105 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Order, OrderItem, Customer, Contract
+from models import db, Order, OrderItem, Customer, Contract, User
+from models.archive import ORDER_ARCHIVE
+from sqlalchemy import or_
+from utils.helpers import parse_fieldset
+from utils.conditional import conditional_get, daily, row_fingerprint, table_fingerprint
+
+# 列表可排序字段（sort=字段 升序，sort=-字段 降序）
+SORT_FIELDS = {
+    'created_at': Order.created_at,
+    'delivery_progress': Order.delivery_progress,
+    'required_date': Order.required_date,
+    'total_amount': Order.total_amount
+}
 
 # 创建订单管理蓝图
 orders_bp = Blueprint('orders', __name__)
 
 @orders_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: daily(table_fingerprint(Order, Customer, User, Contract)))
 def get_orders():
     """获取订单列表"""
-    # TODO: 实现订单列表获取功能
-    return jsonify({'message': '订单列表功能待实现'}), 200
+    try:
+        # 获取查询参数
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        search = request.args.get('search', '').strip()
+        status = request.args.get('status', '')
+        customer_id = request.args.get('customer_id', type=int)
+        sales_user_id = request.args.get('sales_user_id', type=int)
+        overdue = request.args.get('overdue', '').lower()
+        sort = request.args.get('sort', '-created_at')
+        fields = parse_fieldset(request.args.get('fields'))
+        # 列表默认不展开明细，需要时通过include指定
+        include = parse_fieldset(request.args.get('include')) or frozenset()
+        
+        try:
+            plan = Order.serializer_plan(fields, include)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # 构建查询（只取序列化需要的列和关联）
+        query = Order.query.options(*plan.load_options).filter_by(is_deleted=False)
+        
+        # 搜索条件
+        if search:
+            query = query.filter(
+                or_(
+                    Order.order_number.contains(search),
+                    Order.shipping_contact.contains(search)
+                )
+            )
+        
+        # 状态筛选
+        if status:
+            query = query.filter_by(status=status)
+        
+        # 客户筛选
+        if customer_id:
+            query = query.filter_by(customer_id=customer_id)
+        
+        # 销售员筛选
+        if sales_user_id:
+            query = query.filter_by(sales_user_id=sales_user_id)
+        
+        # 逾期筛选（SQL表达式，日期范围条件可走索引）
+        if overdue in ('true', '1'):
+            query = query.filter(Order.is_overdue)
+        elif overdue in ('false', '0'):
+            query = query.filter(db.not_(Order.is_overdue))
+        
+        # 排序
+        sort_column = SORT_FIELDS.get(sort.lstrip('-'))
+        if sort_column is None:
+            return jsonify({'error': f"不支持的排序字段: {sort.lstrip('-')}"}), 400
+        query = query.order_by(sort_column.desc() if sort.startswith('-') else sort_column.asc(), Order.id.desc())
+        
+        # 分页
+        pagination = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        
+        orders = [order.to_dict(plan) for order in pagination.items]
+        
+        return jsonify({
+            'orders': orders,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_prev': pagination.has_prev,
+                'has_next': pagination.has_next
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取订单列表失败: {str(e)}'}), 500
 
 @orders_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -21,10 +110,38 @@ def create_order():
 
 @orders_bp.route('/<int:order_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda order_id: daily(row_fingerprint(Order, order_id)))
 def get_order(order_id):
     """获取订单详情"""
-    # TODO: 实现订单详情获取功能
-    return jsonify({'message': '订单详情功能待实现'}), 200
+    try:
+        try:
+            plan = Order.serializer_plan(
+                parse_fieldset(request.args.get('fields')),
+                parse_fieldset(request.args.get('include'))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        order = Order.query.options(*plan.load_options).filter_by(
+            id=order_id,
+            is_deleted=False
+        ).first()
+        
+        archived = False
+        if not order:
+            # 已归档的历史订单从归档表读取
+            order = ORDER_ARCHIVE.find(order_id)
+            archived = order is not None
+        
+        if not order:
+            return jsonify({'error': '订单不存在'}), 404
+        
+        return jsonify({
+            'order': dict(order.to_dict(plan), archived=archived)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取订单详情失败: {str(e)}'}), 500
 
 @orders_bp.route('/<int:order_id>', methods=['PUT'])
 @jwt_required()
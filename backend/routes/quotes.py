@@ -1,16 +1,90 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Quote, QuoteItem, Customer
+from models import db, Quote, QuoteItem, Customer, User, Contract, Order
+from models.archive import QUOTE_ARCHIVE
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from utils.helpers import parse_fieldset
+from utils.conditional import conditional_get, daily, row_fingerprint, table_fingerprint
+from utils.pricing import AMOUNT_FIELDS, from_cents, price_quotes, scenario_grid, to_hundredths
+from utils.shedding import route_class
 
 # 创建报价管理蓝图
 quotes_bp = Blueprint('quotes', __name__)
 
 @quotes_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: daily(table_fingerprint(Quote, Customer, User)))
 def get_quotes():
     """获取报价列表"""
-    # TODO: 实现报价列表获取功能
-    return jsonify({'message': '报价列表功能待实现'}), 200
+    try:
+        # 获取查询参数
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        search = request.args.get('search', '').strip()
+        status = request.args.get('status', '')
+        customer_id = request.args.get('customer_id', type=int)
+        sales_user_id = request.args.get('sales_user_id', type=int)
+        fields = parse_fieldset(request.args.get('fields'))
+        # 列表默认不展开明细，需要时通过include指定
+        include = parse_fieldset(request.args.get('include')) or frozenset()
+        
+        try:
+            plan = Quote.serializer_plan(fields, include)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # 构建查询（只取序列化需要的列和关联）
+        query = Quote.query.options(*plan.load_options).filter_by(is_deleted=False)
+        
+        # 搜索条件
+        if search:
+            query = query.filter(
+                or_(
+                    Quote.quote_number.contains(search),
+                    Quote.title.contains(search)
+                )
+            )
+        
+        # 状态筛选
+        if status:
+            query = query.filter_by(status=status)
+        
+        # 客户筛选
+        if customer_id:
+            query = query.filter_by(customer_id=customer_id)
+        
+        # 销售员筛选
+        if sales_user_id:
+            query = query.filter_by(sales_user_id=sales_user_id)
+        
+        # 排序
+        query = query.order_by(Quote.created_at.desc())
+        
+        # 分页
+        pagination = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        
+        quotes = [quote.to_dict(plan) for quote in pagination.items]
+        
+        return jsonify({
+            'quotes': quotes,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_prev': pagination.has_prev,
+                'has_next': pagination.has_next
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取报价列表失败: {str(e)}'}), 500
 
 @quotes_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -21,10 +95,38 @@ def create_quote():
 
 @quotes_bp.route('/<int:quote_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda quote_id: daily(row_fingerprint(Quote, quote_id)))
 def get_quote(quote_id):
     """获取报价详情"""
-    # TODO: 实现报价详情获取功能
-    return jsonify({'message': '报价详情功能待实现'}), 200
+    try:
+        try:
+            plan = Quote.serializer_plan(
+                parse_fieldset(request.args.get('fields')),
+                parse_fieldset(request.args.get('include'))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        quote = Quote.query.options(*plan.load_options).filter_by(
+            id=quote_id,
+            is_deleted=False
+        ).first()
+        
+        archived = False
+        if not quote:
+            # 已归档的历史报价从归档表读取
+            quote = QUOTE_ARCHIVE.find(quote_id)
+            archived = quote is not None
+        
+        if not quote:
+            return jsonify({'error': '报价不存在'}), 404
+        
+        return jsonify({
+            'quote': dict(quote.to_dict(plan), archived=archived)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'获取报价详情失败: {str(e)}'}), 500
 
 @quotes_bp.route('/<int:quote_id>', methods=['PUT'])
 @jwt_required()
@@ -38,4 +140,346 @@ def update_quote(quote_id):
 def delete_quote(quote_id):
     """删除报价"""
     # TODO: 实现报价删除功能
-    return jsonify({'message': '报价删除功能待实现'}), 200
\ No newline at end of file
+    return jsonify({'message': '报价删除功能待实现'}), 200
+
+# 模拟接口的上限（方案数、组合中的报价数）
+SIMULATION_MAX_SCENARIOS = 1000
+PORTFOLIO_MAX_QUOTES = 1000
+
+def _hundredths(column):
+    # 两位小数的列在SQL中转换为百分之一单位的整数（金额为分）
+    return db.cast(db.func.round(column * 100), db.BigInteger)
+
+def _price_portfolio(quotes, scenarios):
+    """
+    一次读取多张报价的明细，计算各方案及报价当前折扣/税率下的金额
+    
+    Args:
+        quotes: [(报价ID, 折扣率, 税率)]，0.01%单位
+        scenarios: [(折扣率, 税率)]，税率为None时按报价自己的税率
+    
+    Returns:
+        tuple: (各方案的金额, 当前折扣/税率下的金额)，形状为 (报价数, 方案数) 和 (报价数, 1) 的分
+    """
+    position = {quote_id: i for i, (quote_id, _, _) in enumerate(quotes)}
+    items = db.session.query(
+        QuoteItem.quote_id, _hundredths(QuoteItem.quantity), _hundredths(QuoteItem.unit_price)
+    ).filter(
+        QuoteItem.quote_id.in_(list(position)),
+        QuoteItem.is_deleted.is_(False)
+    ).all()
+    
+    quote_index = [position[quote_id] for quote_id, _, _ in items]
+    quantities = [quantity for _, quantity, _ in items]
+    unit_prices = [unit_price for _, _, unit_price in items]
+    
+    simulated = price_quotes(
+        quote_index, quantities, unit_prices, len(quotes),
+        [discount for discount, _ in scenarios], [tax for _, tax in scenarios],
+        quote_tax_rates=[tax for _, _, tax in quotes]
+    )
+    current = price_quotes(
+        quote_index, quantities, unit_prices, len(quotes),
+        [[discount] for _, discount, _ in quotes], [[tax] for _, _, tax in quotes]
+    )
+    return simulated, current
+
+def _parse_scenarios(data):
+    """解析请求体中的模拟方案"""
+    for name in ('scenarios', 'discount_rates', 'tax_rates'):
+        if data.get(name) is not None and not isinstance(data[name], list):
+            raise ValueError(f'{name}必须是数组')
+    return scenario_grid(
+        scenarios=data.get('scenarios'),
+        discount_rates=data.get('discount_rates'),
+        tax_rates=data.get('tax_rates'),
+        default_tax_rate=data.get('default_tax_rate'),
+        max_scenarios=SIMULATION_MAX_SCENARIOS
+    )
+
+def _quote_rates(row):
+    return (row.id, to_hundredths(row.discount_rate or 0), to_hundredths(row.tax_rate or 0))
+
+@quotes_bp.route('/<int:quote_id>/simulate', methods=['POST'])
+@jwt_required()
+def simulate_quote(quote_id):
+    """
+    模拟报价在不同折扣率/税率下的金额（不修改报价）
+    
+    请求体 {"scenarios": [{"discount_rate": 5, "tax_rate": 13}]}，
+    或 {"discount_rates": [0, 5, 10], "tax_rates": [6, 13]} 的组合；
+    未指定税率时使用 default_tax_rate，再没有则为报价当前的税率
+    """
+    try:
+        quote = Quote.query.with_entities(
+            Quote.id, Quote.quote_number, Quote.currency, Quote.discount_rate, Quote.tax_rate
+        ).filter_by(id=quote_id, is_deleted=False).first()
+        if not quote:
+            return jsonify({'error': '报价不存在'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': '请求体必须是JSON对象'}), 400
+        try:
+            scenarios = _parse_scenarios(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rates = _quote_rates(quote)
+        simulated, current = _price_portfolio([rates], scenarios)
+        baseline = {name: from_cents(current[name][0, 0]) for name in AMOUNT_FIELDS}
+        
+        results = []
+        for column, (discount, tax) in enumerate(scenarios):
+            amounts = {name: from_cents(simulated[name][0, column]) for name in AMOUNT_FIELDS}
+            results.append(dict(
+                amounts,
+                discount_rate=from_cents(discount),
+                tax_rate=from_cents(rates[2] if tax is None else tax),
+                total_change=amounts['total_amount'] - baseline['total_amount']
+            ))
+        
+        return jsonify({
+            'quote_id': quote.id,
+            'quote_number': quote.quote_number,
+            'currency': quote.currency,
+            'current': dict(baseline, discount_rate=from_cents(rates[1]), tax_rate=from_cents(rates[2])),
+            'scenarios': results
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'模拟报价失败: {str(e)}'}), 500
+
+@quotes_bp.route('/simulate', methods=['POST'])
+@route_class('heavy')
+@jwt_required()
+def simulate_portfolio():
+    """
+    模拟一组报价在不同折扣率/税率下的合计金额（不修改报价）
+    
+    报价由 quote_ids 指定，或按 status / customer_id / sales_user_id 筛选，最多PORTFOLIO_MAX_QUOTES张；
+    方案格式与单张报价相同，未指定税率的方案按各报价当前的税率计算（结果中tax_rate为null）。
+    include_quotes 为true时同时返回每张报价在各方案下的总金额。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': '请求体必须是JSON对象'}), 400
+        
+        query = Quote.query.with_entities(Quote.id, Quote.discount_rate, Quote.tax_rate).filter_by(is_deleted=False)
+        quote_ids = data.get('quote_ids')
+        filters = {name: data[name] for name in ('status', 'customer_id', 'sales_user_id') if data.get(name)}
+        if quote_ids is not None:
+            if not isinstance(quote_ids, list) or not quote_ids:
+                return jsonify({'error': 'quote_ids必须是非空数组'}), 400
+            if any(not isinstance(item, int) or isinstance(item, bool) for item in quote_ids):
+                return jsonify({'error': 'quote_ids只能包含整数'}), 400
+            quote_ids = list(dict.fromkeys(quote_ids))
+            if len(quote_ids) > PORTFOLIO_MAX_QUOTES:
+                return jsonify({'error': f'每次最多模拟{PORTFOLIO_MAX_QUOTES}张报价'}), 400
+            query = query.filter(Quote.id.in_(quote_ids))
+        elif filters:
+            query = query.filter_by(**filters)
+        else:
+            return jsonify({'error': '请提供quote_ids或筛选条件（status、customer_id、sales_user_id）'}), 400
+        
+        try:
+            scenarios = _parse_scenarios(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rows = query.order_by(Quote.id).limit(PORTFOLIO_MAX_QUOTES + 1).all()
+        if len(rows) > PORTFOLIO_MAX_QUOTES:
+            return jsonify({'error': f'符合条件的报价超过{PORTFOLIO_MAX_QUOTES}张，请缩小范围'}), 400
+        if not rows:
+            return jsonify({'error': '没有符合条件的报价'}), 404
+        
+        quotes = [_quote_rates(row) for row in rows]
+        simulated, current = _price_portfolio(quotes, scenarios)
+        
+        # 组合合计：按方案对各报价的金额（分）求和
+        baseline = {name: from_cents(current[name].sum()) for name in AMOUNT_FIELDS}
+        totals = {name: simulated[name].sum(axis=0) for name in AMOUNT_FIELDS}
+        results = []
+        for column, (discount, tax) in enumerate(scenarios):
+            amounts = {name: from_cents(totals[name][column]) for name in AMOUNT_FIELDS}
+            results.append(dict(
+                amounts,
+                discount_rate=from_cents(discount),
+                tax_rate=None if tax is None else from_cents(tax),
+                total_change=amounts['total_amount'] - baseline['total_amount']
+            ))
+        
+        response = {
+            'quote_count': len(quotes),
+            'current': baseline,
+            'scenarios': results
+        }
+        if data.get('include_quotes'):
+            response['quotes'] = [
+                {
+                    'quote_id': quote_id,
+                    'current_total': from_cents(current['total_amount'][row, 0]),
+                    'totals': [from_cents(value) for value in simulated['total_amount'][row]]
+                }
+                for row, (quote_id, _, _) in enumerate(quotes)
+            ]
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'模拟报价组合失败: {str(e)}'}), 500
+
+# 分配的单据编号被并发占用（唯一约束冲突）时整个事务重试的次数
+NUMBER_RESERVE_ATTEMPTS = 3
+
+# 唯一约束冲突的错误信息特征（SQLite / MySQL / PostgreSQL）
+UNIQUE_VIOLATION_MARKERS = ('UNIQUE constraint failed', 'Duplicate entry', 'duplicate key value')
+
+def _is_number_conflict(error, number_columns):
+    # 只有编号列的唯一约束冲突才是并发分配到相同编号，其他完整性错误（外键、类型等）不重试
+    message = str(error.orig)
+    return (
+        any(marker in message for marker in UNIQUE_VIOLATION_MARKERS)
+        and any(column in message for column in number_columns)
+    )
+
+def _with_number_retry(operation, *number_columns):
+    """
+    执行分配单据编号的操作并提交，编号冲突时回滚重试
+    
+    Args:
+        operation: 在当前会话中执行操作、返回响应的函数（响应在提交前生成）
+        number_columns: 操作中分配的单据编号列名
+    
+    Returns:
+        operation返回的响应
+    """
+    for attempt in range(NUMBER_RESERVE_ATTEMPTS):
+        try:
+            result = operation()
+            db.session.commit()
+            return result
+        except IntegrityError as e:
+            db.session.rollback()
+            if not _is_number_conflict(e, number_columns) or attempt == NUMBER_RESERVE_ATTEMPTS - 1:
+                raise
+
+def _parse_dates(data, fields):
+    # 解析YYYY-MM-DD格式的日期字段，格式错误时抛出ValueError
+    values = {}
+    for name, label in fields.items():
+        if data.get(name):
+            try:
+                values[name] = datetime.strptime(data[name], '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                raise ValueError(f'{label}格式错误，应为YYYY-MM-DD')
+    return values
+
+def _parse_texts(data, table, names):
+    # 读取字符串字段（空值跳过），不是字符串或超过列长度时抛出ValueError
+    values = {}
+    for name in names:
+        value = data.get(name)
+        if value is None or value == '':
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f'{name}必须是字符串')
+        length = table.c[name].type.length
+        if length and len(value) > length:
+            raise ValueError(f'{name}不能超过{length}个字符')
+        values[name] = value
+    return values
+
+@quotes_bp.route('/<int:quote_id>/copy', methods=['POST'])
+@jwt_required()
+def copy_quote(quote_id):
+    """
+    复制报价为新的草稿报价（表头和明细在数据库端复制，一个事务）
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': '请求体必须是JSON对象'}), 400
+        sales_user_id = data.get('sales_user_id')
+        if sales_user_id is not None:
+            if not isinstance(sales_user_id, int) or isinstance(sales_user_id, bool):
+                return jsonify({'error': 'sales_user_id必须是整数'}), 400
+            if not User.query.filter_by(id=sales_user_id, status='active', is_deleted=False).first():
+                return jsonify({'error': '销售员不存在或已停用'}), 400
+        
+        def copy():
+            quote = Quote.copy_from(quote_id, sales_user_id)
+            if not quote:
+                return jsonify({'error': '报价不存在'}), 404
+            return jsonify({
+                'message': '报价复制成功',
+                'quote': quote.to_dict()
+            }), 201
+        
+        return _with_number_retry(copy, 'quote_number')
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'复制报价失败: {str(e)}'}), 500
+
+@quotes_bp.route('/<int:quote_id>/convert', methods=['POST'])
+@jwt_required()
+def convert_quote(quote_id):
+    """
+    由已接受的报价生成合同和订单
+    
+    合同金额为报价总金额，订单的金额和明细复制自报价；create_order 为false时只生成合同。
+    同一报价只能生成一份（未删除的）合同。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': '请求体必须是JSON对象'}), 400
+        
+        create_order = data.get('create_order', True)
+        if not isinstance(create_order, bool):
+            return jsonify({'error': 'create_order必须是布尔值'}), 400
+        
+        try:
+            contract_values = _parse_texts(
+                data, Contract.__table__, ('title', 'payment_terms', 'delivery_terms', 'warranty_terms')
+            )
+            order_values = _parse_texts(
+                data, Order.__table__, ('shipping_method', 'shipping_address', 'shipping_contact', 'shipping_phone')
+            )
+            contract_values.update(_parse_dates(data, {'start_date': '合同开始日期', 'end_date': '合同结束日期'}))
+            order_values.update(_parse_dates(data, {'required_date': '要求交付日期'}))
+            if data.get('shipping_cost') is not None:
+                order_values['shipping_cost'] = from_cents(to_hundredths(data['shipping_cost'], '运费'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def convert():
+            quote = Quote.query.filter_by(id=quote_id, is_deleted=False).with_for_update().first()
+            if not quote:
+                return jsonify({'error': '报价不存在'}), 404
+            if quote.status != 'accepted':
+                return jsonify({'error': '只有已接受的报价可以生成合同'}), 400
+            existing = Contract.query.with_entities(Contract.contract_number).filter_by(
+                quote_id=quote_id,
+                is_deleted=False
+            ).first()
+            if existing:
+                return jsonify({'error': f'该报价已生成合同 {existing.contract_number}'}), 409
+            
+            contract, order = quote.convert_to_contract(
+                create_order=create_order,
+                contract_values=contract_values,
+                order_values=order_values
+            )
+            return jsonify({
+                'message': '合同生成成功',
+                'contract': contract.to_dict(),
+                'order': order.to_dict() if order else None
+            }), 201
+        
+        return _with_number_retry(convert, 'contract_number', 'order_number')
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'生成合同失败: {str(e)}'}), 500
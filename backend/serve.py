@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 服务启动入口
+
+根据运行环境选择WSGI服务器：
+1. 已安装gunicorn（Linux/容器）时，使用gunicorn_conf.py中的配置启动多进程服务
+2. 否则（如Windows开发机）回退到Werkzeug多线程服务器
+
+使用方式：
+    python backend/serve.py
+"""
+
+import os
+import sys
+import logging
+
+# 添加项目根目录到Python路径
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+logger = logging.getLogger(__name__)
+
+def get_config_class():
+    """
+    根据FLASK_ENV环境变量选择配置类
+
+    Returns:
+        type: 配置类
+    """
+    from config import config
+
+    env = os.environ.get('FLASK_ENV', 'default')
+    return config.get(env, config['default'])
+
+def build_app():
+    """
+    创建WSGI应用
+
+    Returns:
+        Flask: 配置好的Flask应用实例
+    """
+    from app import create_app
+
+    return create_app(get_config_class())
+
+def reset_after_fork(app):
+    """
+    fork后重置数据库连接池
+
+    丢弃从父进程继承的连接（不关闭，避免影响父进程），
+    后续请求会在当前进程中重新建立连接。
+
+    Args:
+        app: Flask应用实例
+    """
+    from models import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def start_background_tasks(app):
+    """
+    在当前工作进程中启动后台定时任务
+
+    Args:
+        app: Flask应用实例
+    """
+    from utils.scheduler import start_background_tasks as start_tasks
+
+    start_tasks(app)
+
+def _metrics_store():
+    import tempfile
+    from utils.metrics import FileMetricsStore
+
+    config_class = get_config_class()
+    directory = getattr(config_class, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'crm_metrics')
+    return FileMetricsStore(directory)
+
+def clear_metrics_store():
+    """
+    清空跨进程指标存储目录（服务启动时调用，避免累加上次运行的计数）
+    """
+    _metrics_store().clear()
+
+def flush_metrics(app):
+    """
+    工作进程退出前写入最后一次指标快照
+
+    Args:
+        app: Flask应用实例
+    """
+    from utils.metrics import registry
+
+    store = app.extensions.get('crm_metrics')
+    if store is not None:
+        store.flush(registry, force=True)
+
+def retire_metrics(pid):
+    """
+    把已退出工作进程的指标快照并入累计文件（主进程中调用，避免快照文件随进程回收无限增加）
+
+    Args:
+        pid: 已退出的工作进程pid
+    """
+    _metrics_store().retire(pid)
+
+def run_gunicorn():
+    """
+    使用gunicorn启动服务
+    """
+    import gunicorn_conf
+    from gunicorn.app.base import BaseApplication
+
+    class CRMApplication(BaseApplication):
+        """加载gunicorn_conf模块配置的gunicorn应用"""
+
+        def load_config(self):
+            for key in dir(gunicorn_conf):
+                if key in self.cfg.settings:
+                    self.cfg.set(key, getattr(gunicorn_conf, key))
+            self.cfg.set('chdir', BASE_DIR)
+
+        def load(self):
+            return build_app()
+
+    CRMApplication().run()
+
+def run_werkzeug():
+    """
+    使用Werkzeug多线程服务器启动服务（开发环境或不支持gunicorn的平台）
+    """
+    app = build_app()
+    start_background_tasks(app)
+    app.run(
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', 5000)),
+        debug=app.config.get('DEBUG', False),
+        threaded=True,
+        use_reloader=False
+    )
+
+def main():
+    """
+    服务入口
+    """
+    try:
+        import gunicorn  # noqa: F401
+        has_gunicorn = sys.platform != 'win32'
+    except ImportError:
+        has_gunicorn = False
+
+    if has_gunicorn:
+        run_gunicorn()
+    else:
+        logger.warning('未检测到gunicorn，使用Werkzeug多线程服务器启动')
+        run_werkzeug()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 测试公共夹具
+
+在 backend 目录下运行：python -m pytest tests
+应用由 benchmarks.scenarios.make_app 创建，默认使用内存SQLite数据库，表结构来自模型。
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scenarios import make_app
+
+@pytest.fixture
+def app():
+    """内存SQLite数据库上的应用（每个测试重新建表）"""
+    from models import db
+
+    app = make_app('sqlite://', CONDITIONAL_GET_ENABLED=False, CUSTOMER_OVERVIEW_CACHE_SIZE=0)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def sales_user(app):
+    """销售员"""
+    from models import db, User
+
+    user = User(username='sales', email='sales@example.com', password='password', real_name='销售')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def customer(app, sales_user):
+    """客户"""
+    from models import db, Customer
+
+    customer = Customer(name='测试客户', sales_user_id=sales_user.id)
+    db.session.add(customer)
+    db.session.commit()
+    return customer
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+条件请求指纹测试：详情的ETag随明细和关联记录变化，列表的ETag随新增和归档变化
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from models import db, Quote, QuoteItem
+
+@pytest.fixture
+def client(app):
+    app.config['CONDITIONAL_GET_ENABLED'] = True
+    return app.test_client()
+
+@pytest.fixture
+def headers(sales_user):
+    return {'Authorization': f'Bearer {create_access_token(identity=sales_user.id)}'}
+
+@pytest.fixture
+def quote(customer):
+    quote = Quote('测试报价', customer.id, customer.sales_user_id)
+    db.session.add(quote)
+    db.session.flush()
+    db.session.add(QuoteItem(
+        quote_id=quote.id, product_name='产品', quantity=Decimal('2'),
+        unit_price=Decimal('10.00'), total_price=Decimal('20.00')
+    ))
+    db.session.commit()
+    return quote
+
+def _etag(client, headers, url):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert client.get(url, headers=dict(headers, **{'If-None-Match': response.headers['ETag']})).status_code == 304
+    return response.headers['ETag']
+
+def test_detail_etag_follows_items(client, headers, quote):
+    url = f'/api/v1/quotes/{quote.id}'
+    before = _etag(client, headers, url)
+    quote.quote_items[0].notes = '已修改'
+    db.session.commit()
+    assert _etag(client, headers, url) != before
+
+def test_detail_etag_follows_item_added(client, headers, quote):
+    url = f'/api/v1/quotes/{quote.id}'
+    before = _etag(client, headers, url)
+    db.session.add(QuoteItem(
+        quote_id=quote.id, product_name='产品2', quantity=Decimal('1'),
+        unit_price=Decimal('5.00'), total_price=Decimal('5.00')
+    ))
+    db.session.commit()
+    assert _etag(client, headers, url) != before
+
+def test_detail_etag_follows_related_names(client, headers, quote, customer, sales_user):
+    url = f'/api/v1/quotes/{quote.id}'
+    before = _etag(client, headers, url)
+    customer.name = '改名客户'
+    db.session.commit()
+    renamed_customer = _etag(client, headers, url)
+    assert renamed_customer != before
+    sales_user.real_name = '改名销售'
+    db.session.commit()
+    assert _etag(client, headers, url) != renamed_customer
+
+def test_list_etag_follows_archive(client, headers, quote):
+    from models.archive import QUOTE_ARCHIVE
+
+    url = '/api/v1/quotes/?per_page=20'
+    before = _etag(client, headers, url)
+    quote.status = 'rejected'
+    quote.quote_date = date(2000, 1, 1)
+    db.session.commit()
+    changed = _etag(client, headers, url)
+    assert changed != before
+    assert QUOTE_ARCHIVE.run(db.engine, date(2001, 1, 1))['documents'] == 1
+    assert _etag(client, headers, url) != changed
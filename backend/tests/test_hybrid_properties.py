@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+混合属性的Python计算与SQL表达式一致性测试
+
+is_overdue / payment_progress / delivery_progress 在Python中用于序列化，
+SQL表达式用于列表的筛选和排序，两边必须逐行一致（包括截止日期为今天等边界）。
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from models import db, Contract, Order
+
+TODAY = datetime.utcnow().date()
+
+# 截止日期的边界：无、昨天、今天、明天
+DUE_DATES = [None, TODAY - timedelta(days=1), TODAY, TODAY + timedelta(days=1)]
+
+CONTRACT_STATUSES = ['draft', 'pending', 'signed', 'executing', 'completed', 'terminated']
+ORDER_STATUSES = ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'completed', 'cancelled']
+
+# (合同金额, 已付金额)：整除、循环小数、第三位小数为5（四舍五入进位）、超额付款、零金额
+PAYMENTS = [
+    (Decimal('1000.00'), Decimal('250.00')),
+    (Decimal('3.00'), Decimal('1.00')),
+    (Decimal('3.00'), Decimal('2.00')),
+    (Decimal('800.00'), Decimal('1.00')),
+    (Decimal('100.00'), Decimal('150.00')),
+    (Decimal('0.00'), Decimal('0.00')),
+    (Decimal('999999.99'), Decimal('0.01'))
+]
+
+def _evaluations(model, name):
+    """每行的 (Python计算结果, SQL表达式结果)"""
+    db.session.expire_all()
+    rows = db.session.query(model, getattr(model, name).label(name)).order_by(model.id).all()
+    assert rows
+    return [(getattr(instance, name), value) for instance, value in rows]
+
+def _add_contracts(customer, values):
+    for number, fields in enumerate(values, start=1):
+        fields.setdefault('contract_amount', Decimal('100.00'))
+        fields.setdefault('remaining_amount', fields['contract_amount'])
+        db.session.add(Contract(
+            contract_number=f'CT{number:06d}',
+            title=f'合同{number}',
+            customer_id=customer.id,
+            sales_user_id=customer.sales_user_id,
+            **fields
+        ))
+    db.session.commit()
+
+def _add_orders(customer, values):
+    for number, fields in enumerate(values, start=1):
+        db.session.add(Order(
+            order_number=f'OD{number:06d}',
+            customer_id=customer.id,
+            sales_user_id=customer.sales_user_id,
+            **fields
+        ))
+    db.session.commit()
+
+def test_contract_is_overdue(customer):
+    _add_contracts(customer, [
+        {'end_date': end_date, 'status': status}
+        for end_date in DUE_DATES for status in CONTRACT_STATUSES
+    ])
+    for python_value, sql_value in _evaluations(Contract, 'is_overdue'):
+        assert python_value == bool(sql_value)
+
+def test_contract_is_overdue_boundary(customer):
+    _add_contracts(customer, [
+        {'end_date': TODAY, 'status': 'signed'},
+        {'end_date': TODAY - timedelta(days=1), 'status': 'executing'}
+    ])
+    overdue = [contract.contract_number for contract in Contract.query.filter(Contract.is_overdue).all()]
+    assert overdue == ['CT000002']
+    assert [contract.is_overdue for contract in Contract.query.order_by(Contract.id)] == [False, True]
+
+def test_contract_payment_progress(customer):
+    _add_contracts(customer, [
+        {'contract_amount': amount, 'paid_amount': paid, 'remaining_amount': amount - paid}
+        for amount, paid in PAYMENTS
+    ])
+    for python_value, sql_value in _evaluations(Contract, 'payment_progress'):
+        assert python_value == Decimal(str(sql_value)).quantize(Decimal('0.01'))
+
+def test_payment_progress_rounds_half_up(customer):
+    _add_contracts(customer, [{'contract_amount': Decimal('800.00'), 'paid_amount': Decimal('1.00')}])
+    contract = Contract.query.one()
+    assert contract.payment_progress == Decimal('0.13')
+    assert Decimal(str(db.session.query(Contract.payment_progress).scalar())) == Decimal('0.13')
+
+def test_order_is_overdue(customer):
+    _add_orders(customer, [
+        {'required_date': required_date, 'status': status}
+        for required_date in DUE_DATES for status in ORDER_STATUSES
+    ])
+    for python_value, sql_value in _evaluations(Order, 'is_overdue'):
+        assert python_value == bool(sql_value)
+
+@pytest.mark.parametrize('status', ORDER_STATUSES)
+def test_order_delivery_progress(customer, status):
+    _add_orders(customer, [{'status': status}])
+    [(python_value, sql_value)] = _evaluations(Order, 'delivery_progress')
+    assert python_value == sql_value
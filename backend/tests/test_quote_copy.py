@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+报价复制和生成合同/订单接口测试
+"""
+
+from decimal import Decimal
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Quote, QuoteItem, User
+from routes.quotes import NUMBER_RESERVE_ATTEMPTS, _with_number_retry
+
+@pytest.fixture
+def headers(sales_user):
+    return {'Authorization': f'Bearer {create_access_token(identity=sales_user.id)}'}
+
+@pytest.fixture
+def quote(customer):
+    quote = Quote('测试报价', customer.id, customer.sales_user_id, tax_rate=Decimal('13.00'))
+    db.session.add(quote)
+    db.session.flush()
+    for name, price in (('产品A', '100.00'), ('产品B', '50.00')):
+        db.session.add(QuoteItem(
+            quote_id=quote.id, product_name=name, quantity=Decimal('1'),
+            unit_price=Decimal(price), total_price=Decimal(price)
+        ))
+    db.session.commit()
+    quote.calculate_totals()
+    return quote
+
+@pytest.mark.parametrize('sales_user_id', ['abc', '1', 1.0, True, 9999])
+def test_copy_rejects_invalid_sales_user(app, headers, quote, sales_user_id):
+    response = app.test_client().post(
+        f'/api/v1/quotes/{quote.id}/copy', json={'sales_user_id': sales_user_id}, headers=headers
+    )
+    assert response.status_code == 400
+    assert Quote.query.count() == 1
+
+def test_copy_rejects_inactive_sales_user(app, headers, quote):
+    user = User(username='left', email='left@example.com', password='password')
+    user.status = 'inactive'
+    db.session.add(user)
+    db.session.commit()
+    response = app.test_client().post(
+        f'/api/v1/quotes/{quote.id}/copy', json={'sales_user_id': user.id}, headers=headers
+    )
+    assert response.status_code == 400
+
+def test_copy_assigns_active_sales_user(app, headers, quote, sales_user):
+    response = app.test_client().post(
+        f'/api/v1/quotes/{quote.id}/copy', json={'sales_user_id': sales_user.id}, headers=headers
+    )
+    assert response.status_code == 201
+    assert response.get_json()['quote']['sales_user_id'] == sales_user.id
+
+def _failing(message):
+    calls = []
+
+    def operation():
+        calls.append(1)
+        raise IntegrityError('INSERT', {}, Exception(message))
+    return operation, calls
+
+def test_retry_only_on_number_conflict(app):
+    operation, calls = _failing('UNIQUE constraint failed: quotes.quote_number')
+    with pytest.raises(IntegrityError):
+        _with_number_retry(operation, 'quote_number')
+    assert len(calls) == NUMBER_RESERVE_ATTEMPTS
+
+    operation, calls = _failing('FOREIGN KEY constraint failed')
+    with pytest.raises(IntegrityError):
+        _with_number_retry(operation, 'quote_number')
+    assert len(calls) == 1
+
+def _accepted(quote):
+    quote.status = 'accepted'
+    db.session.commit()
+    return quote
+
+def test_convert_amounts_follow_live_items(app, headers, quote):
+    quote.discount_rate = Decimal('7.00')
+    db.session.add(QuoteItem(
+        quote_id=quote.id, product_name='已删除', quantity=Decimal('3'),
+        unit_price=Decimal('4.99'), total_price=Decimal('14.97')
+    ))
+    db.session.commit()
+    quote.calculate_totals()
+    quote.quote_items[-1].is_deleted = True
+    _accepted(quote)
+
+    response = app.test_client().post(f'/api/v1/quotes/{quote.id}/convert', json={}, headers=headers)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert Decimal(data['order']['subtotal']) == Decimal('150.00')
+    assert Decimal(data['contract']['contract_amount']) == Decimal(data['order']['total_amount'])
+    assert Decimal(data['contract']['remaining_amount']) == Decimal(data['order']['total_amount'])
+
+@pytest.mark.parametrize('body', [
+    {'create_order': 'false'},
+    {'create_order': 0},
+    {'title': ['合同']},
+    {'payment_terms': {'days': 30}},
+    {'shipping_phone': 13800000000},
+    {'shipping_phone': '1' * 21},
+    {'title': '合' * 201}
+])
+def test_convert_rejects_invalid_fields(app, headers, quote, body):
+    response = app.test_client().post(
+        f'/api/v1/quotes/{_accepted(quote).id}/convert', json=body, headers=headers
+    )
+    assert response.status_code == 400
+    assert 'INSERT' not in response.get_json()['error']
+
+def test_convert_without_order(app, headers, quote):
+    response = app.test_client().post(
+        f'/api/v1/quotes/{_accepted(quote).id}/convert',
+        json={'create_order': False, 'title': '销售合同', 'payment_terms': '款到发货'}, headers=headers
+    )
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data['order'] is None
+    assert data['contract']['title'] == '销售合同'
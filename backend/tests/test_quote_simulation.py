@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+报价折扣/税率模拟接口测试
+"""
+
+from decimal import Decimal
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from models import db, Quote, QuoteItem
+
+pytest.importorskip('numpy')
+
+@pytest.fixture
+def headers(sales_user):
+    return {'Authorization': f'Bearer {create_access_token(identity=sales_user.id)}'}
+
+@pytest.fixture
+def quote(customer):
+    quote = Quote('测试报价', customer.id, customer.sales_user_id, tax_rate=Decimal('13.00'))
+    db.session.add(quote)
+    db.session.flush()
+    for name, price, deleted in (('产品A', '100.00', False), ('产品B', '50.00', False), ('已删除', '999.00', True)):
+        db.session.add(QuoteItem(
+            quote_id=quote.id, product_name=name, quantity=Decimal('1'),
+            unit_price=Decimal(price), total_price=Decimal(price), is_deleted=deleted
+        ))
+    db.session.commit()
+    return quote
+
+@pytest.mark.parametrize('body', [[1, 2], 5, 'text', {'discount_rates': 5}, {'scenarios': 'ab'}])
+def test_invalid_body_is_rejected(app, headers, quote, body):
+    client = app.test_client()
+    assert client.post(f'/api/v1/quotes/{quote.id}/simulate', json=body, headers=headers).status_code == 400
+    assert client.post('/api/v1/quotes/simulate', json=body, headers=headers).status_code == 400
+
+def test_deleted_items_are_not_priced(app, headers, quote):
+    response = app.test_client().post(
+        f'/api/v1/quotes/{quote.id}/simulate', json={'discount_rates': [10]}, headers=headers
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert Decimal(data['current']['subtotal']) == Decimal('150.00')
+    scenario = data['scenarios'][0]
+    assert Decimal(scenario['discount_amount']) == Decimal('15.00')
+    assert Decimal(scenario['total_amount']) == Decimal('152.55')
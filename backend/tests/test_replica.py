@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+读写分离路由测试
+
+两个本地SQLite文件分别作为主库和只读副本（副本不同步主库的写入，相当于无限延迟的副本），
+副本延迟由 REPLICA_LAG_QUERY 读取副本中的 replica_lag 表模拟。
+"""
+
+import shutil
+import sqlite3
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from benchmarks.scenarios import QueryCounter, make_app
+from models import db, Customer, User
+from utils.replica import PRIMARY_UNTIL_HEADER
+
+LAG_TABLE = 'replica_lag'
+
+def _set_lag(path, seconds):
+    with sqlite3.connect(path) as conn:
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {LAG_TABLE} (seconds REAL)')
+        conn.execute(f'DELETE FROM {LAG_TABLE}')
+        conn.execute(f'INSERT INTO {LAG_TABLE} (seconds) VALUES (?)', (seconds,))
+
+@pytest.fixture
+def databases(tmp_path):
+    """建好表和一个客户的主库，以及它的副本文件"""
+    primary_path = tmp_path / 'primary.db'
+    replica_path = tmp_path / 'replica.db'
+    app = make_app(f'sqlite:///{primary_path}')
+    with app.app_context():
+        db.create_all(bind_key=None)
+        user = User(username='sales', email='sales@example.com', password='password')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Customer(name='原名', sales_user_id=user.id))
+        db.session.commit()
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    shutil.copyfile(primary_path, replica_path)
+    _set_lag(replica_path, 0)
+    return primary_path, replica_path
+
+@pytest.fixture
+def replica_app(databases):
+    primary_path, replica_path = databases
+    app = make_app(
+        f'sqlite:///{primary_path}',
+        SQLALCHEMY_BINDS={'replica': f'sqlite:///{replica_path}'},
+        REPLICA_MAX_LAG_SECONDS=5,
+        REPLICA_CHECK_INTERVAL=0,
+        REPLICA_LAG_QUERY=f'SELECT MAX(seconds) FROM {LAG_TABLE}',
+        CONDITIONAL_GET_ENABLED=False
+    )
+    with app.app_context():
+        app.primary_queries = QueryCounter(db.engines[None])
+        app.replica_queries = QueryCounter(db.engines['replica'])
+    return app
+
+@pytest.fixture
+def headers(replica_app):
+    with replica_app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+
+def _get_customer(app, headers, extra=None):
+    """读取客户详情，返回 (客户名称, 主库查询数, 副本查询数)"""
+    app.primary_queries.count = app.replica_queries.count = 0
+    response = app.test_client().get('/api/v1/customers/1', headers={**headers, **(extra or {})})
+    assert response.status_code == 200
+    return response.get_json()['customer']['name'], app.primary_queries.count, app.replica_queries.count
+
+def _rename(app, headers, name):
+    app.primary_queries.count = app.replica_queries.count = 0
+    response = app.test_client().put('/api/v1/customers/1', json={'name': name}, headers=headers)
+    assert response.status_code == 200
+    return response
+
+def test_reads_go_to_replica(replica_app, headers):
+    name, on_primary, on_replica = _get_customer(replica_app, headers)
+    assert name == '原名'
+    assert on_replica > 0
+    assert on_primary == 0
+
+def test_writes_go_to_primary(replica_app, headers):
+    response = _rename(replica_app, headers, '新名')
+    assert replica_app.primary_queries.count > 0
+    assert replica_app.replica_queries.count == 0
+    assert response.headers.get(PRIMARY_UNTIL_HEADER)
+
+def test_read_your_writes_window(replica_app, headers):
+    primary_until = _rename(replica_app, headers, '新名').headers[PRIMARY_UNTIL_HEADER]
+
+    # 窗口外读副本（副本没有同步，读到旧数据）
+    assert _get_customer(replica_app, headers)[:2] == ('原名', 0)
+
+    name, _, on_replica = _get_customer(replica_app, headers, {PRIMARY_UNTIL_HEADER: primary_until})
+    assert name == '新名'
+    assert on_replica == 0
+
+def test_lagging_replica_falls_back_to_primary(replica_app, headers, databases):
+    _, replica_path = databases
+    _rename(replica_app, headers, '新名')
+    monitor = replica_app.extensions['crm_replica']
+
+    _set_lag(replica_path, 60)
+    assert _get_customer(replica_app, headers)[0] == '新名'
+    assert not monitor.healthy
+    assert monitor.reason == 'lag'
+
+    _set_lag(replica_path, 1)
+    assert _get_customer(replica_app, headers)[0] == '原名'
+    assert monitor.healthy
+
+def test_unreachable_replica_falls_back_to_primary(databases, tmp_path):
+    primary_path, _ = databases
+    app = make_app(
+        f'sqlite:///{primary_path}',
+        SQLALCHEMY_BINDS={'replica': f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"},
+        REPLICA_CHECK_INTERVAL=60,
+        CONDITIONAL_GET_ENABLED=False
+    )
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+    response = app.test_client().get('/api/v1/customers/1', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['customer']['name'] == '原名'
+    monitor = app.extensions['crm_replica']
+    assert not monitor.healthy
+    assert monitor.reason == 'unreachable'
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+跟进提醒调度器测试
+"""
+
+from datetime import date, datetime, timedelta
+
+from models import db, Customer
+from utils.scheduler import FollowUpScheduler
+
+def test_watermark_follows_database_clock(app, customer):
+    # 数据库时钟比应用时钟慢一小时（如会话时区与UTC不同）
+    db_now = datetime.utcnow() - timedelta(hours=1)
+    Customer.query.filter_by(id=customer.id).update({Customer.updated_at: db_now})
+    db.session.commit()
+
+    scheduler = FollowUpScheduler()
+    scheduler.load()
+    assert scheduler.watermark == (db_now, 0)
+
+    follow_date = date.today() + timedelta(days=3)
+    Customer.query.filter_by(id=customer.id).update({
+        Customer.next_follow_date: follow_date,
+        Customer.updated_at: db_now + timedelta(minutes=1)
+    })
+    db.session.commit()
+    scheduler.refresh_changes()
+    assert scheduler.entries[customer.id][0] == follow_date
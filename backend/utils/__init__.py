@@ -5,19 +5,66 @@ CRM销售平台 - 工具包
 提供数据库、认证、验证、辅助等工具模块
 """
 
-from .database import DatabaseManager
-from .auth import AuthManager, require_auth, require_role, require_permission, optional_auth
-from .validators import (
-    Validator, ValidationError,
-    CustomerValidator, QuoteValidator, ContractValidator, OrderValidator, UserValidator,
-    validate_pagination_params
-)
-from .helpers import (
-    ResponseHelper, DateHelper, FileHelper, StringHelper, DataHelper, ExportHelper,
-    get_client_ip, get_user_agent, log_request,
-    safe_int, safe_float, safe_decimal
-)
-from .logger import setup_logger, get_logger, get_access_logger, RequestLogger, DatabaseLogger
+import importlib
+
+# 各子模块依赖较重（pymysql、bcrypt等），按需导入，避免导入工具包时全部加载
+_LAZY_IMPORTS = {
+    # 数据库
+    'DatabaseManager': 'database',
+    
+    # 认证
+    'AuthManager': 'auth',
+    'require_auth': 'auth',
+    'require_role': 'auth',
+    'require_permission': 'auth',
+    'optional_auth': 'auth',
+    
+    # 验证
+    'Validator': 'validators',
+    'ValidationError': 'validators',
+    'CustomerValidator': 'validators',
+    'QuoteValidator': 'validators',
+    'ContractValidator': 'validators',
+    'OrderValidator': 'validators',
+    'UserValidator': 'validators',
+    'validate_pagination_params': 'validators',
+    
+    # 辅助工具
+    'ResponseHelper': 'helpers',
+    'DateHelper': 'helpers',
+    'FileHelper': 'helpers',
+    'StringHelper': 'helpers',
+    'DataHelper': 'helpers',
+    'ExportHelper': 'helpers',
+    'get_client_ip': 'helpers',
+    'get_user_agent': 'helpers',
+    'log_request': 'helpers',
+    'safe_int': 'helpers',
+    'safe_float': 'helpers',
+    'safe_decimal': 'helpers',
+    'import_optional': 'helpers',
+    'parse_fieldset': 'helpers',
+    'encode_cursor': 'helpers',
+    'decode_cursor': 'helpers',
+    
+    # 日志
+    'setup_logger': 'logger',
+    'get_logger': 'logger',
+    'get_access_logger': 'logger',
+    'RequestLogger': 'logger',
+    'DatabaseLogger': 'logger'
+}
+
+def __getattr__(name):
+    """
+    按需导入工具类和函数
+    """
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     # 数据库
@@ -52,5 +99,9 @@ __all__ = [
     'log_request',
     'safe_int',
     'safe_float',
-    'safe_decimal'
+    'safe_decimal',
+    'import_optional',
+    'parse_fieldset',
+    'encode_cursor',
+    'decode_cursor'
 ]
\ No newline at end of file
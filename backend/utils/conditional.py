@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 条件请求
+
+为GET接口生成弱ETag和Last-Modified，请求携带的 If-None-Match / If-Modified-Since
+仍然有效时，在查询业务数据和序列化之前直接返回304：
+- 详情接口：一条查询读取主记录的 (id, updated_at)、序列化用到的关联记录（客户、销售员等
+  多对一关系）的updated_at，以及明细集合的 MAX(updated_at)、COUNT(*)
+  （按外键索引只读取该记录的明细），修改明细或改名客户/用户都会使指纹变化
+- 列表/统计接口：一条查询读取各表的 MAX(updated_at)、MAX(id)，均只读取索引末端，
+  不随表大小变慢（软删除会更新updated_at；硬删除只发生在单据归档中，
+  由归档表的 MAX(archived_at) 反映）
+
+ETag中混入请求路径、查询参数和当前用户，不同分页、筛选和用户之间互不复用。
+"""
+
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+from models import db
+
+# 指纹：(最后修改时间, 参与计算ETag的值)
+Fingerprint = Tuple[Optional[datetime], tuple]
+
+def etag_value(*parts) -> str:
+    """
+    由若干值生成ETag值（不含引号和W/前缀）
+
+    Args:
+        *parts: 参与计算的值
+
+    Returns:
+        str: ETag值
+    """
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return digest[:20]
+
+def _latest(*values) -> Optional[datetime]:
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+def _related_fingerprints(model) -> list:
+    """
+    详情序列化依赖的关联记录的指纹表达式（关联到 model 的当前行）
+    """
+    from sqlalchemy.orm import configure_mappers
+
+    configure_mappers()
+    expressions = []
+    relations = sorted({spec['relation'][0] for spec in model.serializer_extras.values() if 'relation' in spec})
+    for name in relations:
+        # 多对一关系：关联记录的updated_at
+        prop = getattr(model, name).property
+        target = prop.mapper.class_
+        (local, remote), = prop.local_remote_pairs
+        expressions.append(
+            db.select(target.updated_at).where(remote == local).scalar_subquery().label(f'{name}_updated_at')
+        )
+    for name in sorted(model.serializer_includes):
+        # 明细集合：按外键索引读取该记录全部明细的 MAX(updated_at)、COUNT(*)
+        prop = getattr(model, model.serializer_includes[name]).property
+        target = prop.mapper.class_
+        (local, remote), = prop.local_remote_pairs
+        expressions.append(
+            db.select(db.func.max(target.updated_at)).where(remote == local).scalar_subquery().label(f'{name}_updated_at')
+        )
+        expressions.append(
+            db.select(db.func.count()).select_from(target).where(remote == local).scalar_subquery().label(f'{name}_count')
+        )
+    return expressions
+
+def row_fingerprint(model, ident) -> Optional[Fingerprint]:
+    """
+    单条记录指纹（详情接口），一条查询读取主记录、关联记录和明细的修改时间
+
+    Args:
+        model: 模型类
+        ident: 主键值
+
+    Returns:
+        Optional[Fingerprint]: 记录不存在或已删除时返回None
+    """
+    row = db.session.query(model.id, model.updated_at, *_related_fingerprints(model)).filter(
+        model.id == ident,
+        model.is_deleted.is_(False)
+    ).first()
+    if row is None:
+        return None
+    values = tuple(row)
+    return _latest(*[value for value in values[1:] if isinstance(value, datetime)]), values
+
+def table_fingerprint(*models) -> Fingerprint:
+    """
+    表指纹（列表/统计接口），一条查询读取各表的 MAX(updated_at)、MAX(id)
+
+    Args:
+        *models: 响应内容依赖的模型类
+
+    Returns:
+        Fingerprint: 各表中最新的修改时间及各表的指纹
+    """
+    from models.archive import DOCUMENT_ARCHIVES
+
+    expressions = []
+    for model in models:
+        expressions.append(db.select(db.func.max(model.updated_at)).scalar_subquery())
+        expressions.append(db.select(db.func.max(model.id)).scalar_subquery())
+        archive = DOCUMENT_ARCHIVES.get(model.__tablename__)
+        if archive is not None:
+            # 归档会从原表删除单据
+            expressions.append(db.select(db.func.max(archive.table.c.archived_at)).scalar_subquery())
+    values = tuple(db.session.execute(db.select(*expressions)).one())
+
+    parts = []
+    position = 0
+    for model in models:
+        width = 3 if model.__tablename__ in DOCUMENT_ARCHIVES else 2
+        parts.append((model.__tablename__,) + values[position:position + width])
+        position += width
+    return _latest(*[value for value in values if isinstance(value, datetime)]), tuple(parts)
+
+def daily(result: Optional[Fingerprint]) -> Optional[Fingerprint]:
+    """
+    用于内容随日期变化的接口（如 is_overdue、is_expired）：
+    指纹混入当天日期，Last-Modified不早于当天零点
+
+    Args:
+        result: 原指纹
+
+    Returns:
+        Optional[Fingerprint]: 调整后的指纹
+    """
+    if result is None:
+        return None
+    last_modified, parts = result
+    today = datetime.utcnow().date()
+    midnight = datetime.combine(today, time.min)
+    if last_modified is None or last_modified < midnight:
+        last_modified = midnight
+    return last_modified, parts + (today,)
+
+def _not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    # If-None-Match优先；没有时才看If-Modified-Since（HTTP日期精度为秒）
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+def conditional_get(fingerprint: Callable[..., Optional[Fingerprint]]):
+    """
+    条件GET装饰器（放在 jwt_required 之后）
+
+    Args:
+        fingerprint: 接收视图参数、返回指纹的函数；返回None时直接执行视图（如404）
+
+    Returns:
+        装饰器函数
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET' or not current_app.config.get('CONDITIONAL_GET_ENABLED', True):
+                return f(*args, **kwargs)
+
+            result = fingerprint(**kwargs)
+            if result is None:
+                return f(*args, **kwargs)
+
+            last_modified, parts = result
+            etag = etag_value(request.full_path, get_jwt_identity(), *parts)
+
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # 允许浏览器保存，但每次使用前必须重新验证
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
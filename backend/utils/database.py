@@ -2,14 +2,17 @@
 """
 CRM销售平台 - 数据库管理工具
 
-提供数据库连接、查询、事务等功能
+提供数据库连接、查询、事务等功能（配置只读副本时查询默认走副本）
 """
 
+import time
 import pymysql
 import logging
 from contextlib import contextmanager
 from typing import Optional, Dict, Any, List, Tuple
 
+from .profiler import track_query
+
 class DatabaseManager:
     """
     数据库管理器
@@ -38,14 +41,34 @@ class DatabaseManager:
             'autocommit': False,
             'cursorclass': pymysql.cursors.DictCursor
         }
+        
+        # 只读副本连接配置（未配置时为None）
+        replica_host = config.get('MYSQL_REPLICA_HOST')
+        self.replica_config = dict(
+            self.db_config,
+            host=replica_host,
+            port=config.get('MYSQL_REPLICA_PORT') or self.db_config['port']
+        ) if replica_host else None
+        
+        # 本管理器写入后的读己之写窗口（秒），窗口内的查询走主库
+        self.read_your_writes_seconds = float(config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10))
+        self._primary_until = 0.0
     
-    def get_connection(self) -> Optional[pymysql.Connection]:
+    def get_connection(self, replica: bool = False) -> Optional[pymysql.Connection]:
         """
         获取数据库连接
         
+        Args:
+            replica: 是否连接只读副本（未配置或连接失败时使用主库）
+        
         Returns:
             pymysql.Connection: 数据库连接对象，失败时返回None
         """
+        if replica and self.replica_config is not None:
+            try:
+                return pymysql.connect(**self.replica_config)
+            except Exception as e:
+                self.logger.warning(f'只读副本连接失败，改用主库: {str(e)}')
         try:
             connection = pymysql.connect(**self.db_config)
             return connection
@@ -53,17 +76,29 @@ class DatabaseManager:
             self.logger.error(f'数据库连接失败: {str(e)}')
             return None
     
+    def _use_replica(self, use_replica: bool) -> bool:
+        if not use_replica or self.replica_config is None or time.monotonic() < self._primary_until:
+            return False
+        from .replica import replica_allowed
+        return replica_allowed()
+    
+    def _mark_write(self):
+        self._primary_until = time.monotonic() + self.read_your_writes_seconds
+    
     @contextmanager
-    def get_db_connection(self):
+    def get_db_connection(self, replica: bool = False):
         """
         获取数据库连接的上下文管理器
         
+        Args:
+            replica: 是否连接只读副本
+        
         Yields:
             pymysql.Connection: 数据库连接对象
         """
         connection = None
         try:
-            connection = self.get_connection()
+            connection = self.get_connection(replica)
             if connection is None:
                 raise Exception('无法获取数据库连接')
             yield connection
@@ -98,43 +133,49 @@ class DatabaseManager:
             if cursor:
                 cursor.close()
     
-    def execute_query(self, sql: str, params: Optional[Tuple] = None) -> List[Dict[str, Any]]:
+    def execute_query(self, sql: str, params: Optional[Tuple] = None, use_replica: bool = True) -> List[Dict[str, Any]]:
         """
         执行查询语句
         
         Args:
             sql: SQL查询语句
             params: 查询参数
+            use_replica: 是否允许使用只读副本（副本未配置、不可用或处于读己之写窗口时使用主库）
             
         Returns:
             List[Dict[str, Any]]: 查询结果列表
         """
         try:
-            with self.get_db_connection() as connection:
+            with self.get_db_connection(self._use_replica(use_replica)) as connection:
                 with self.get_db_cursor(connection) as cursor:
-                    cursor.execute(sql, params)
-                    results = cursor.fetchall()
+                    with track_query(sql, params) as tracked:
+                        cursor.execute(sql, params)
+                        results = cursor.fetchall()
+                        tracked['rows'] = len(results)
                     return results
         except Exception as e:
             self.logger.error(f'查询执行失败: {str(e)}, SQL: {sql}, Params: {params}')
             raise
     
-    def execute_query_one(self, sql: str, params: Optional[Tuple] = None) -> Optional[Dict[str, Any]]:
+    def execute_query_one(self, sql: str, params: Optional[Tuple] = None, use_replica: bool = True) -> Optional[Dict[str, Any]]:
         """
         执行查询语句并返回单条记录
         
         Args:
             sql: SQL查询语句
             params: 查询参数
+            use_replica: 是否允许使用只读副本（副本未配置、不可用或处于读己之写窗口时使用主库）
             
         Returns:
             Optional[Dict[str, Any]]: 查询结果，无结果时返回None
         """
         try:
-            with self.get_db_connection() as connection:
+            with self.get_db_connection(self._use_replica(use_replica)) as connection:
                 with self.get_db_cursor(connection) as cursor:
-                    cursor.execute(sql, params)
-                    result = cursor.fetchone()
+                    with track_query(sql, params) as tracked:
+                        cursor.execute(sql, params)
+                        result = cursor.fetchone()
+                        tracked['rows'] = 1 if result else 0
                     return result
         except Exception as e:
             self.logger.error(f'单条查询执行失败: {str(e)}, SQL: {sql}, Params: {params}')
@@ -154,8 +195,11 @@ class DatabaseManager:
         try:
             with self.get_db_connection() as connection:
                 with self.get_db_cursor(connection) as cursor:
-                    affected_rows = cursor.execute(sql, params)
+                    with track_query(sql, params) as tracked:
+                        affected_rows = cursor.execute(sql, params)
+                        tracked['rows'] = affected_rows
                     connection.commit()
+                    self._mark_write()
                     return affected_rows
         except Exception as e:
             self.logger.error(f'更新执行失败: {str(e)}, SQL: {sql}, Params: {params}')
@@ -175,9 +219,11 @@ class DatabaseManager:
         try:
             with self.get_db_connection() as connection:
                 with self.get_db_cursor(connection) as cursor:
-                    cursor.execute(sql, params)
+                    with track_query(sql, params) as tracked:
+                        tracked['rows'] = cursor.execute(sql, params)
                     insert_id = connection.insert_id()
                     connection.commit()
+                    self._mark_write()
                     return insert_id
         except Exception as e:
             self.logger.error(f'插入执行失败: {str(e)}, SQL: {sql}, Params: {params}')
@@ -197,8 +243,11 @@ class DatabaseManager:
         try:
             with self.get_db_connection() as connection:
                 with self.get_db_cursor(connection) as cursor:
-                    affected_rows = cursor.executemany(sql, params_list)
+                    with track_query(sql) as tracked:
+                        affected_rows = cursor.executemany(sql, params_list)
+                        tracked['rows'] = affected_rows
                     connection.commit()
+                    self._mark_write()
                     return affected_rows
         except Exception as e:
             self.logger.error(f'批量执行失败: {str(e)}, SQL: {sql}')
@@ -225,6 +274,7 @@ class DatabaseManager:
             yield connection, cursor
             
             connection.commit()
+            self._mark_write()
         except Exception as e:
             if connection:
                 connection.rollback()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 并发查询
+
+仪表盘、统计类接口往往依次执行多条互不依赖的聚合查询，响应时间是各条查询耗时之和。
+fan_out 把这些查询提交到线程池，每个任务在复制的请求上下文中使用独立的数据库会话
+（从连接池取得各自的连接），响应时间接近最慢的一条查询：
+- 每条查询有超时时间，超时或出错的查询取默认值，结果标记为部分结果
+- 任务继承本请求的读写路由（utils.replica），任务内的查询计入本请求的指标和SQL分析
+- 未开启（FANOUT_ENABLED）、不在请求中或只有一条查询时在当前线程按顺序执行
+
+任务应返回普通值（数字、元组、字典），任务结束后会话即关闭，ORM对象会处于分离状态。
+超时的任务无法中断，会在后台执行完后丢弃结果；FANOUT_MAX_WORKERS 应小于数据库连接池
+可用的连接数（pool_size + max_overflow）。
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from flask import copy_current_request_context, current_app, g, has_request_context
+
+from .metrics import registry
+
+logger = logging.getLogger('crm.db')
+
+class FanOutResult:
+    """
+    并发查询结果
+    """
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    @property
+    def partial(self) -> bool:
+        """是否有查询超时或失败"""
+        return bool(self.errors)
+
+    def meta(self) -> Dict[str, Any]:
+        """
+        附加在响应中的执行信息
+
+        Returns:
+            Dict[str, Any]: partial和失败的查询名
+        """
+        return {'partial': self.partial, 'failed': sorted(self.errors)}
+
+class _FanOutState:
+    # 线程池在首次使用时创建（gunicorn预加载时不在主进程中启动线程），fork后重建
+    def __init__(self, max_workers: int, timeout: Optional[float]):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crm-fanout')
+                    self._pid = pid
+        return self._executor
+
+    def backlog(self) -> int:
+        # 已提交但尚未开始执行的任务数
+        if self._executor is None or self._pid != os.getpid():
+            return 0
+        return self._executor._work_queue.qsize()
+
+def _run_task(func: Callable[[], Any], route: Optional[str], track_metrics: bool, profile: bool):
+    # 在复制的请求上下文中执行（新的应用上下文，g和数据库会话都是独立的）
+    g.db_route = route
+    if track_metrics:
+        g.metrics_start_ns = time.perf_counter_ns()
+        g.metrics_db_queries = 0
+        g.metrics_db_time_ns = 0
+    if profile:
+        from .profiler import RequestProfile
+        g.sql_profile = RequestProfile()
+
+    start = time.perf_counter()
+    value = func()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return value, elapsed_ms, (g.get('metrics_db_queries', 0), g.get('metrics_db_time_ns', 0), g.get('sql_profile'))
+
+def _merge_trackers(trackers):
+    queries, db_time_ns, profile = trackers
+    if 'metrics_start_ns' in g:
+        g.metrics_db_queries = g.get('metrics_db_queries', 0) + queries
+        g.metrics_db_time_ns = g.get('metrics_db_time_ns', 0) + db_time_ns
+    parent_profile = g.get('sql_profile')
+    if parent_profile is not None and profile is not None:
+        parent_profile.merge(profile)
+
+def _fail(result: FanOutResult, name: str, reason: str, detail: str):
+    result.errors[name] = detail
+    registry.inc('crm_fanout_failures_total', query=name, reason=reason)
+    logger.warning(f'并发查询 {name} {"超时" if reason == "timeout" else "失败"}: {detail}')
+
+def _run_inline(queries: Dict[str, Callable[[], Any]], result: FanOutResult):
+    from models import db
+
+    for name, func in queries.items():
+        start = time.perf_counter()
+        try:
+            result.values[name] = func()
+        except Exception as e:
+            db.session.rollback()
+            _fail(result, name, 'error', str(e))
+        else:
+            result.timings[name] = (time.perf_counter() - start) * 1000
+
+def fan_out(queries: Dict[str, Callable[[], Any]], timeout: Optional[float] = None,
+            timeouts: Optional[Dict[str, float]] = None,
+            defaults: Optional[Dict[str, Any]] = None) -> FanOutResult:
+    """
+    并发执行互不依赖的只读查询
+
+    Args:
+        queries: 查询名 -> 无参函数（返回普通值）
+        timeout: 每条查询的超时时间（秒），默认FANOUT_TIMEOUT，None表示不限
+        timeouts: 单独指定部分查询的超时时间
+        defaults: 查询超时或失败时使用的值，默认None
+
+    Returns:
+        FanOutResult: 各查询的结果、失败原因和耗时（毫秒）
+    """
+    result = FanOutResult()
+    state: Optional[_FanOutState] = current_app.extensions.get('crm_fanout')
+
+    if state is None or not has_request_context() or len(queries) < 2:
+        _run_inline(queries, result)
+    else:
+        if timeout is None:
+            timeout = state.timeout
+        executor = state.executor()
+        route = g.get('db_route')
+        track_metrics = 'metrics_start_ns' in g
+        profile = g.get('sql_profile') is not None
+
+        start = time.monotonic()
+        futures = {
+            name: executor.submit(copy_current_request_context(_run_task), func, route, track_metrics, profile)
+            for name, func in queries.items()
+        }
+        for name, future in futures.items():
+            limit = (timeouts or {}).get(name, timeout)
+            remaining = None if limit is None else max(0.0, start + limit - time.monotonic())
+            try:
+                value, elapsed_ms, trackers = future.result(remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                _fail(result, name, 'timeout', f'超过 {limit}s')
+            except Exception as e:
+                _fail(result, name, 'error', str(e))
+            else:
+                result.values[name] = value
+                result.timings[name] = elapsed_ms
+                _merge_trackers(trackers)
+
+    for name in result.errors:
+        result.values[name] = (defaults or {}).get(name)
+    return result
+
+def init_fanout(app):
+    """
+    根据配置启用并发查询
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('FANOUT_ENABLED', True):
+        return
+    timeout = app.config.get('FANOUT_TIMEOUT', 5.0)
+    app.extensions['crm_fanout'] = _FanOutState(
+        max_workers=int(app.config.get('FANOUT_MAX_WORKERS', 8)),
+        timeout=float(timeout) if timeout else None
+    )
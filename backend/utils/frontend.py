@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 前端打包产物服务
+
+不经过nginx部署时，由Flask直接提供 frontend/build.py 的构建结果（FRONTEND_DIST_DIR）：
+- /app/                入口页，每次重新验证（no-cache）
+- /app/assets/<文件>   带内容哈希的脚本和样式，缓存一年（immutable）
+"""
+
+import os
+
+from flask import send_from_directory
+
+# 哈希文件名的缓存时间（秒）
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+def init_frontend(app):
+    """
+    注册前端打包产物路由（FRONTEND_DIST_DIR未配置或未构建时不注册）
+
+    Args:
+        app: Flask应用实例
+    """
+    dist_dir = app.config.get('FRONTEND_DIST_DIR')
+    if not dist_dir:
+        return
+    dist_dir = os.path.abspath(dist_dir)
+    if not os.path.isfile(os.path.join(dist_dir, 'index.html')):
+        app.logger.warning(f'前端打包产物不存在，请先执行 python frontend/build.py: {dist_dir}')
+        return
+    assets_dir = os.path.join(dist_dir, 'assets')
+
+    @app.route('/app/')
+    def frontend_index():
+        response = send_from_directory(dist_dir, 'index.html', max_age=0)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    @app.route('/app/assets/<path:filename>')
+    def frontend_asset(filename):
+        response = send_from_directory(assets_dir, filename, max_age=ASSET_MAX_AGE)
+        response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+        return response
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 健康检查
+
+- /health/live   存活探针：不访问数据库和外部服务，进程能处理请求即返回200
+- /health/ready  就绪探针：返回后台探测器最近一次的结果，未就绪时返回503
+- /health        兼容旧地址，与 /health/ready 相同
+
+HealthProber 在每个工作进程中按 HEALTH_PROBE_INTERVAL 执行一次全部检查（数据库连接池、
+缓存、队列等），探针请求只读取结果，无论有多少探针请求都不会额外连接数据库。
+后台任务未启动时（开发服务器、测试），结果过期后由一个请求线程补做一次检查。
+其他模块可通过 register_health_check 增加检查项。
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app, jsonify
+
+from .helpers import import_optional
+from .scheduler import PeriodicTask, register_task
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = 'healthy'
+DEGRADED = 'degraded'
+UNHEALTHY = 'unhealthy'
+NOT_CONFIGURED = 'not_configured'
+
+# 检查函数：返回包含status的字典
+HealthCheck = Callable[[], Dict[str, Any]]
+
+class HealthProber:
+    """
+    进程内健康探测器
+    """
+
+    def __init__(self, app, interval: float = 10.0):
+        """
+        Args:
+            app: Flask应用实例
+            interval: 探测间隔（秒）
+        """
+        self.app = app
+        self.interval = interval
+        self.checks: Dict[str, Tuple[HealthCheck, bool]] = {}
+        self.report: Optional[Dict[str, Any]] = None
+        self.checked_at = 0.0
+        self.probes = 0
+        self._lock = threading.Lock()
+
+    def add_check(self, name: str, check: HealthCheck, critical: bool = False):
+        """
+        增加检查项
+
+        Args:
+            name: 名称
+            check: 检查函数
+            critical: 失败时是否视为未就绪（否则只标记为降级）
+        """
+        self.checks[name] = (check, critical)
+
+    def probe(self) -> Dict[str, Any]:
+        """
+        立即执行全部检查并保存结果
+
+        Returns:
+            Dict[str, Any]: 检查结果
+        """
+        results = {}
+        ready = True
+        degraded = False
+        with self.app.app_context():
+            for name, (check, critical) in self.checks.items():
+                start = time.perf_counter()
+                try:
+                    result = check()
+                except Exception as e:
+                    result = {'status': UNHEALTHY, 'error': str(e)}
+                result['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+                results[name] = result
+                if result['status'] in (UNHEALTHY, DEGRADED):
+                    if critical and result['status'] == UNHEALTHY:
+                        ready = False
+                    else:
+                        degraded = True
+
+        self.report = {
+            'status': 'ready' if ready else 'not_ready',
+            'degraded': degraded,
+            'checks': results,
+            'checked_at': datetime.now().isoformat(),
+            'pid': os.getpid()
+        }
+        self.checked_at = time.monotonic()
+        self.probes += 1
+        if not ready:
+            logger.warning(f'就绪检查未通过: {results}')
+        return self.report
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """
+        最近一次结果；后台任务未运行导致结果过期时，由一个线程补做检查
+
+        Returns:
+            Optional[Dict[str, Any]]: 检查结果，首次检查尚未完成时返回None
+        """
+        if time.monotonic() - self.checked_at >= self.interval * 2 and self._lock.acquire(blocking=False):
+            try:
+                if time.monotonic() - self.checked_at >= self.interval * 2:
+                    self.probe()
+            finally:
+                self._lock.release()
+        if self.report is None:
+            return None
+        return dict(self.report, age_seconds=round(time.monotonic() - self.checked_at, 1))
+
+    def run_scheduled(self):
+        """
+        后台任务入口
+        """
+        with self._lock:
+            self.probe()
+
+def register_health_check(app, name: str, check: HealthCheck, critical: bool = False):
+    """
+    注册健康检查项
+
+    Args:
+        app: Flask应用实例
+        name: 名称
+        check: 检查函数（在应用上下文中调用，返回包含status的字典）
+        critical: 失败时是否视为未就绪
+    """
+    app.extensions['crm_health'].add_check(name, check, critical)
+
+def _pool_status(pool) -> Dict[str, Any]:
+    status = {}
+    for key, method in (('size', 'size'), ('checked_out', 'checkedout'), ('checked_in', 'checkedin'), ('overflow', 'overflow')):
+        if hasattr(pool, method):
+            status[key] = getattr(pool, method)()
+    max_overflow = getattr(pool, '_max_overflow', None)
+    if max_overflow is not None and 'size' in status:
+        status['capacity'] = status['size'] + max(0, max_overflow)
+    return status
+
+def check_database() -> Dict[str, Any]:
+    """
+    数据库：从连接池取一个连接执行 SELECT 1，并报告连接池使用情况
+    """
+    from sqlalchemy import text
+    from models import db
+
+    engine = db.engine
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    pool = _pool_status(engine.pool)
+    status = HEALTHY
+    if 'capacity' in pool and pool.get('checked_out', 0) >= pool['capacity']:
+        status = DEGRADED
+    return {'status': status, 'pool': pool}
+
+def check_replica() -> Dict[str, Any]:
+    """
+    只读副本：读取副本监控的状态（不可用时查询由主库承担，只标记为降级）
+    """
+    from .replica import get_replica_monitor
+
+    monitor = get_replica_monitor()
+    if monitor is None:
+        return {'status': NOT_CONFIGURED}
+    available = monitor.available()
+    return {'status': HEALTHY if available else DEGRADED, 'lag_seconds': monitor.lag, 'reason': monitor.reason}
+
+def _redis_targets(app) -> Dict[str, str]:
+    targets = {}
+    if app.config.get('REDIS_URL'):
+        targets['cache'] = app.config['REDIS_URL']
+    storage = app.config.get('RATE_LIMIT_STORAGE_URL') or ''
+    if app.config.get('RATE_LIMIT_ENABLED', False) and storage.startswith(('redis://', 'rediss://')):
+        targets['rate_limit'] = storage
+    return targets
+
+def make_cache_check(app) -> HealthCheck:
+    """
+    缓存：PING配置的Redis（REDIS_URL、限流存储）
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        HealthCheck: 检查函数
+    """
+    targets = _redis_targets(app)
+    clients = {}
+
+    def check():
+        if not targets:
+            return {'status': NOT_CONFIGURED}
+        if not clients:
+            redis = import_optional('redis', '检查Redis缓存')
+            for name, url in targets.items():
+                clients[name] = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        results = {}
+        for name, client in clients.items():
+            try:
+                client.ping()
+                results[name] = HEALTHY
+            except Exception as e:
+                results[name] = f'{UNHEALTHY}: {str(e)}'
+        status = HEALTHY if all(value == HEALTHY for value in results.values()) else UNHEALTHY
+        return {'status': status, 'targets': results}
+    return check
+
+def check_queues() -> Dict[str, Any]:
+    """
+    队列：后台任务线程、过载保护排队、并发查询积压
+    """
+    app = current_app
+    status = HEALTHY
+
+    tasks = {}
+    for task in app.extensions.get('crm_tasks', []):
+        tasks[task.name] = 'running' if task.running else ('stopped' if task.started else 'not_started')
+        if task.started and not task.running:
+            status = DEGRADED
+
+    shedding = {}
+    for name, limiter in app.extensions.get('crm_load_shedding', {}).items():
+        shedding[name] = {
+            'active': limiter.active,
+            'waiting': limiter.waiting,
+            'limit': round(limiter.limit, 2),
+            'queue_size': limiter.queue_size
+        }
+        if limiter.queue_size and limiter.waiting >= limiter.queue_size:
+            status = DEGRADED
+
+    fanout = app.extensions.get('crm_fanout')
+    result = {'status': status, 'tasks': tasks, 'load_shedding': shedding}
+    if fanout is not None:
+        result['fanout_backlog'] = fanout.backlog()
+    return result
+
+def _ready_response(prober: HealthProber):
+    report = prober.latest()
+    if report is None:
+        return jsonify({'status': 'starting'}), 503
+    return jsonify(report), 200 if report['status'] == 'ready' else 503
+
+def init_health(app):
+    """
+    注册健康检查路由和后台探测任务
+
+    Args:
+        app: Flask应用实例
+    """
+    interval = float(app.config.get('HEALTH_PROBE_INTERVAL', 10))
+    prober = HealthProber(app, interval)
+    app.extensions['crm_health'] = prober
+    prober.add_check('database', check_database, critical=True)
+    prober.add_check('replica', check_replica)
+    prober.add_check('cache', make_cache_check(app))
+    prober.add_check('queues', check_queues)
+
+    register_task(app, PeriodicTask('health_probe', interval, prober.run_scheduled))
+
+    started = time.monotonic()
+
+    @app.route('/health/live')
+    def health_live():
+        """
+        存活探针（不做任何I/O）
+        """
+        return jsonify({'status': 'alive', 'pid': os.getpid(), 'uptime_seconds': round(time.monotonic() - started, 1)})
+
+    @app.route('/health/ready')
+    def health_ready():
+        """
+        就绪探针（返回后台探测结果）
+        """
+        return _ready_response(prober)
+
+    @app.route('/health')
+    def health_check():
+        """
+        健康检查（兼容旧地址，与 /health/ready 相同）
+        """
+        return _ready_response(prober)
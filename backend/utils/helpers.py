@@ -12,6 +12,7 @@ import logging
 import json
 import csv
 import io
+import base64
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, date, timedelta
 from decimal import Decimal
@@ -588,6 +589,41 @@ class DataHelper:
         """
         return {k: v for k, v in data.items() if v is not None}
 
+# 可选依赖：模块名 -> pip包名
+OPTIONAL_DEPENDENCIES = {
+    'pandas': 'pandas',
+    'openpyxl': 'openpyxl',
+    'reportlab': 'reportlab',
+    'PIL': 'Pillow',
+    'numpy': 'numpy',
+    'redis': 'redis'
+}
+
+def import_optional(module_name: str, feature: str = ''):
+    """
+    按需导入可选依赖
+    
+    可选依赖（pandas、openpyxl、reportlab、Pillow等）只在真正使用的功能中导入，
+    避免拖慢应用启动；未安装时抛出带安装提示的ImportError。
+    
+    Args:
+        module_name: 模块名，如 'pandas'、'PIL.Image'
+        feature: 使用该依赖的功能描述，用于错误提示
+        
+    Returns:
+        module: 导入的模块
+    """
+    import importlib
+    
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        package = OPTIONAL_DEPENDENCIES.get(module_name.split('.')[0], module_name.split('.')[0])
+        message = f'需要安装{package}库'
+        if feature:
+            message += f'才能{feature}'
+        raise ImportError(f'{message}（pip install {package}）')
+
 class ExportHelper:
     """
     导出辅助类
@@ -645,36 +681,33 @@ class ExportHelper:
         Returns:
             bytes: Excel内容
         """
-        try:
-            import pandas as pd
-            
-            if not data:
-                df = pd.DataFrame()
-            else:
-                # 处理特殊类型
-                processed_data = []
-                for row in data:
-                    processed_row = {}
-                    for key, value in row.items():
-                        if isinstance(value, (datetime, date)):
-                            processed_row[key] = value.isoformat()
-                        elif isinstance(value, Decimal):
-                            processed_row[key] = float(value)
-                        else:
-                            processed_row[key] = value
-                    processed_data.append(processed_row)
-                
-                df = pd.DataFrame(processed_data)
-            
-            # 保存到内存
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Sheet1')
-            
-            return output.getvalue()
+        pd = import_optional('pandas', '导出Excel文件')
+        import_optional('openpyxl', '导出Excel文件')
         
-        except ImportError:
-            raise ImportError('需要安装pandas和openpyxl库才能导出Excel文件')
+        if not data:
+            df = pd.DataFrame()
+        else:
+            # 处理特殊类型
+            processed_data = []
+            for row in data:
+                processed_row = {}
+                for key, value in row.items():
+                    if isinstance(value, (datetime, date)):
+                        processed_row[key] = value.isoformat()
+                    elif isinstance(value, Decimal):
+                        processed_row[key] = float(value)
+                    else:
+                        processed_row[key] = value
+                processed_data.append(processed_row)
+            
+            df = pd.DataFrame(processed_data)
+        
+        # 保存到内存
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='Sheet1')
+        
+        return output.getvalue()
 
 def get_client_ip() -> str:
     """
@@ -753,4 +786,54 @@ def safe_decimal(value: Any, default: Decimal = None) -> Decimal:
     try:
         return Decimal(str(value))
     except (ValueError, TypeError, InvalidOperation):
-        return default
\ No newline at end of file
+        return default
+
+def parse_fieldset(value: Optional[str]) -> Optional[frozenset]:
+    """
+    解析逗号分隔的字段列表（fields= / include= 查询参数）
+    
+    Args:
+        value: 参数值
+        
+    Returns:
+        Optional[frozenset]: 字段集合，未传参数时为None
+    """
+    if value is None:
+        return None
+    return frozenset(item.strip() for item in value.split(',') if item.strip())
+
+def encode_cursor(*values) -> str:
+    """
+    把排序键编码为游标（keyset分页的 after= 参数）
+    
+    Args:
+        *values: 最后一行的排序键，datetime按ISO格式保存
+        
+    Returns:
+        str: URL安全的游标字符串
+    """
+    data = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    解析游标
+    
+    Args:
+        cursor: encode_cursor 生成的游标
+        size: 排序键个数
+        
+    Returns:
+        List[Any]: 排序键
+        
+    Raises:
+        ValueError: 游标格式错误
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError('游标格式错误') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('游标格式错误')
+    return values
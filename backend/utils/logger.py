@@ -6,6 +6,7 @@ CRM销售平台 - 日志工具
 """
 
 import os
+import time
 import logging
 import logging.handlers
 from datetime import datetime
@@ -198,7 +199,7 @@ class RequestLogger:
         """
         from flask import request, g
         
-        g.start_time = datetime.now()
+        g.request_log_start_ns = time.perf_counter_ns()
         
         # 记录请求开始
         access_logger = get_access_logger()
@@ -218,8 +219,8 @@ class RequestLogger:
         from utils.helpers import get_client_ip, get_user_agent
         
         # 计算请求耗时
-        if hasattr(g, 'start_time'):
-            duration = (datetime.now() - g.start_time).total_seconds()
+        if 'request_log_start_ns' in g:
+            duration = (time.perf_counter_ns() - g.request_log_start_ns) / 1e9
         else:
             duration = 0
         
@@ -227,9 +228,7 @@ class RequestLogger:
         user_id = None
         try:
             from flask_jwt_extended import get_jwt_identity
-            current_user = get_jwt_identity()
-            if current_user:
-                user_id = current_user.get('user_id')
+            user_id = get_jwt_identity()
         except Exception:
             pass
         
@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 请求指标采集
+
+使用 time.perf_counter_ns 记录每个路由的：
+1. 请求延迟分布（HDR风格的对数-线性分桶直方图）
+2. 每个请求的数据库查询次数和数据库耗时
+3. 响应体大小
+
+多个gunicorn工作进程的指标通过文件存储汇总：每个进程定期把自己的快照
+原子写入 METRICS_DIR/metrics_<pid>.json，/metrics 读取全部快照合并后
+以Prometheus文本格式输出。工作进程退出（max_requests回收等）后，主进程把它的快照
+并入累计文件 metrics_retired.json 并删除，快照文件数不超过在运行的工作进程数 + 1。
+
+/metrics 默认关闭（METRICS_ENABLED），开启后只允许 METRICS_ALLOWED_NETWORKS 中的地址
+直接访问，经反向代理转发（带X-Forwarded-For）的请求一律拒绝。
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import ipaddress
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Response, g, has_request_context, request
+
+from .helpers import ResponseHelper
+
+logger = logging.getLogger(__name__)
+
+def _log_linear_bounds(low_exp: int, high_exp: int, mantissas: Tuple[float, ...]) -> List[float]:
+    """
+    生成对数-线性分桶边界：每个数量级内按固定尾数线性细分
+
+    Args:
+        low_exp: 最小数量级（10的幂）
+        high_exp: 最大数量级（10的幂）
+        mantissas: 每个数量级内的尾数
+
+    Returns:
+        List[float]: 递增的分桶上界
+    """
+    return [round(m * 10 ** e, 9) for e in range(low_exp, high_exp + 1) for m in mantissas]
+
+# 延迟分桶（秒）：0.1ms ~ 75s，每个数量级6个桶，相对误差约50%以内
+LATENCY_BUCKETS = _log_linear_bounds(-4, 1, (1, 1.5, 2, 3, 5, 7.5))
+
+# 响应大小分桶（字节）：256B ~ 16MB，按4倍递增
+SIZE_BUCKETS = [256 * 4 ** i for i in range(9)]
+
+# 每请求查询次数分桶
+QUERY_COUNT_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100, 200]
+
+class Histogram:
+    """
+    固定分桶直方图
+
+    只保存每个桶的计数、总和与样本数，可跨进程直接相加合并。
+    """
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        记录一个样本
+
+        Args:
+            value: 样本值
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'counts': list(self.counts), 'sum': self.sum, 'count': self.count}
+
+    def merge(self, data: Dict[str, Any]):
+        """
+        合并另一个直方图快照
+
+        Args:
+            data: to_dict() 的结果
+        """
+        for i, value in enumerate(data.get('counts', [])[:len(self.counts)]):
+            self.counts[i] += value
+        self.sum += data.get('sum', 0)
+        self.count += data.get('count', 0)
+
+class RouteMetrics:
+    """
+    单个路由（方法 + URL规则）的指标
+    """
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time_seconds = 0.0
+        self.status = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'latency': self.latency.to_dict(),
+            'response_size': self.response_size.to_dict(),
+            'db_queries': self.db_queries.to_dict(),
+            'db_time_seconds': self.db_time_seconds,
+            'status': dict(self.status)
+        }
+
+    def merge(self, data: Dict[str, Any]):
+        self.latency.merge(data.get('latency', {}))
+        self.response_size.merge(data.get('response_size', {}))
+        self.db_queries.merge(data.get('db_queries', {}))
+        self.db_time_seconds += data.get('db_time_seconds', 0.0)
+        for status, count in data.get('status', {}).items():
+            self.status[status] = self.status.get(status, 0) + count
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe_request(self, method: str, route: str, status: int, duration_ns: int,
+                        response_bytes: Optional[int], db_queries: int, db_time_ns: int):
+        """
+        记录一次请求
+
+        Args:
+            method: HTTP方法
+            route: URL规则
+            status: 响应状态码
+            duration_ns: 请求耗时（纳秒）
+            response_bytes: 响应体大小，未知时为None
+            db_queries: 数据库查询次数
+            db_time_ns: 数据库耗时（纳秒）
+        """
+        with self.lock:
+            metrics = self.routes.get((method, route))
+            if metrics is None:
+                metrics = self.routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(duration_ns / 1e9)
+            if response_bytes is not None:
+                metrics.response_size.observe(response_bytes)
+            metrics.db_queries.observe(db_queries)
+            metrics.db_time_seconds += db_time_ns / 1e9
+            key = str(status)
+            metrics.status[key] = metrics.status.get(key, 0) + 1
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        累加计数器
+
+        Args:
+            name: 指标名
+            value: 增量
+            **labels: 标签
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出可序列化的快照
+        """
+        with self.lock:
+            return {
+                'routes': [
+                    {'method': method, 'route': route, **metrics.to_dict()}
+                    for (method, route), metrics in self.routes.items()
+                ],
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.counters.items()
+                ]
+            }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """
+        合并其他进程的快照
+        """
+        with self.lock:
+            for item in snapshot.get('routes', []):
+                key = (item['method'], item['route'])
+                metrics = self.routes.get(key)
+                if metrics is None:
+                    metrics = self.routes[key] = RouteMetrics()
+                metrics.merge(item)
+            for item in snapshot.get('counters', []):
+                key = (item['name'], tuple(sorted(item['labels'].items())))
+                self.counters[key] = self.counters.get(key, 0) + item['value']
+
+class FileMetricsStore:
+    """
+    基于文件的跨进程指标存储
+
+    每个进程写自己的快照文件，读取时合并全部文件。
+    已退出进程的快照并入累计文件（retire），保证计数器单调递增；服务启动时清空目录。
+    """
+
+    RETIRED_FILE = 'metrics_retired.json'
+
+    def __init__(self, directory: str, flush_interval: float = 5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.last_flush = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, pid: int) -> str:
+        return os.path.join(self.directory, f'metrics_{pid}.json')
+
+    def flush(self, registry: MetricsRegistry, force: bool = False):
+        """
+        把当前进程的快照写入文件（按间隔节流）
+
+        Args:
+            registry: 指标注册表
+            force: 是否忽略节流间隔
+        """
+        now = time.monotonic()
+        if not force and now - self.last_flush < self.flush_interval:
+            return
+        self.last_flush = now
+
+        try:
+            self._write(self.path_for(os.getpid()), registry.snapshot())
+        except OSError as e:
+            logger.warning(f'写入指标快照失败: {str(e)}')
+
+    def _write(self, path: str, data: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.metrics_')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f'读取指标快照失败: {name} - {str(e)}')
+            return None
+
+    @staticmethod
+    def _pid_of(name: str) -> Optional[int]:
+        # metrics_<pid>.json 中的pid，其他文件返回None
+        if not (name.startswith('metrics_') and name.endswith('.json')):
+            return None
+        value = name[len('metrics_'):-len('.json')]
+        return int(value) if value.isdigit() else None
+
+    def retire(self, pid: int):
+        """
+        把已退出进程的快照并入累计文件并删除（gunicorn主进程的child_exit中调用）
+
+        累计文件记录已并入的pid：先原子写入累计文件再删除快照，
+        collect 读到尚未删除的快照时按该记录跳过，不会重复计数。
+
+        Args:
+            pid: 已退出的工作进程pid
+        """
+        name = os.path.basename(self.path_for(pid))
+        snapshot = self._read(name)
+        if snapshot is None:
+            return
+
+        retired = self._read(self.RETIRED_FILE) or {}
+        merged = MetricsRegistry()
+        merged.merge(retired)
+        merged.merge(snapshot)
+        existing = {self._pid_of(item) for item in os.listdir(self.directory)}
+        absorbed = [item for item in retired.get('pids', []) if item in existing] + [pid]
+        try:
+            self._write(os.path.join(self.directory, self.RETIRED_FILE), dict(merged.snapshot(), pids=absorbed))
+            os.remove(os.path.join(self.directory, name))
+        except OSError as e:
+            logger.warning(f'合并已退出进程的指标快照失败: {pid} - {str(e)}')
+
+    def collect(self) -> MetricsRegistry:
+        """
+        合并所有进程的快照和已退出进程的累计值
+
+        Returns:
+            MetricsRegistry: 汇总后的注册表
+        """
+        # 先读进程快照再读累计文件：快照在两次读取之间被并入时按累计文件中的pid跳过
+        snapshots = {}
+        for name in os.listdir(self.directory):
+            pid = self._pid_of(name)
+            if pid is not None:
+                snapshot = self._read(name)
+                if snapshot is not None:
+                    snapshots[pid] = snapshot
+        retired = self._read(self.RETIRED_FILE) or {}
+
+        merged = MetricsRegistry()
+        merged.merge(retired)
+        absorbed = set(retired.get('pids', []))
+        for pid, snapshot in snapshots.items():
+            if pid not in absorbed:
+                merged.merge(snapshot)
+        return merged
+
+    def clear(self):
+        """
+        清空目录中的快照文件（服务启动时调用）
+        """
+        for name in os.listdir(self.directory):
+            if name.startswith('metrics_') or name.startswith('.metrics_'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels) -> str:
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if not float(bound).is_integer() else str(float(bound))
+
+def _render_histogram(lines: List[str], name: str, histogram: Histogram, **labels):
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{_labels(**labels, le=_format_bound(bound))}}} {cumulative}')
+    lines.append(f'{name}_bucket{{{_labels(**labels, le="+Inf")}}} {histogram.count}')
+    lines.append(f'{name}_sum{{{_labels(**labels)}}} {histogram.sum}')
+    lines.append(f'{name}_count{{{_labels(**labels)}}} {histogram.count}')
+
+def render_prometheus(registry: MetricsRegistry) -> str:
+    """
+    以Prometheus文本格式输出指标
+
+    Args:
+        registry: 指标注册表
+
+    Returns:
+        str: Prometheus文本格式内容
+    """
+    routes = sorted(registry.routes.items())
+    lines = [
+        '# HELP crm_http_requests_total HTTP请求总数',
+        '# TYPE crm_http_requests_total counter'
+    ]
+    for (method, route), metrics in routes:
+        for status, count in sorted(metrics.status.items()):
+            lines.append(f'crm_http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}')
+
+    lines += [
+        '# HELP crm_http_request_duration_seconds HTTP请求耗时',
+        '# TYPE crm_http_request_duration_seconds histogram'
+    ]
+    for (method, route), metrics in routes:
+        _render_histogram(lines, 'crm_http_request_duration_seconds', metrics.latency, method=method, route=route)
+
+    lines += [
+        '# HELP crm_http_response_size_bytes HTTP响应体大小',
+        '# TYPE crm_http_response_size_bytes histogram'
+    ]
+    for (method, route), metrics in routes:
+        _render_histogram(lines, 'crm_http_response_size_bytes', metrics.response_size, method=method, route=route)
+
+    lines += [
+        '# HELP crm_db_queries_per_request 每个请求的数据库查询次数',
+        '# TYPE crm_db_queries_per_request histogram'
+    ]
+    for (method, route), metrics in routes:
+        _render_histogram(lines, 'crm_db_queries_per_request', metrics.db_queries, method=method, route=route)
+
+    lines += [
+        '# HELP crm_db_query_duration_seconds_total 请求内数据库查询累计耗时',
+        '# TYPE crm_db_query_duration_seconds_total counter'
+    ]
+    for (method, route), metrics in routes:
+        lines.append(f'crm_db_query_duration_seconds_total{{{_labels(method=method, route=route)}}} {metrics.db_time_seconds}')
+
+    current = None
+    for (name, labels), value in sorted(registry.counters.items()):
+        if name != current:
+            lines.append(f'# TYPE {name} counter')
+            current = name
+        label_text = _labels(**dict(labels))
+        lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+# 进程级注册表
+registry = MetricsRegistry()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('crm_metrics_query_start', []).append(time.perf_counter_ns())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('crm_metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter_ns() - starts.pop()
+    if has_request_context() and 'metrics_start_ns' in g:
+        g.metrics_db_queries = g.get('metrics_db_queries', 0) + 1
+        g.metrics_db_time_ns = g.get('metrics_db_time_ns', 0) + elapsed
+
+def record_db_query(duration_ns: int):
+    """
+    记录一次非SQLAlchemy执行的查询（如DatabaseManager）
+
+    Args:
+        duration_ns: 查询耗时（纳秒）
+    """
+    if has_request_context() and 'metrics_start_ns' in g:
+        g.metrics_db_queries = g.get('metrics_db_queries', 0) + 1
+        g.metrics_db_time_ns = g.get('metrics_db_time_ns', 0) + duration_ns
+
+def _install_db_listeners():
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+def get_store(app) -> FileMetricsStore:
+    """
+    获取应用的指标文件存储
+    """
+    return app.extensions['crm_metrics']
+
+def parse_networks(text: str) -> List[Any]:
+    """
+    解析逗号分隔的网段列表（如 "127.0.0.1/32,10.0.0.0/8"）
+
+    Args:
+        text: 配置字符串
+
+    Returns:
+        List: ipaddress网段对象
+    """
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in (text or '').split(',') if item.strip()]
+
+def _metrics_access_allowed(networks) -> bool:
+    # 只认直接连接的地址；经代理转发的请求来源不可信，直接拒绝
+    if request.headers.get('X-Forwarded-For') is not None:
+        return False
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+def init_metrics(app):
+    """
+    注册请求指标采集和 /metrics 路由
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('METRICS_ENABLED', False):
+        return
+
+    directory = app.config.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'crm_metrics')
+    store = FileMetricsStore(directory, app.config.get('METRICS_FLUSH_INTERVAL', 5.0))
+    app.extensions['crm_metrics'] = store
+    _install_db_listeners()
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_start_ns = time.perf_counter_ns()
+        g.metrics_db_queries = 0
+        g.metrics_db_time_ns = 0
+
+    @app.after_request
+    def record_metrics(response):
+        start_ns = g.get('metrics_start_ns')
+        if start_ns is None:
+            return response
+
+        rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        try:
+            response_bytes = response.calculate_content_length()
+        except Exception:
+            response_bytes = None
+
+        registry.observe_request(
+            request.method,
+            rule,
+            response.status_code,
+            time.perf_counter_ns() - start_ns,
+            response_bytes,
+            g.get('metrics_db_queries', 0),
+            g.get('metrics_db_time_ns', 0)
+        )
+        store.flush(registry)
+        return response
+
+    endpoint = app.config.get('METRICS_ENDPOINT', '/metrics')
+    networks = parse_networks(app.config.get('METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128'))
+
+    @app.route(endpoint, endpoint='metrics')
+    def metrics():
+        """
+        Prometheus指标（仅允许内部网段直接访问）
+        """
+        if not _metrics_access_allowed(networks):
+            return ResponseHelper.error('禁止访问', code=403)
+        store.flush(registry, force=True)
+        return Response(render_prometheus(store.collect()), mimetype='text/plain; version=0.0.4')
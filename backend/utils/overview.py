@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 客户概览缓存
+
+客户概览（GET /customers/<id>/overview）由固定的几条按 customer_id 索引的查询组成，
+结果按客户缓存在进程内（LRU，CUSTOMER_OVERVIEW_CACHE_SIZE 条，0表示不缓存）：
+- 每条缓存带有生成时的指纹（客户行、销售员行及报价/合同/订单表中该客户未删除单据的
+  MAX(updated_at)、COUNT(*)），命中前用一条查询校验，其他进程的写入和批量UPDATE
+  （如报价过期清理）都会使指纹变化
+- 本进程内客户、报价、合同、订单的写入在提交后立即清除对应客户的缓存
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .metrics import registry
+
+class CustomerOverviewCache:
+    """
+    进程内客户概览缓存
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        """
+        Args:
+            max_entries: 最多缓存的客户数
+        """
+        self.max_entries = max_entries
+        # 客户ID -> (指纹, {最近记录条数: 概览})
+        self._entries: 'OrderedDict[int, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, customer_id: int, fingerprint, limit: int) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存（指纹不一致时视为未命中）
+
+        Args:
+            customer_id: 客户ID
+            fingerprint: 当前指纹
+            limit: 最近记录条数
+
+        Returns:
+            Optional[Dict[str, Any]]: 概览
+        """
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is not None and entry[0] == fingerprint and limit in entry[1]:
+                self._entries.move_to_end(customer_id)
+                registry.inc('crm_customer_overview_cache_total', result='hit')
+                return entry[1][limit]
+        registry.inc('crm_customer_overview_cache_total', result='miss' if entry is None else 'stale')
+        return None
+
+    def put(self, customer_id: int, fingerprint, limit: int, overview: Dict[str, Any]):
+        """
+        写入缓存
+
+        Args:
+            customer_id: 客户ID
+            fingerprint: 生成概览前读取的指纹
+            limit: 最近记录条数
+            overview: 概览
+        """
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None or entry[0] != fingerprint:
+                entry = (fingerprint, {})
+                self._entries[customer_id] = entry
+            entry[1][limit] = overview
+            self._entries.move_to_end(customer_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, customer_ids):
+        """
+        清除指定客户的缓存
+
+        Args:
+            customer_ids: 客户ID集合
+        """
+        with self._lock:
+            for customer_id in customer_ids:
+                self._entries.pop(customer_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_cache: Optional[CustomerOverviewCache] = None
+
+def get_overview_cache() -> Optional[CustomerOverviewCache]:
+    """
+    获取当前进程的客户概览缓存（未开启时为None）
+    """
+    return _cache
+
+def _collect_overview_changes(mapper, connection, target):
+    from sqlalchemy.orm import object_session
+    from sqlalchemy.orm.attributes import get_history
+
+    session = object_session(target)
+    if _cache is None or session is None:
+        return
+    if mapper.class_.__tablename__ == 'customers':
+        customer_ids = {target.id}
+    else:
+        # 单据转移到其他客户时，原客户的概览同样失效
+        customer_ids = {target.customer_id, *get_history(target, 'customer_id').deleted}
+    session.info.setdefault('crm_overview_changes', set()).update(
+        customer_id for customer_id in customer_ids if customer_id is not None
+    )
+
+def _apply_overview_changes(session):
+    changes = session.info.pop('crm_overview_changes', None)
+    if changes and _cache is not None:
+        _cache.invalidate(changes)
+
+def _discard_overview_changes(session):
+    session.info.pop('crm_overview_changes', None)
+
+def init_customer_overview_cache(app):
+    """
+    根据配置启用客户概览缓存
+
+    Args:
+        app: Flask应用实例
+    """
+    global _cache
+
+    max_entries = int(app.config.get('CUSTOMER_OVERVIEW_CACHE_SIZE', 1000))
+    if max_entries <= 0:
+        _cache = None
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from models import Customer, Quote, Contract, Order
+
+    _cache = CustomerOverviewCache(max_entries)
+
+    if not event.contains(Session, 'after_commit', _apply_overview_changes):
+        for model in (Customer, Quote, Contract, Order):
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(model, name, _collect_overview_changes)
+        event.listen(Session, 'after_commit', _apply_overview_changes)
+        event.listen(Session, 'after_rollback', _discard_overview_changes)
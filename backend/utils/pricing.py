@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 报价计价引擎
+
+按 Quote.calculate_totals 的规则批量计算报价金额，用于折扣/税率的模拟：
+    明细总价 = 数量 × 单价                  小计 = Σ明细总价
+    折扣金额 = 小计 × 折扣率%               税额 = (小计 - 折扣金额) × 税率%
+    总金额   = 小计 - 折扣金额 + 税额
+calculate_totals 中的Decimal运算没有舍入，各金额写入DECIMAL(15,2)列时分别四舍五入到分
+（ROUND_HALF_UP），price_decimal 是与之相同的逐条参考实现。
+
+price_quotes 把明细读成整数数组（数量、单价、折扣率、税率均为百分之一单位），
+每个金额都表示为"整数分子 / 10的幂"，只在最后做一次整数四舍五入，
+一次向量化计算得到 报价数 × 方案数 的全部结果，与Decimal结果逐分相同。
+依赖numpy（可选依赖，只在模拟接口中导入）。
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .helpers import import_optional
+
+CENT = Decimal('0.01')
+
+# 金额字段（与报价表的列名一致）
+AMOUNT_FIELDS = ('subtotal', 'discount_amount', 'amount_before_tax', 'tax_amount', 'total_amount')
+
+# 单条明细总价的上限（分），DECIMAL(15,2)
+MAX_LINE_CENTS = 10 ** 15
+
+def to_hundredths(value, name: str = '数值', minimum: Decimal = Decimal('0'),
+                  maximum: Optional[Decimal] = None) -> int:
+    """
+    两位小数的数值转换为百分之一单位的整数（金额为分、数量和百分比为0.01）
+
+    Args:
+        value: 数值（字符串、数字或Decimal）
+        name: 名称，用于错误提示
+        minimum: 最小值
+        maximum: 最大值
+
+    Returns:
+        int: 整数值
+
+    Raises:
+        ValueError: 不是数字、超过两位小数或超出范围
+    """
+    try:
+        number = Decimal(str(value))
+    except Exception:
+        raise ValueError(f'{name}必须是数字')
+    if not number.is_finite() or number != number.quantize(CENT):
+        raise ValueError(f'{name}最多两位小数')
+    if number < minimum or (maximum is not None and number > maximum):
+        raise ValueError(f'{name}超出范围')
+    return int(number * 100)
+
+def from_cents(cents: int) -> Decimal:
+    """
+    整数分转换为两位小数的Decimal
+    """
+    return Decimal(int(cents)).scaleb(-2)
+
+def price_decimal(items: Iterable[Tuple[Decimal, Decimal]], discount_rate: Decimal,
+                  tax_rate: Decimal) -> Dict[str, Decimal]:
+    """
+    逐条计算报价金额（参考实现，与 calculate_totals 后写入数据库的结果相同）
+
+    Args:
+        items: (数量, 单价) 列表
+        discount_rate: 折扣率（%）
+        tax_rate: 税率（%）
+
+    Returns:
+        Dict[str, Decimal]: 各金额（两位小数）
+    """
+    subtotal = sum(
+        (Decimal(quantity) * Decimal(unit_price)).quantize(CENT, ROUND_HALF_UP)
+        for quantity, unit_price in items
+    ) or Decimal('0')
+    discount_rate = Decimal(discount_rate)
+    tax_rate = Decimal(tax_rate)
+    discount_amount = subtotal * (discount_rate / 100) if discount_rate > 0 else Decimal('0')
+    amount_before_tax = subtotal - discount_amount
+    tax_amount = amount_before_tax * (tax_rate / 100) if tax_rate > 0 else Decimal('0')
+    values = {
+        'subtotal': subtotal,
+        'discount_amount': discount_amount,
+        'amount_before_tax': amount_before_tax,
+        'tax_amount': tax_amount,
+        'total_amount': amount_before_tax + tax_amount
+    }
+    return {name: value.quantize(CENT, ROUND_HALF_UP) for name, value in values.items()}
+
+def _round_half_up(np, numerator, digits: int):
+    # numerator / 10**digits 四舍五入（远离零）到整数
+    divisor = 10 ** digits
+    magnitude = (np.abs(numerator) + divisor // 2) // divisor
+    return np.where(numerator < 0, -magnitude, magnitude)
+
+def _scaled_round(np, values, factor, digits: int):
+    # values × factor / 10**digits 四舍五入到整数；values拆成高低两部分，避免乘积超出int64
+    divisor = 10 ** digits
+    magnitude = np.abs(values)
+    high, low = magnitude // divisor, magnitude % divisor
+    result = high * factor + _round_half_up(np, low * factor, digits)
+    return np.where(values < 0, -result, result)
+
+def price_quotes(quote_index: Sequence[int], quantities: Sequence[int], unit_prices: Sequence[int],
+                 quote_count: int, discount_rates: Sequence, tax_rates: Sequence,
+                 quote_tax_rates: Optional[Sequence[int]] = None) -> Dict[str, object]:
+    """
+    向量化计算多张报价在多个折扣/税率方案下的金额
+
+    Args:
+        quote_index: 每条明细所属报价的序号（0 ~ quote_count-1）
+        quantities: 数量（0.01单位的整数）
+        unit_prices: 单价（分）
+        quote_count: 报价数（没有明细的报价小计为0）
+        discount_rates: 各方案的折扣率（0.01%单位的整数）；形状为 (报价数, 1) 时为每张报价各自的折扣率
+        tax_rates: 各方案的税率，形状与discount_rates相同；为None的方案使用quote_tax_rates
+        quote_tax_rates: 每张报价自己的税率
+
+    Returns:
+        Dict[str, numpy.ndarray]: 各金额（分），形状为 (报价数, 方案数)
+
+    Raises:
+        ValueError: 明细总价超出DECIMAL(15,2)
+    """
+    np = import_optional('numpy', '模拟报价折扣')
+
+    index = np.asarray(quote_index, dtype=np.int64)
+    quantity = np.asarray(quantities, dtype=np.int64)
+    price = np.asarray(unit_prices, dtype=np.int64)
+    if len(quantity) and np.max(np.abs(quantity.astype(np.float64) * price) / 100) >= MAX_LINE_CENTS:
+        raise ValueError('明细总价超出范围')
+
+    # 明细总价 = 数量(0.01) × 单价(分) / 100，四舍五入到分
+    lines = _round_half_up(np, quantity * price, 2)
+    subtotal = np.zeros(quote_count, dtype=np.int64)
+    np.add.at(subtotal, index, lines)
+
+    # 方案在第二维广播：折扣率、税率的分母均为 10**4
+    subtotal = subtotal[:, None]
+    discount = np.asarray(discount_rates, dtype=np.int64)
+    if discount.ndim == 1:
+        discount = discount[None, :]
+        own = np.array([rate is None for rate in tax_rates], dtype=bool)
+        tax = np.array([0 if rate is None else rate for rate in tax_rates], dtype=np.int64)[None, :]
+        if own.any():
+            tax = np.where(own[None, :], np.asarray(quote_tax_rates, dtype=np.int64)[:, None], tax)
+    else:
+        tax = np.asarray(tax_rates, dtype=np.int64)
+    keep = 10000 - discount
+
+    return {
+        'subtotal': np.broadcast_to(subtotal, np.broadcast_shapes(subtotal.shape, discount.shape, tax.shape)).copy(),
+        'discount_amount': _scaled_round(np, subtotal, discount, 4),
+        'amount_before_tax': _scaled_round(np, subtotal, keep, 4),
+        'tax_amount': _scaled_round(np, subtotal, keep * tax, 8),
+        'total_amount': _scaled_round(np, subtotal, keep * (10000 + tax), 8)
+    }
+
+def scenario_grid(scenarios: Optional[List[Dict]] = None, discount_rates: Optional[List] = None,
+                  tax_rates: Optional[List] = None, default_tax_rate=None,
+                  max_scenarios: int = 1000) -> List[Tuple[int, Optional[int]]]:
+    """
+    解析模拟方案：逐个列出的方案，或折扣率 × 税率的组合
+
+    Args:
+        scenarios: [{'discount_rate': ..., 'tax_rate': ...}]，未给税率时用default_tax_rate
+        discount_rates: 折扣率列表（与tax_rates组合）
+        tax_rates: 税率列表，未给时用default_tax_rate
+        default_tax_rate: 默认税率（%），为None时方案的税率为None（按报价自己的税率计算）
+        max_scenarios: 方案数上限
+
+    Returns:
+        List[Tuple[int, Optional[int]]]: (折扣率, 税率)，0.01%单位的整数
+
+    Raises:
+        ValueError: 方案为空、超过上限或数值不合法
+    """
+    def discount_value(value):
+        return to_hundredths(value, '折扣率', maximum=Decimal('100'))
+
+    def tax_value(value):
+        if value is None:
+            value = default_tax_rate
+        return None if value is None else to_hundredths(value, '税率', maximum=Decimal('999.99'))
+
+    if scenarios:
+        if len(scenarios) > max_scenarios:
+            raise ValueError(f'方案数不能超过 {max_scenarios}')
+        result = []
+        for scenario in scenarios:
+            if not isinstance(scenario, dict):
+                raise ValueError('方案格式不正确')
+            result.append((discount_value(scenario.get('discount_rate', 0)), tax_value(scenario.get('tax_rate'))))
+        return result
+
+    if not discount_rates:
+        raise ValueError('请提供 scenarios 或 discount_rates')
+    taxes = tax_rates or [None]
+    if len(discount_rates) * len(taxes) > max_scenarios:
+        raise ValueError(f'方案数不能超过 {max_scenarios}')
+    return [(discount_value(discount), tax_value(tax)) for discount in discount_rates for tax in taxes]
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - SQL查询分析器
+
+可选开启（SQL_PROFILER_ENABLED），记录每个请求内执行的SQL：
+1. 语句指纹（去掉字面量和参数后的规范化SQL）、耗时和行数
+2. 同一指纹在一个请求中重复超过阈值时标记为N+1查询
+3. 超过阈值的慢查询写入 crm.db 日志
+4. 请求结束时输出汇总日志，调试模式下同时写入 X-SQL-Profile 响应头
+
+SQLAlchemy通过游标执行事件接入，DatabaseManager通过 track_query 接入。
+"""
+
+import re
+import time
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from flask import g, has_request_context, request
+
+from .logger import DatabaseLogger
+from .metrics import record_db_query
+
+logger = logging.getLogger('crm.db')
+
+# 全局开关，由init_profiler根据配置设置
+_settings = {
+    'enabled': False,
+    'slow_ms': 100.0,
+    'n_plus_one_threshold': 5,
+    'header': False
+}
+
+_COMMENT_RE = re.compile(r'(--[^\n]*|/\*.*?\*/)', re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_PLACEHOLDER_RE = re.compile(r'%\(\w+\)s|%s|:\w+|\?')
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.I)
+_VALUES_RE = re.compile(r'\bvalues\s*(\(\s*\?(?:\s*,\s*\?)*\s*\)\s*,?\s*)+', re.I)
+_SPACE_RE = re.compile(r'\s+')
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    计算SQL语句指纹
+
+    去掉注释、字符串和数字字面量、参数占位符，折叠IN列表和多行VALUES，
+    使只有参数不同的语句得到相同指纹。
+
+    Args:
+        statement: SQL语句
+
+    Returns:
+        str: 规范化后的SQL
+    """
+    sql = _COMMENT_RE.sub(' ', statement)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _VALUES_RE.sub('VALUES (...) ', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+class RequestProfile:
+    """
+    单个请求的SQL统计
+    """
+
+    def __init__(self):
+        self.queries: Dict[str, Dict[str, Any]] = {}
+        self.total_count = 0
+        self.total_ns = 0
+        self.slow: List[Dict[str, Any]] = []
+
+    def record(self, statement: str, duration_ns: int, rows: Optional[int], source: str):
+        """
+        记录一次查询
+
+        Args:
+            statement: SQL语句
+            duration_ns: 耗时（纳秒）
+            rows: 返回或影响的行数，未知时为None
+            source: 来源（sqlalchemy / dbmanager）
+        """
+        key = fingerprint(statement)
+        entry = self.queries.get(key)
+        if entry is None:
+            entry = self.queries[key] = {'count': 0, 'total_ns': 0, 'rows': 0, 'source': source}
+        entry['count'] += 1
+        entry['total_ns'] += duration_ns
+        if rows is not None and rows >= 0:
+            entry['rows'] += rows
+        self.total_count += 1
+        self.total_ns += duration_ns
+
+        if duration_ns / 1e6 >= _settings['slow_ms']:
+            self.slow.append({'fingerprint': key, 'ms': round(duration_ns / 1e6, 2), 'rows': rows})
+
+    def merge(self, other: 'RequestProfile'):
+        """
+        合并另一个统计（如并发查询任务中执行的SQL）
+
+        Args:
+            other: 另一个请求统计
+        """
+        for key, item in other.queries.items():
+            entry = self.queries.get(key)
+            if entry is None:
+                self.queries[key] = dict(item)
+                continue
+            entry['count'] += item['count']
+            entry['total_ns'] += item['total_ns']
+            entry['rows'] += item['rows']
+        self.total_count += other.total_count
+        self.total_ns += other.total_ns
+        self.slow.extend(other.slow)
+
+    def n_plus_one(self) -> List[Dict[str, Any]]:
+        """
+        获取疑似N+1的查询（同一指纹重复次数超过阈值）
+        """
+        threshold = _settings['n_plus_one_threshold']
+        return [
+            {'fingerprint': key, 'count': entry['count'], 'ms': round(entry['total_ns'] / 1e6, 2)}
+            for key, entry in self.queries.items()
+            if entry['count'] > threshold
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        请求汇总
+        """
+        return {
+            'queries': self.total_count,
+            'distinct': len(self.queries),
+            'time_ms': round(self.total_ns / 1e6, 2),
+            'slow': len(self.slow),
+            'n_plus_one': len(self.n_plus_one())
+        }
+
+def _current_profile() -> Optional[RequestProfile]:
+    if not _settings['enabled'] or not has_request_context():
+        return None
+    return g.get('sql_profile')
+
+def record_query(statement: str, duration_ns: int, rows: Optional[int] = None, params: Any = None,
+                 source: str = 'sqlalchemy'):
+    """
+    记录一次查询执行
+
+    Args:
+        statement: SQL语句
+        duration_ns: 耗时（纳秒）
+        rows: 行数
+        params: 查询参数（仅用于慢查询日志）
+        source: 来源
+    """
+    if not _settings['enabled']:
+        return
+
+    duration_ms = duration_ns / 1e6
+    DatabaseLogger.log_query(statement, params, duration_ns / 1e9)
+    if duration_ms >= _settings['slow_ms']:
+        logger.warning(f'慢查询 {duration_ms:.1f}ms rows={rows}: {fingerprint(statement)}')
+
+    profile = _current_profile()
+    if profile is not None:
+        profile.record(statement, duration_ns, rows, source)
+
+@contextmanager
+def track_query(statement: str, params: Any = None, source: str = 'dbmanager'):
+    """
+    记录非SQLAlchemy执行的查询（DatabaseManager）
+
+    Args:
+        statement: SQL语句
+        params: 查询参数
+        source: 来源
+
+    Yields:
+        dict: 调用方可写入 rows 字段
+    """
+    result = {'rows': None}
+    start = time.perf_counter_ns()
+    try:
+        yield result
+    finally:
+        duration_ns = time.perf_counter_ns() - start
+        record_db_query(duration_ns)
+        record_query(statement, duration_ns, result['rows'], params, source)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('crm_profiler_query_start', []).append(time.perf_counter_ns())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('crm_profiler_query_start')
+    if not starts:
+        return
+    duration_ns = time.perf_counter_ns() - starts.pop()
+    rows = getattr(cursor, 'rowcount', None)
+    record_query(statement, duration_ns, rows, parameters, 'sqlalchemy')
+
+def init_profiler(app):
+    """
+    根据配置开启SQL分析器
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('SQL_PROFILER_ENABLED', False):
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    _settings.update({
+        'enabled': True,
+        'slow_ms': float(app.config.get('SQL_PROFILER_SLOW_MS', 100)),
+        'n_plus_one_threshold': int(app.config.get('SQL_PROFILER_N_PLUS_ONE_THRESHOLD', 5)),
+        'header': bool(app.config.get('SQL_PROFILER_HEADER', app.debug))
+    })
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_sql_profile():
+        g.sql_profile = RequestProfile()
+
+    @app.after_request
+    def finish_sql_profile(response):
+        profile = g.get('sql_profile')
+        if profile is None:
+            return response
+
+        summary = profile.summary()
+        for item in profile.n_plus_one():
+            logger.warning(
+                f'疑似N+1查询 {request.method} {request.path}: '
+                f"{item['count']}次 {item['ms']}ms - {item['fingerprint']}"
+            )
+
+        logger.info(
+            f"SQL汇总 {request.method} {request.path}: queries={summary['queries']} "
+            f"distinct={summary['distinct']} time_ms={summary['time_ms']} "
+            f"slow={summary['slow']} n_plus_one={summary['n_plus_one']}"
+        )
+
+        if _settings['header']:
+            response.headers['X-SQL-Profile'] = '; '.join(f'{key}={value}' for key, value in summary.items())
+        return response
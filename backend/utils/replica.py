@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 只读副本路由
+
+配置 SQLALCHEMY_BINDS['replica'] 后，每个请求开始时决定本请求的路由（g.db_route）：
+1. GET/HEAD请求的只读查询走副本（models.routing.RoutingSession）
+2. 写请求走主库；成功后在 X-Read-Primary-Until 响应头中返回读己之写窗口的截止时间，
+   客户端在之后的请求中带回该头，窗口内的GET请求仍走主库
+3. ReplicaMonitor 按间隔检查副本延迟，延迟超过 REPLICA_MAX_LAG_SECONDS、
+   复制中断或副本连接出错时切换到主库，下一次检查正常后恢复
+
+DatabaseManager 的查询同样通过 replica_allowed 决定是否使用副本。
+"""
+
+import time
+import logging
+import threading
+from typing import Optional
+
+from flask import current_app, g, has_app_context, has_request_context, request
+
+from .metrics import registry
+
+logger = logging.getLogger('crm.db')
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+
+# 不修改数据的请求方法
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# 读己之写窗口截止时间（服务器时间戳，秒）
+PRIMARY_UNTIL_HEADER = 'X-Read-Primary-Until'
+
+# MySQL复制状态：(语句, 延迟列)，8.0.22起使用REPLICA/SOURCE命名
+_REPLICATION_STATUS = (
+    ('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+    ('SHOW SLAVE STATUS', 'Seconds_Behind_Master')
+)
+
+class ReplicaMonitor:
+    """
+    只读副本状态
+
+    检查在请求中按需触发（距上次检查超过间隔时由一个线程执行，其他线程使用上次结果），
+    不依赖后台线程。
+    """
+
+    def __init__(self, engine, max_lag: float = 5.0, check_interval: float = 10.0,
+                 lag_query: Optional[str] = None):
+        """
+        Args:
+            engine: 副本引擎
+            max_lag: 允许的最大复制延迟（秒）
+            check_interval: 检查间隔（秒）
+            lag_query: 自定义延迟查询（返回秒数，如基于心跳表），默认读取复制状态
+        """
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_query = lag_query
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.reason: Optional[str] = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def measure_lag(self) -> Optional[float]:
+        """
+        查询副本复制延迟
+
+        Returns:
+            Optional[float]: 延迟秒数，复制中断时返回None
+        """
+        from sqlalchemy import text
+        from sqlalchemy.exc import DBAPIError
+
+        with self.engine.connect() as conn:
+            if self.lag_query:
+                value = conn.execute(text(self.lag_query)).scalar()
+                return None if value is None else float(value)
+            if conn.dialect.name != 'mysql':
+                conn.execute(text('SELECT 1'))
+                return 0.0
+            for statement, column in _REPLICATION_STATUS:
+                try:
+                    row = conn.execute(text(statement)).mappings().first()
+                except DBAPIError:
+                    # 旧版本MySQL不支持 SHOW REPLICA STATUS
+                    continue
+                if row is None:
+                    # 没有复制状态（副本地址指向主库或代理），视为无延迟
+                    return 0.0
+                value = row.get(column)
+                return None if value is None else float(value)
+        return 0.0
+
+    def check(self) -> bool:
+        """
+        立即检查副本状态
+
+        Returns:
+            bool: 副本是否可用
+        """
+        try:
+            lag = self.measure_lag()
+        except Exception as e:
+            self._update(False, None, 'unreachable', str(e))
+        else:
+            if lag is None:
+                self._update(False, None, 'stopped', '复制已中断')
+            elif lag > self.max_lag:
+                self._update(False, lag, 'lag', f'复制延迟 {lag:.1f}s 超过 {self.max_lag:.1f}s')
+            else:
+                self._update(True, lag, None, None)
+        return self.healthy
+
+    def available(self) -> bool:
+        """
+        副本是否可用（超过检查间隔时先检查）
+
+        Returns:
+            bool: 是否可用
+        """
+        if time.monotonic() - self.checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            try:
+                if time.monotonic() - self.checked_at >= self.check_interval:
+                    self.check()
+            finally:
+                self._lock.release()
+        return self.healthy
+
+    def mark_failed(self, error: Exception):
+        """
+        副本查询出错时切换到主库，下一个检查间隔后重新检查
+
+        Args:
+            error: 异常
+        """
+        self._update(False, None, 'error', str(error))
+
+    def _update(self, healthy: bool, lag: Optional[float], reason: Optional[str], detail: Optional[str]):
+        if healthy != self.healthy:
+            if healthy:
+                logger.info('只读副本已恢复，只读查询切回副本')
+            else:
+                logger.warning(f'只读副本不可用（{detail}），只读查询切换到主库')
+                registry.inc('crm_db_replica_failover_total', reason=reason)
+        self.healthy = healthy
+        self.lag = lag
+        self.reason = reason
+        self.checked_at = time.monotonic()
+
+def get_replica_monitor() -> Optional[ReplicaMonitor]:
+    """
+    获取当前应用的副本状态（未配置副本时返回None）
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('crm_replica')
+
+def replica_allowed() -> bool:
+    """
+    当前上下文中的只读查询能否使用副本
+
+    请求内按本请求的路由决定；请求外（命令行、后台任务）在副本可用时使用副本。
+
+    Returns:
+        bool: 能否使用副本
+    """
+    if has_request_context():
+        return g.get('db_route') == REPLICA
+    monitor = get_replica_monitor()
+    return monitor is None or monitor.available()
+
+def _route_request(monitor: ReplicaMonitor) -> str:
+    if request.method not in READ_METHODS:
+        return PRIMARY
+    try:
+        primary_until = float(request.headers.get(PRIMARY_UNTIL_HEADER) or 0)
+    except ValueError:
+        primary_until = 0
+    if primary_until > time.time():
+        return PRIMARY
+    return REPLICA if monitor.available() else PRIMARY
+
+def _stick_to_primary(session, flush_context):
+    # 请求内发生写入后，后续查询读主库
+    if has_request_context():
+        g.db_route = PRIMARY
+
+def init_replica_routing(app):
+    """
+    配置了只读副本时注册请求路由
+
+    Args:
+        app: Flask应用实例
+    """
+    from sqlalchemy import event
+    from sqlalchemy.exc import InterfaceError, OperationalError
+    from models import db
+    from models.routing import REPLICA_BIND_KEY, RoutingSession
+
+    if REPLICA_BIND_KEY not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+
+    with app.app_context():
+        engine = db.engines[REPLICA_BIND_KEY]
+    monitor = ReplicaMonitor(
+        engine,
+        max_lag=float(app.config.get('REPLICA_MAX_LAG_SECONDS', 5)),
+        check_interval=float(app.config.get('REPLICA_CHECK_INTERVAL', 10)),
+        lag_query=app.config.get('REPLICA_LAG_QUERY')
+    )
+    app.extensions['crm_replica'] = monitor
+    window = float(app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10))
+
+    @event.listens_for(engine, 'handle_error')
+    def replica_error(context):
+        if isinstance(context.sqlalchemy_exception, (OperationalError, InterfaceError)):
+            monitor.mark_failed(context.original_exception)
+
+    if not event.contains(RoutingSession, 'after_flush', _stick_to_primary):
+        event.listen(RoutingSession, 'after_flush', _stick_to_primary)
+
+    @app.before_request
+    def choose_db_route():
+        g.db_route = _route_request(monitor)
+
+    @app.after_request
+    def set_primary_window(response):
+        if request.method not in READ_METHODS and response.status_code < 400 and window > 0:
+            response.headers[PRIMARY_UNTIL_HEADER] = f'{time.time() + window:.3f}'
+        return response
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 进程内定时任务
+
+1. PeriodicTask：后台守护线程按固定间隔执行任务，可用文件锁保证同一主机上
+   只有一个工作进程执行（多进程部署时避免重复执行）
+2. FollowUpScheduler：用最小堆维护最近到期的N个客户跟进，
+   通过模型事件和 updated_at 增量查询刷新，到期时发出提醒而不重新扫描客户表
+3. 报价过期清理：定期把已过有效期的草稿/已发送报价分批置为expired
+4. 历史单据归档：定期把已结束的旧报价、订单分批移入归档表（models.archive）
+
+任务在 create_app 中注册，由服务入口在工作进程内启动（gunicorn的post_worker_init、
+Werkzeug启动前），测试和基准测试创建的应用不会启动后台线程。
+"""
+
+import os
+import heapq
+import logging
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger('crm.scheduler')
+
+class PeriodicTask:
+    """
+    周期任务
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None], exclusive: bool = False,
+                 lock_dir: Optional[str] = None):
+        """
+        Args:
+            name: 任务名
+            interval: 执行间隔（秒）
+            func: 任务函数
+            exclusive: 是否只在持有文件锁的一个进程中执行
+            lock_dir: 锁文件目录，默认系统临时目录
+        """
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.exclusive = exclusive
+        self.lock_path = os.path.join(lock_dir or tempfile.gettempdir(), f'crm_task_{name}.lock')
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """
+        启动后台线程（重复调用无副作用）
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'crm-task-{self.name}', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        停止后台线程
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _acquire_lock(self) -> bool:
+        if not self.exclusive or self._lock_file is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            # Windows开发环境只有单进程，直接执行
+            return True
+
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # 锁在进程退出前一直持有
+        self._lock_file = lock_file
+        return True
+
+    def run_once(self) -> bool:
+        """
+        执行一次任务
+
+        Returns:
+            bool: 是否实际执行（未取得锁时返回False）
+        """
+        if not self._acquire_lock():
+            return False
+        try:
+            self.func()
+        except Exception as e:
+            logger.error(f'定时任务 {self.name} 执行失败: {str(e)}')
+        return True
+
+    def _run(self):
+        self.run_once()
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+def register_task(app, task: PeriodicTask):
+    """
+    注册周期任务（不启动）
+
+    Args:
+        app: Flask应用实例
+        task: 周期任务
+    """
+    app.extensions.setdefault('crm_tasks', []).append(task)
+
+def start_background_tasks(app):
+    """
+    启动已注册的周期任务（在工作进程中调用）
+
+    Args:
+        app: Flask应用实例
+    """
+    for task in app.extensions.get('crm_tasks', []):
+        task.start()
+        logger.info(f'定时任务 {task.name} 已启动，间隔 {task.interval}s')
+
+def stop_background_tasks(app):
+    """
+    停止已注册的周期任务
+
+    Args:
+        app: Flask应用实例
+    """
+    for task in app.extensions.get('crm_tasks', []):
+        task.stop()
+
+class FollowUpScheduler:
+    """
+    客户跟进提醒调度器
+
+    堆中保存 (跟进日期, 客户ID, 版本)，entries保存每个客户当前有效的版本，
+    跟进日期变化时压入新版本，旧版本在出堆时丢弃（惰性删除）。
+    堆只覆盖 horizon 之前的跟进，低于容量一半时按索引范围重新装载。
+    """
+
+    def __init__(self, capacity: int = 500, on_reminder: Optional[Callable[[Dict], None]] = None):
+        self.capacity = capacity
+        self.on_reminder = on_reminder or self._log_reminder
+        self.heap: List[tuple] = []
+        self.entries: Dict[int, tuple] = {}
+        self.horizon: Optional[date] = None
+        self.loaded = False
+        self.watermark: Optional[tuple] = None
+        self.reminded: Dict[int, date] = {}
+        self._version = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _log_reminder(reminder: Dict):
+        logger.info(
+            f"跟进提醒: 客户 {reminder['customer_id']} 销售员 {reminder['sales_user_id']} "
+            f"跟进日期 {reminder['next_follow_date']}"
+        )
+
+    def _push(self, customer_id: int, sales_user_id: Optional[int], follow_date: date):
+        self._version += 1
+        self.entries[customer_id] = (follow_date, sales_user_id, self._version)
+        heapq.heappush(self.heap, (follow_date, customer_id, self._version))
+
+    def load(self, today: Optional[date] = None):
+        """
+        装载最近到期的跟进（走next_follow_date索引，最多capacity行）
+        """
+        from models import db, Customer
+
+        today = today or date.today()
+        if self.watermark is None:
+            # 水位取数据库中的最大updated_at，不用应用时钟：
+            # MySQL的ON UPDATE CURRENT_TIMESTAMP按会话时区写入，与utcnow()可能相差时区偏移
+            latest = db.session.query(db.func.max(Customer.updated_at)).scalar()
+            self.watermark = (latest or datetime(1970, 1, 1), 0)
+
+        query = Customer.query.with_entities(
+            Customer.id, Customer.sales_user_id, Customer.next_follow_date
+        ).filter_by(is_deleted=False)
+        rows = query.filter(
+            Customer.next_follow_date >= today
+        ).order_by(Customer.next_follow_date, Customer.id).limit(self.capacity).all()
+
+        horizon = None
+        if len(rows) >= self.capacity:
+            # 装满时最后一天可能还有未装入的客户，只保留之前的日期，之后的变更等下次装载
+            horizon = rows[-1].next_follow_date
+            rows = [row for row in rows if row.next_follow_date < horizon]
+            if not rows:
+                # 同一天的跟进超过容量时装入当天全部
+                rows = query.filter(Customer.next_follow_date == horizon).all()
+                horizon += timedelta(days=1)
+
+        with self._lock:
+            self.heap = []
+            self.entries = {}
+            self.horizon = horizon
+            self.reminded = {key: value for key, value in self.reminded.items() if value >= today}
+            for row in rows:
+                self._push(row.id, row.sales_user_id, row.next_follow_date)
+            self.loaded = True
+
+    def update(self, customer_id: int, sales_user_id: Optional[int], follow_date: Optional[date],
+               deleted: bool = False, today: Optional[date] = None):
+        """
+        客户跟进日期变化时增量更新
+
+        Args:
+            customer_id: 客户ID
+            sales_user_id: 销售员ID
+            follow_date: 新的跟进日期
+            deleted: 客户是否已删除
+            today: 当前日期
+        """
+        today = today or date.today()
+        with self._lock:
+            if not self.loaded:
+                return
+            self.entries.pop(customer_id, None)
+            if deleted or follow_date is None or follow_date < today:
+                return
+            if self.horizon is not None and follow_date >= self.horizon:
+                return
+            self._push(customer_id, sales_user_id, follow_date)
+
+    def refresh_changes(self, batch_size: int = 1000):
+        """
+        按updated_at增量读取其他进程修改过的客户
+        """
+        from sqlalchemy import and_, or_
+        from models import Customer
+
+        if self.watermark is None:
+            return
+        updated_at, last_id = self.watermark
+        # (updated_at, id) 键集分页，走customers.updated_at索引
+        rows = Customer.query.with_entities(
+            Customer.id, Customer.sales_user_id, Customer.next_follow_date,
+            Customer.is_deleted, Customer.updated_at
+        ).filter(
+            or_(
+                Customer.updated_at > updated_at,
+                and_(Customer.updated_at == updated_at, Customer.id > last_id)
+            )
+        ).order_by(Customer.updated_at, Customer.id).limit(batch_size).all()
+
+        for row in rows:
+            self.update(row.id, row.sales_user_id, row.next_follow_date, row.is_deleted)
+        if rows:
+            self.watermark = (rows[-1].updated_at, rows[-1].id)
+
+    def poll(self, today: Optional[date] = None) -> List[Dict]:
+        """
+        弹出已到期的跟进并发出提醒
+
+        Args:
+            today: 当前日期
+
+        Returns:
+            List[Dict]: 本次发出的提醒
+        """
+        today = today or date.today()
+        reminders = []
+        with self._lock:
+            while self.heap and self.heap[0][0] <= today:
+                follow_date, customer_id, version = heapq.heappop(self.heap)
+                entry = self.entries.get(customer_id)
+                if entry is None or entry[2] != version:
+                    continue
+                del self.entries[customer_id]
+                if self.reminded.get(customer_id) == follow_date:
+                    continue
+                self.reminded[customer_id] = follow_date
+                reminders.append({
+                    'customer_id': customer_id,
+                    'sales_user_id': entry[1],
+                    'next_follow_date': follow_date.isoformat()
+                })
+            need_reload = self.horizon is not None and len(self.entries) < self.capacity // 2
+
+        for reminder in reminders:
+            self.on_reminder(reminder)
+        if need_reload:
+            self.load(today)
+        return reminders
+
+    def tick(self):
+        """
+        周期任务入口：首次装载，之后增量刷新并发出到期提醒
+        """
+        if not self.loaded:
+            self.load()
+        else:
+            self.refresh_changes()
+        self.poll()
+
+_scheduler: Optional[FollowUpScheduler] = None
+
+def get_follow_up_scheduler() -> Optional[FollowUpScheduler]:
+    """
+    获取当前进程的跟进提醒调度器（未开启时为None）
+    """
+    return _scheduler
+
+def _collect_follow_up_changes(mapper, connection, target):
+    from sqlalchemy.orm import object_session
+    from sqlalchemy.orm.attributes import get_history
+
+    if _scheduler is None:
+        return
+    changed = any(
+        get_history(target, key).has_changes()
+        for key in ('next_follow_date', 'sales_user_id', 'is_deleted')
+    )
+    session = object_session(target)
+    if changed and session is not None:
+        session.info.setdefault('crm_follow_up_changes', []).append(
+            (target.id, target.sales_user_id, target.next_follow_date, bool(target.is_deleted))
+        )
+
+def _apply_follow_up_changes(session):
+    changes = session.info.pop('crm_follow_up_changes', None)
+    if changes and _scheduler is not None:
+        for change in changes:
+            _scheduler.update(*change)
+
+def _discard_follow_up_changes(session):
+    session.info.pop('crm_follow_up_changes', None)
+
+def init_follow_up_scheduler(app):
+    """
+    根据配置注册跟进提醒任务
+
+    Args:
+        app: Flask应用实例
+    """
+    global _scheduler
+
+    if not app.config.get('FOLLOW_UP_REMINDERS_ENABLED', False):
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from models import Customer
+
+    _scheduler = FollowUpScheduler(capacity=int(app.config.get('FOLLOW_UP_HEAP_SIZE', 500)))
+
+    # 本进程内的修改在提交后立即更新堆，其他进程的修改由refresh_changes读取
+    if not event.contains(Customer, 'after_update', _collect_follow_up_changes):
+        event.listen(Customer, 'after_insert', _collect_follow_up_changes)
+        event.listen(Customer, 'after_update', _collect_follow_up_changes)
+        event.listen(Session, 'after_commit', _apply_follow_up_changes)
+        event.listen(Session, 'after_rollback', _discard_follow_up_changes)
+
+    def tick():
+        with app.app_context():
+            _scheduler.tick()
+
+    register_task(app, PeriodicTask(
+        'follow_up_reminders',
+        float(app.config.get('FOLLOW_UP_POLL_INTERVAL', 60)),
+        tick,
+        exclusive=True,
+        lock_dir=app.config.get('TASK_LOCK_DIR')
+    ))
+
+def init_quote_expiry_sweeper(app):
+    """
+    根据配置注册报价过期清理任务
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('QUOTE_EXPIRY_SWEEP_ENABLED', True):
+        return
+
+    chunk_size = int(app.config.get('QUOTE_EXPIRY_SWEEP_CHUNK_SIZE', 500))
+
+    def sweep():
+        from models import Quote
+
+        with app.app_context():
+            expired = Quote.expire_overdue(chunk_size=chunk_size)
+            if expired:
+                logger.info(f'报价过期清理: {expired} 条报价已置为过期')
+
+    register_task(app, PeriodicTask(
+        'quote_expiry_sweeper',
+        float(app.config.get('QUOTE_EXPIRY_SWEEP_INTERVAL', 300)),
+        sweep,
+        exclusive=True,
+        lock_dir=app.config.get('TASK_LOCK_DIR')
+    ))
+
+def archive_cutoff(days: int, today: Optional[date] = None) -> date:
+    """
+    归档期限：单据日期早于该日期时可以归档
+
+    Args:
+        days: 保留在原表中的天数
+        today: 当前日期
+
+    Returns:
+        date: 截止日期
+    """
+    return (today or date.today()) - timedelta(days=days)
+
+def init_document_archiver(app):
+    """
+    根据配置注册历史单据归档任务
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('ARCHIVE_ENABLED', False):
+        return
+
+    days = int(app.config.get('ARCHIVE_AFTER_DAYS', 730))
+    chunk_size = int(app.config.get('ARCHIVE_CHUNK_SIZE', 500))
+    # 每次执行最多的批数，避免一次归档长时间占用数据库；未完成的部分下次继续
+    max_chunks = int(app.config.get('ARCHIVE_MAX_CHUNKS', 20)) or None
+
+    def archive():
+        from models import db
+        from models.archive import DOCUMENT_ARCHIVES
+
+        with app.app_context():
+            before = archive_cutoff(days)
+            for name, archive in DOCUMENT_ARCHIVES.items():
+                moved = archive.run(db.engine, before, chunk_size=chunk_size, max_chunks=max_chunks)
+                if moved['documents']:
+                    logger.info(f"历史单据归档: {name} {moved['documents']} 条，明细 {moved['items']} 条")
+
+    register_task(app, PeriodicTask(
+        'document_archiver',
+        float(app.config.get('ARCHIVE_INTERVAL', 3600)),
+        archive,
+        exclusive=True,
+        lock_dir=app.config.get('TASK_LOCK_DIR')
+    ))
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 并发限制与过载保护
+
+按路由类别限制每个工作进程内同时执行的请求数，避免一批导出或统计请求占满
+gunicorn线程和数据库连接，连带 /auth/refresh 这类轻量接口也超时：
+- cheap：轻量读取（默认GET）      heavy：统计、仪表盘等重查询
+- write：写请求（默认非GET）       export：导出
+  视图可用 @route_class('heavy') 指定类别，'exempt' 表示不受限制
+
+每个类别有并发上限和排队上限：并发已满时最多排队 LOAD_SHEDDING_QUEUE_TIMEOUT 秒，
+队列已满或等待超时立即返回503和Retry-After。并发上限按AIMD自适应：
+类别繁忙且响应延迟超过近期最小延迟的 tolerance 倍（或出现5xx）时乘性降低，
+否则逐步恢复到配置的上限。
+
+可选的按用户令牌桶限流（RATE_LIMIT_ENABLED）：超出时返回429和Retry-After，
+令牌桶保存在进程内存或Redis（多进程/多主机共享）。
+被拒绝的请求计入 crm_requests_rejected_total{route_class, reason} 指标。
+"""
+
+import math
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, g, request
+
+from .helpers import ResponseHelper, get_client_ip, import_optional
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ROUTE_CLASSES = ('cheap', 'heavy', 'write', 'export')
+EXEMPT = 'exempt'
+
+# 不修改数据的请求方法
+READ_METHODS = ('GET', 'HEAD')
+
+# 不受限制的端点（健康检查、指标、静态文件和前端产物）
+EXEMPT_ENDPOINTS = {'static', 'health_check', 'health_live', 'health_ready', 'metrics', 'frontend_index', 'frontend_asset'}
+
+def route_class(name: str):
+    """
+    指定视图的路由类别
+
+    Args:
+        name: cheap / heavy / write / export / exempt
+
+    Returns:
+        装饰器函数
+    """
+    if name not in ROUTE_CLASSES and name != EXEMPT:
+        raise ValueError(f'未知的路由类别: {name}')
+
+    def decorator(f):
+        f.route_class = name
+        return f
+    return decorator
+
+def classify_request() -> Optional[str]:
+    """
+    当前请求的路由类别
+
+    Returns:
+        Optional[str]: 类别，不受限制时返回None
+    """
+    if request.method == 'OPTIONS' or request.endpoint is None or request.endpoint in EXEMPT_ENDPOINTS:
+        return None
+    view = current_app.view_functions.get(request.endpoint)
+    name = getattr(view, 'route_class', None)
+    if name is None:
+        name = 'cheap' if request.method in READ_METHODS else 'write'
+    return None if name == EXEMPT else name
+
+def parse_spec(text: str) -> Dict[str, Tuple[float, float]]:
+    """
+    解析 "heavy=2:1,write=4:4" 形式的配置
+
+    Args:
+        text: 配置字符串
+
+    Returns:
+        Dict[str, Tuple[float, float]]: 类别 -> (第一个值, 第二个值)
+    """
+    result = {}
+    for item in (text or '').split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        first, _, second = value.partition(':')
+        name = name.strip()
+        if name not in ROUTE_CLASSES:
+            raise ValueError(f'未知的路由类别: {name}')
+        result[name] = (float(first), float(second or 0))
+    return result
+
+class AdaptiveLimiter:
+    """
+    单个路由类别的并发限制
+    """
+
+    # 最小延迟的统计窗口（请求数），窗口结束后重新取最小值以适应数据量变化
+    WINDOW = 500
+
+    def __init__(self, name: str, max_limit: int, queue_size: int, queue_timeout: float,
+                 tolerance: float = 2.0, min_limit: int = 1):
+        """
+        Args:
+            name: 路由类别
+            max_limit: 并发上限
+            queue_size: 排队上限
+            queue_timeout: 排队等待时间（秒）
+            tolerance: 延迟超过近期最小延迟多少倍时视为过载
+            min_limit: 自适应调整的并发下限
+        """
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.limit = float(max_limit)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.active = 0
+        self.waiting = 0
+        self.min_latency: Optional[float] = None
+        self._window_min: Optional[float] = None
+        self._samples = 0
+        self._cond = threading.Condition()
+
+    def _has_capacity(self) -> bool:
+        return self.active < max(self.min_limit, int(self.limit))
+
+    def acquire(self) -> Optional[str]:
+        """
+        获取执行名额
+
+        Returns:
+            Optional[str]: 成功返回None，否则返回拒绝原因（queue_full / queue_timeout）
+        """
+        with self._cond:
+            if self._has_capacity():
+                self.active += 1
+                return None
+            if self.waiting >= self.queue_size:
+                return 'queue_full'
+            self.waiting += 1
+            try:
+                if not self._cond.wait_for(self._has_capacity, self.queue_timeout):
+                    return 'queue_timeout'
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            return None
+
+    def release(self, latency: float, failed: bool = False):
+        """
+        归还名额并根据本次延迟调整并发上限
+
+        Args:
+            latency: 请求耗时（秒）
+            failed: 是否为服务端错误
+        """
+        with self._cond:
+            busy = self.waiting > 0 or self.active >= int(self.limit)
+            self.active -= 1
+
+            self._samples += 1
+            self._window_min = latency if self._window_min is None else min(self._window_min, latency)
+            if self.min_latency is None or latency < self.min_latency:
+                self.min_latency = latency
+            if self._samples >= self.WINDOW:
+                self.min_latency = self._window_min
+                self._window_min = None
+                self._samples = 0
+
+            if busy and (failed or latency > self.min_latency * self.tolerance):
+                self.limit = max(float(self.min_limit), self.limit * 0.9)
+            elif self.limit < self.max_limit:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._cond.notify()
+
+class MemoryTokenBuckets:
+    """
+    进程内令牌桶
+    """
+
+    # 超过该数量时清理已回满的桶
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        # 桶标识 -> (令牌数, 更新时间, 回满时间)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """
+        取一个令牌
+
+        Args:
+            key: 桶标识
+            rate: 每秒补充的令牌数
+            burst: 桶容量
+
+        Returns:
+            float: 0表示允许，否则为需要等待的秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (burst, now, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(self._buckets) > self.MAX_KEYS:
+                for stale in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+                    del self._buckets[stale]
+        return wait
+
+# 原子地补充并扣减令牌：KEYS[1]=桶，ARGV=(每秒令牌数, 容量)，返回需要等待的秒数（0表示允许）
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local updated = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisTokenBuckets:
+    """
+    Redis令牌桶（所有工作进程共享），Redis不可用时放行
+    """
+
+    def __init__(self, url: str, prefix: str = 'crm:ratelimit:'):
+        redis = import_optional('redis', '使用Redis限流存储')
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.script = self.client.register_script(_REDIS_TAKE)
+        self.prefix = prefix
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        try:
+            return float(self.script(keys=[self.prefix + key], args=[rate, burst]))
+        except Exception as e:
+            logger.warning(f'限流存储不可用，放行请求: {str(e)}')
+            return 0.0
+
+def _rate_limit_key() -> str:
+    # 已登录用户按用户ID，其他按客户端IP
+    from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    return f'user:{identity}' if identity is not None else f'ip:{get_client_ip()}'
+
+def _reject(name: str, reason: str, code: int, retry_after: float, message: str):
+    registry.inc('crm_requests_rejected_total', route_class=name, reason=reason)
+    response, status = ResponseHelper.error(message, code=code)
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, status
+
+def init_load_shedding(app):
+    """
+    根据配置注册并发限制和限流
+
+    Args:
+        app: Flask应用实例
+    """
+    limiters: Dict[str, AdaptiveLimiter] = {}
+    if app.config.get('LOAD_SHEDDING_ENABLED', True):
+        queue_timeout = float(app.config.get('LOAD_SHEDDING_QUEUE_TIMEOUT', 1.0))
+        tolerance = float(app.config.get('LOAD_SHEDDING_LATENCY_TOLERANCE', 2.0))
+        for name, (limit, queue) in parse_spec(app.config.get('LOAD_SHEDDING_LIMITS', '')).items():
+            if limit > 0:
+                limiters[name] = AdaptiveLimiter(name, int(limit), int(queue), queue_timeout, tolerance)
+    retry_after = float(app.config.get('LOAD_SHEDDING_RETRY_AFTER', 1))
+
+    rates: Dict[str, Tuple[float, float]] = {}
+    buckets = None
+    if app.config.get('RATE_LIMIT_ENABLED', False):
+        rates = {name: spec for name, spec in parse_spec(app.config.get('RATE_LIMITS', '')).items() if spec[0] > 0}
+        storage = app.config.get('RATE_LIMIT_STORAGE_URL') or 'memory://'
+        buckets = MemoryTokenBuckets() if storage.startswith('memory://') else RedisTokenBuckets(storage)
+
+    if not limiters and not rates:
+        return
+    app.extensions['crm_load_shedding'] = limiters
+
+    @app.before_request
+    def shed_load():
+        name = classify_request()
+        if name is None:
+            return None
+
+        if name in rates:
+            rate, burst = rates[name]
+            wait = buckets.take(f'{name}:{_rate_limit_key()}', rate, max(burst, 1))
+            if wait > 0:
+                return _reject(name, 'rate_limit', 429, wait, '请求过于频繁，请稍后重试')
+
+        limiter = limiters.get(name)
+        if limiter is None:
+            return None
+        reason = limiter.acquire()
+        if reason is not None:
+            return _reject(name, reason, 503, retry_after, '服务繁忙，请稍后重试')
+        g.shedding_slot = (limiter, time.perf_counter())
+        return None
+
+    @app.after_request
+    def record_status(response):
+        if 'shedding_slot' in g:
+            g.shedding_failed = response.status_code >= 500
+        return response
+
+    @app.teardown_request
+    def release_slot(exc):
+        slot = g.pop('shedding_slot', None)
+        if slot is not None:
+            limiter, start = slot
+            limiter.release(time.perf_counter() - start, exc is not None or g.get('shedding_failed', False))
@@ -67,6 +67,26 @@ CREATE TABLE IF NOT EXISTS customers (
     INDEX idx_customer_type (customer_type)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='客户表';
 
+-- 标签表
+CREATE TABLE IF NOT EXISTS tags (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE COMMENT '标签名称',
+    customer_count INT DEFAULT 0 NOT NULL COMMENT '关联客户数（未删除）',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP NOT NULL COMMENT '更新时间',
+    is_deleted BOOLEAN DEFAULT FALSE NOT NULL COMMENT '是否删除'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='标签表';
+
+-- 客户标签关联表
+CREATE TABLE IF NOT EXISTS customer_tags (
+    customer_id INT NOT NULL COMMENT '客户ID',
+    tag_id INT NOT NULL COMMENT '标签ID',
+    PRIMARY KEY (customer_id, tag_id),
+    FOREIGN KEY (customer_id) REFERENCES customers(id),
+    FOREIGN KEY (tag_id) REFERENCES tags(id),
+    INDEX idx_customer_tags_tag (tag_id, customer_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='客户标签关联表';
+
 -- 报价表
 CREATE TABLE IF NOT EXISTS quotes (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -407,9 +427,47 @@ CREATE INDEX idx_quotes_created_at ON quotes(created_at);
 CREATE INDEX idx_contracts_created_at ON contracts(created_at);
 CREATE INDEX idx_orders_created_at ON orders(created_at);
 CREATE INDEX idx_customers_next_follow_date ON customers(next_follow_date);
+CREATE INDEX idx_customers_sales_follow ON customers(sales_user_id, next_follow_date);
+CREATE INDEX idx_customers_updated_at ON customers(updated_at);
+CREATE INDEX idx_users_updated_at ON users(updated_at);
+CREATE INDEX idx_quotes_updated_at ON quotes(updated_at);
+CREATE INDEX idx_contracts_updated_at ON contracts(updated_at);
+CREATE INDEX idx_orders_updated_at ON orders(updated_at);
+CREATE INDEX idx_tags_updated_at ON tags(updated_at);
 CREATE INDEX idx_quotes_valid_until ON quotes(valid_until);
+CREATE INDEX idx_quotes_status_valid_until ON quotes(status, valid_until);
 CREATE INDEX idx_contracts_end_date ON contracts(end_date);
 CREATE INDEX idx_orders_required_date ON orders(required_date);
 
+-- 列表接口的软删除过滤 + 筛选 + created_at排序（见 migrations/005_soft_delete_composite_indexes.sql）
+CREATE INDEX idx_customers_deleted_created ON customers(is_deleted, created_at);
+CREATE INDEX idx_customers_deleted_status_created ON customers(is_deleted, status, created_at);
+CREATE INDEX idx_customers_deleted_level_created ON customers(is_deleted, level, created_at);
+CREATE INDEX idx_customers_deleted_sales_created ON customers(is_deleted, sales_user_id, created_at);
+CREATE INDEX idx_quotes_deleted_created ON quotes(is_deleted, created_at);
+CREATE INDEX idx_quotes_deleted_status_created ON quotes(is_deleted, status, created_at);
+CREATE INDEX idx_quotes_deleted_customer_created ON quotes(is_deleted, customer_id, created_at);
+CREATE INDEX idx_quotes_deleted_sales_created ON quotes(is_deleted, sales_user_id, created_at);
+CREATE INDEX idx_contracts_deleted_created ON contracts(is_deleted, created_at);
+CREATE INDEX idx_contracts_deleted_status_created ON contracts(is_deleted, status, created_at);
+CREATE INDEX idx_contracts_deleted_customer_created ON contracts(is_deleted, customer_id, created_at);
+CREATE INDEX idx_contracts_deleted_sales_created ON contracts(is_deleted, sales_user_id, created_at);
+CREATE INDEX idx_orders_deleted_created ON orders(is_deleted, created_at);
+CREATE INDEX idx_orders_deleted_status_created ON orders(is_deleted, status, created_at);
+CREATE INDEX idx_orders_deleted_customer_created ON orders(is_deleted, customer_id, created_at);
+CREATE INDEX idx_orders_deleted_sales_created ON orders(is_deleted, sales_user_id, created_at);
+
+-- 历史单据归档表（见 migrations/006_document_archive.sql）
+CREATE TABLE IF NOT EXISTS quotes_archive LIKE quotes;
+ALTER TABLE quotes_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
+CREATE TABLE IF NOT EXISTS quote_items_archive LIKE quote_items;
+ALTER TABLE quote_items_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
+CREATE TABLE IF NOT EXISTS orders_archive LIKE orders;
+ALTER TABLE orders_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
+CREATE TABLE IF NOT EXISTS order_items_archive LIKE order_items;
+ALTER TABLE order_items_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
+CREATE INDEX idx_quotes_archive_archived_at ON quotes_archive(archived_at);
+CREATE INDEX idx_orders_archive_archived_at ON orders_archive(archived_at);
+
 -- 数据库初始化完成
 SELECT 'CRM数据库初始化完成！' as message;
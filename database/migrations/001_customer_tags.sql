@@ -0,0 +1,23 @@
+-- 客户标签规范化：标签字典表 + 客户标签关联表
+-- 执行后运行 `flask backfill-customer-tags` 从 customers.tags 分批回填
+USE crm_database;
+
+-- 标签表
+CREATE TABLE IF NOT EXISTS tags (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE COMMENT '标签名称',
+    customer_count INT DEFAULT 0 NOT NULL COMMENT '关联客户数（未删除）',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP NOT NULL COMMENT '更新时间',
+    is_deleted BOOLEAN DEFAULT FALSE NOT NULL COMMENT '是否删除'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='标签表';
+
+-- 客户标签关联表
+CREATE TABLE IF NOT EXISTS customer_tags (
+    customer_id INT NOT NULL COMMENT '客户ID',
+    tag_id INT NOT NULL COMMENT '标签ID',
+    PRIMARY KEY (customer_id, tag_id),
+    FOREIGN KEY (customer_id) REFERENCES customers(id),
+    FOREIGN KEY (tag_id) REFERENCES tags(id),
+    INDEX idx_customer_tags_tag (tag_id, customer_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='客户标签关联表';
@@ -0,0 +1,7 @@
+-- 客户跟进相关索引
+-- 1. 跟进列表：按销售员 + 跟进日期范围查询
+-- 2. 跟进提醒调度器：按 (updated_at, id) 增量读取变更的客户
+USE crm_database;
+
+CREATE INDEX idx_customers_sales_follow ON customers(sales_user_id, next_follow_date);
+CREATE INDEX idx_customers_updated_at ON customers(updated_at);
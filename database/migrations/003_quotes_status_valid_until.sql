@@ -0,0 +1,5 @@
+-- 报价过期清理：按 status IN ('draft', 'sent') AND valid_until < 今天 查找，
+-- 只扫描未结束的报价，不随已接受/已过期的历史报价增长
+USE crm_database;
+
+CREATE INDEX idx_quotes_status_valid_until ON quotes(status, valid_until);
@@ -0,0 +1,9 @@
+-- 条件请求指纹索引
+-- 列表接口的ETag按 MAX(updated_at)、COUNT(*) 计算，updated_at索引使MAX只需读取索引末端
+USE crm_database;
+
+CREATE INDEX idx_users_updated_at ON users(updated_at);
+CREATE INDEX idx_quotes_updated_at ON quotes(updated_at);
+CREATE INDEX idx_contracts_updated_at ON contracts(updated_at);
+CREATE INDEX idx_orders_updated_at ON orders(updated_at);
+CREATE INDEX idx_tags_updated_at ON tags(updated_at);
@@ -0,0 +1,27 @@
+-- 软删除过滤的复合索引
+-- 列表接口都带 is_deleted = FALSE，再按 status/level/客户/销售员筛选并按 created_at 倒序分页，
+-- 单列索引只能用上其中一个条件，其余条件回表过滤并对结果filesort。
+-- 复合索引 (is_deleted, 筛选列, created_at) 使筛选和排序都在索引内完成，
+-- InnoDB二级索引末尾隐含主键，ORDER BY created_at DESC, id DESC 同样不需要filesort。
+-- 用 python -m benchmarks explain 检查热点查询的执行计划。
+USE crm_database;
+
+CREATE INDEX idx_customers_deleted_created ON customers(is_deleted, created_at);
+CREATE INDEX idx_customers_deleted_status_created ON customers(is_deleted, status, created_at);
+CREATE INDEX idx_customers_deleted_level_created ON customers(is_deleted, level, created_at);
+CREATE INDEX idx_customers_deleted_sales_created ON customers(is_deleted, sales_user_id, created_at);
+
+CREATE INDEX idx_quotes_deleted_created ON quotes(is_deleted, created_at);
+CREATE INDEX idx_quotes_deleted_status_created ON quotes(is_deleted, status, created_at);
+CREATE INDEX idx_quotes_deleted_customer_created ON quotes(is_deleted, customer_id, created_at);
+CREATE INDEX idx_quotes_deleted_sales_created ON quotes(is_deleted, sales_user_id, created_at);
+
+CREATE INDEX idx_contracts_deleted_created ON contracts(is_deleted, created_at);
+CREATE INDEX idx_contracts_deleted_status_created ON contracts(is_deleted, status, created_at);
+CREATE INDEX idx_contracts_deleted_customer_created ON contracts(is_deleted, customer_id, created_at);
+CREATE INDEX idx_contracts_deleted_sales_created ON contracts(is_deleted, sales_user_id, created_at);
+
+CREATE INDEX idx_orders_deleted_created ON orders(is_deleted, created_at);
+CREATE INDEX idx_orders_deleted_status_created ON orders(is_deleted, status, created_at);
+CREATE INDEX idx_orders_deleted_customer_created ON orders(is_deleted, customer_id, created_at);
+CREATE INDEX idx_orders_deleted_sales_created ON orders(is_deleted, sales_user_id, created_at);
@@ -0,0 +1,18 @@
+-- 历史单据归档表
+-- 已结束且超过归档期限的报价、订单及明细由应用分批移入 *_archive 表（flask archive-documents 或 ARCHIVE_ENABLED 定时任务），
+-- 原表的索引和缓冲池只保留活跃数据；详情接口在原表中找不到时读取归档表。
+-- CREATE TABLE ... LIKE 复制列定义和索引（不复制外键，归档明细的单据同在归档表中），另加归档时间。
+-- 原表有外键和唯一单号，无法按 order_date/quote_date 做RANGE分区，冷热分离采用独立的归档表。
+USE crm_database;
+
+CREATE TABLE IF NOT EXISTS quotes_archive LIKE quotes;
+ALTER TABLE quotes_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
+
+CREATE TABLE IF NOT EXISTS quote_items_archive LIKE quote_items;
+ALTER TABLE quote_items_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
+
+CREATE TABLE IF NOT EXISTS orders_archive LIKE orders;
+ALTER TABLE orders_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
+
+CREATE TABLE IF NOT EXISTS order_items_archive LIKE order_items;
+ALTER TABLE order_items_archive ADD COLUMN archived_at DATETIME NOT NULL COMMENT '归档时间';
@@ -0,0 +1,7 @@
+-- 条件请求指纹索引（归档表）
+-- 列表接口的ETag按各表的 MAX(updated_at)、MAX(id) 计算（不再执行全表 COUNT(*)），
+-- 归档从原表删除的单据由归档表的 MAX(archived_at) 反映，archived_at索引使MAX只需读取索引末端
+USE crm_database;
+
+CREATE INDEX idx_quotes_archive_archived_at ON quotes_archive(archived_at);
+CREATE INDEX idx_orders_archive_archived_at ON orders_archive(archived_at);
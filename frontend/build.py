@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+CRM销售平台 - 前端构建脚本
+
+把 js/ 和 css/ 下的源文件压缩、合并为带内容哈希的文件，输出到 dist/：
+    dist/index.html                   引用打包产物的入口页（不可长期缓存）
+    dist/assets/core.<hash>.js        公共脚本（配置、工具、UI、API、认证、应用框架）
+    dist/assets/page-<name>.<hash>.js 页面模块，切换到对应页面时按需加载
+    dist/assets/app.<hash>.css        样式
+    dist/manifest.json                逻辑名 -> 产物路径
+    dist/stats.json                   首次加载/再次加载的传输量统计
+
+文件名随内容变化，nginx/Flask 可以对 assets/ 设置一年的 immutable 缓存，
+只有 index.html 需要每次重新验证。仅依赖标准库：
+    python frontend/build.py [--out DIR]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 公共脚本，按依赖顺序合并
+CORE_SCRIPTS = [
+    'js/config.js',
+    'js/utils.js',
+    'js/ui.js',
+    'js/api.js',
+    'js/auth.js',
+    'js/app.js'
+]
+
+# 页面模块（页面名与 App.pageModules 一致）
+PAGE_SCRIPTS = {
+    'dashboard': ['js/dashboard.js'],
+    'customers': ['js/customers.js']
+}
+
+STYLESHEETS = [
+    'css/style.css',
+    'css/components.css'
+]
+
+# 可能出现在正则字面量之前的字符/关键字（其余情况下 / 视为除号）
+_REGEX_PREFIX_CHARS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_PREFIX_WORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw'}
+_WORD = re.compile(r'[A-Za-z0-9_$]+')
+
+def minify_js(source: str) -> str:
+    """
+    保守地压缩JavaScript：去掉注释、行首缩进和空行，连续空白合并为一个
+
+    保留换行（避免自动分号插入的问题），字符串、模板字符串和正则字面量原样保留。
+
+    Args:
+        source: 源代码
+
+    Returns:
+        str: 压缩后的代码
+    """
+    out = []
+    i, n = 0, len(source)
+    last = ''  # 上一个非空白的代码片段，用于判断 / 是正则还是除号
+
+    def push_space(text):
+        if not out:
+            return
+        ch = '\n' if '\n' in text else ' '
+        if out[-1] in ('\n', ' '):
+            if ch == '\n':
+                out[-1] = '\n'
+        else:
+            out.append(ch)
+
+    while i < n:
+        c = source[i]
+        if c in ' \t\r\n':
+            j = i
+            while j < n and source[j] in ' \t\r\n':
+                j += 1
+            push_space(source[i:j])
+            i = j
+        elif source.startswith('//', i):
+            j = source.find('\n', i)
+            i = n if j < 0 else j
+        elif source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+            push_space(' ')
+        elif c in '\'"':
+            j = i + 1
+            while j < n and source[j] != c:
+                j += 2 if source[j] == '\\' else 1
+            out.append(source[i:j + 1])
+            last = c
+            i = j + 1
+        elif c == '`':
+            j = _skip_template(source, i)
+            out.append(source[i:j])
+            last = c
+            i = j
+        elif c == '/' and (not last or last[-1] in _REGEX_PREFIX_CHARS or last in _REGEX_PREFIX_WORDS):
+            j = i + 1
+            in_class = False
+            while j < n:
+                ch = source[j]
+                if ch == '\\':
+                    j += 2
+                    continue
+                if ch == '[':
+                    in_class = True
+                elif ch == ']':
+                    in_class = False
+                elif ch == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and source[j].isalpha():
+                j += 1
+            out.append(source[i:j])
+            last = 'regex'
+            i = j
+        else:
+            match = _WORD.match(source, i)
+            if match:
+                last = match.group()
+                out.append(last)
+                i = match.end()
+            else:
+                out.append(c)
+                last = c
+                i += 1
+
+    return ''.join(out).strip() + '\n'
+
+def _skip_template(source: str, start: int) -> int:
+    # 跳过模板字符串（支持 ${...} 中嵌套的字符串和模板），返回结束位置之后的下标
+    i, n = start + 1, len(source)
+    while i < n:
+        c = source[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif source.startswith('${', i):
+            i += 2
+            depth = 1
+            while i < n and depth:
+                ch = source[i]
+                if ch == '{':
+                    depth += 1
+                elif ch == '}':
+                    depth -= 1
+                elif ch == '`':
+                    i = _skip_template(source, i) - 1
+                elif ch in '\'"':
+                    j = i + 1
+                    while j < n and source[j] != ch:
+                        j += 2 if source[j] == '\\' else 1
+                    i = j
+                i += 1
+        else:
+            i += 1
+    return n
+
+def minify_css(source: str) -> str:
+    """
+    压缩CSS：去掉注释，合并空白，去掉 { } ; , 两侧和 : 之后的空白
+
+    Args:
+        source: 源代码
+
+    Returns:
+        str: 压缩后的代码
+    """
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', source)
+    for index in range(0, len(parts), 2):
+        text = re.sub(r'/\*.*?\*/', '', parts[index], flags=re.S)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\s*([{};,])\s*', r'\1', text)
+        text = re.sub(r':\s+', ':', text)
+        parts[index] = text.replace(';}', '}')
+    return ''.join(parts).strip() + '\n'
+
+def _read(path: str) -> str:
+    with open(os.path.join(ROOT, path), encoding='utf-8') as f:
+        return f.read()
+
+def _write_asset(out_dir: str, name: str, ext: str, content: str) -> str:
+    data = content.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    relative = f'assets/{name}.{digest}.{ext}'
+    with open(os.path.join(out_dir, relative), 'wb') as f:
+        f.write(data)
+    return relative
+
+def _sizes(paths, base: str) -> dict:
+    raw = gz = 0
+    for path in paths:
+        with open(os.path.join(base, path), 'rb') as f:
+            data = f.read()
+        raw += len(data)
+        gz += len(gzip.compress(data, 6))
+    return {'files': len(paths), 'bytes': raw, 'gzip_bytes': gz}
+
+def render_index(manifest: dict) -> str:
+    """
+    生成引用打包产物的index.html
+
+    Args:
+        manifest: 产物清单
+
+    Returns:
+        str: 页面内容
+    """
+    html = _read('index.html')
+    links = ''.join(f'\\s*<link rel="stylesheet" href="{re.escape(path)}">' for path in STYLESHEETS)
+    tags = (
+        f'\n    <link rel="stylesheet" href="{manifest["app.css"]}">'
+        f'\n    <link rel="preload" as="script" href="{manifest["core.js"]}">'
+    )
+    html, count = re.subn(
+        links,
+        lambda match: tags,
+        html,
+        count=1
+    )
+    if not count:
+        raise ValueError('index.html中未找到样式表引用')
+    assignment = 'window.ASSET_MANIFEST = ' + json.dumps(
+        {'core': manifest['core.js'], 'pages': manifest['pages']}, ensure_ascii=False
+    ) + ';'
+    html, count = re.subn(
+        r'window\.ASSET_MANIFEST = null;',
+        lambda match: assignment,
+        html,
+        count=1
+    )
+    if not count:
+        raise ValueError('index.html中未找到ASSET_MANIFEST占位')
+    return html
+
+def build(out_dir: str) -> dict:
+    """
+    执行构建
+
+    Args:
+        out_dir: 输出目录（会被清空）
+
+    Returns:
+        dict: 传输量统计
+    """
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(os.path.join(out_dir, 'assets'))
+
+    core = ';\n'.join(minify_js(_read(path)) for path in CORE_SCRIPTS)
+    manifest = {
+        'core.js': _write_asset(out_dir, 'core', 'js', core),
+        'app.css': _write_asset(out_dir, 'app', 'css', ''.join(minify_css(_read(path)) for path in STYLESHEETS)),
+        'pages': {
+            page: _write_asset(out_dir, f'page-{page}', 'js', ';\n'.join(minify_js(_read(path)) for path in paths))
+            for page, paths in PAGE_SCRIPTS.items()
+        }
+    }
+
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(render_index(manifest))
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # 首次加载：入口页 + 全部脚本样式；再次加载：源文件每次带时间戳重新下载，
+    # 打包后只有index.html需要重新获取，assets/ 命中浏览器缓存
+    all_pages = [path for paths in PAGE_SCRIPTS.values() for path in paths]
+    source_files = ['index.html'] + STYLESHEETS + CORE_SCRIPTS + all_pages
+    bundle_files = ['index.html', manifest['app.css'], manifest['core.js']] + list(manifest['pages'].values())
+    stats = {
+        'source': {
+            'first_load': _sizes(source_files, ROOT),
+            'repeat_load': _sizes(source_files, ROOT)
+        },
+        'bundle': {
+            'first_load': _sizes(bundle_files, out_dir),
+            'initial_load': _sizes(bundle_files[:3], out_dir),
+            'repeat_load': _sizes(['index.html'], out_dir)
+        },
+        'assets': {
+            name: _sizes([path], out_dir)
+            for name, path in [('core.js', manifest['core.js']), ('app.css', manifest['app.css'])]
+            + [(f'page-{page}.js', path) for page, path in manifest['pages'].items()]
+        }
+    }
+    with open(os.path.join(out_dir, 'stats.json'), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    return stats
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='构建前端打包产物')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'dist'), help='输出目录')
+    args = parser.parse_args(argv)
+
+    stats = build(args.out)
+    print(f'构建完成: {args.out}')
+    print(f'{"":<24}{"文件数":>6}{"字节":>10}{"gzip字节":>10}')
+    for group in ('source', 'bundle'):
+        for name, item in stats[group].items():
+            print(f'{group + "." + name:<24}{item["files"]:>6}{item["bytes"]:>10}{item["gzip_bytes"]:>10}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,26 @@ const API = {
     baseURL: CONFIG.API.BASE_URL,
     timeout: CONFIG.API.TIMEOUT,
     
+    // 条件请求缓存：GET地址 -> { etag, data }，再次请求时自动携带If-None-Match
+    validators: new Map(),
+    maxValidators: 200,
+    
+    // GET结果缓存（LRU）：TTL内直接返回；过期但仍在STALE_TTL内时先返回旧数据，后台重新请求
+    cache: new Map(),
+    cacheOptions: CONFIG.API.CACHE,
+    
+    // 进行中的GET请求：相同地址共享同一个Promise
+    inflight: new Map(),
+    
+    // 可被取代的请求：supersede键 -> { key, controller }
+    superseded: new Map(),
+    
+    // 修改数据后需要一并失效的汇总类资源
+    aggregateResources: ['/stats', '/dashboard'],
+    
+    // 写操作后服务器返回的读己之写截止时间，之后的请求原样带回，窗口内的读请求走主库
+    primaryUntil: null,
+    
     // 请求拦截器
     interceptors: {
         request: [],
@@ -44,13 +64,22 @@ const API = {
         if (token) {
             config.headers.Authorization = `Bearer ${token}`;
         }
+        if (this.primaryUntil) {
+            config.headers['X-Read-Primary-Until'] = this.primaryUntil;
+        }
         
         // 执行请求拦截器
         for (const interceptor of this.interceptors.request) {
             await interceptor(config);
         }
         
-        const fullUrl = url.startsWith('http') ? url : this.joinUrl(this.baseURL, url);
+        const fullUrl = this.resolveUrl(url);
+        
+        // 已有校验值的GET请求，让服务器在数据未变化时返回304
+        const cached = config.method === 'GET' ? this.validators.get(fullUrl) : null;
+        if (cached && !config.headers['If-None-Match']) {
+            config.headers['If-None-Match'] = cached.etag;
+        }
         
         try {
             Utils.log.debug('API请求:', config.method, fullUrl, config);
@@ -58,6 +87,14 @@ const API = {
             const controller = new AbortController();
             const timeoutId = setTimeout(() => controller.abort(), config.timeout);
             
+            // 调用方传入的signal（如被新的搜索取代）同样中止请求
+            if (config.signal) {
+                if (config.signal.aborted) {
+                    controller.abort();
+                }
+                config.signal.addEventListener('abort', () => controller.abort());
+            }
+            
             const response = await fetch(fullUrl, {
                 ...config,
                 signal: controller.signal
@@ -65,6 +102,25 @@ const API = {
             
             clearTimeout(timeoutId);
             
+            const primaryUntil = response.headers.get('X-Read-Primary-Until');
+            if (primaryUntil) {
+                this.primaryUntil = primaryUntil;
+            }
+            
+            // 数据未变化，直接复用上次的响应数据
+            if (response.status === 304 && cached) {
+                this.rememberValidator(fullUrl, cached.etag, cached.data);
+                Utils.log.debug('API响应未变化:', fullUrl);
+                return {
+                    data: cached.data,
+                    status: 200,
+                    statusText: 'Not Modified',
+                    headers: response.headers,
+                    config,
+                    notModified: true
+                };
+            }
+            
             let data;
             const contentType = response.headers.get('content-type');
             if (contentType && contentType.includes('application/json')) {
@@ -90,6 +146,17 @@ const API = {
                 throw new Error(data.message || response.statusText);
             }
             
+            if (config.method === 'GET') {
+                const etag = response.headers.get('ETag');
+                if (etag) {
+                    this.rememberValidator(fullUrl, etag, data);
+                } else {
+                    this.validators.delete(fullUrl);
+                }
+            } else {
+                this.invalidate(fullUrl);
+            }
+            
             Utils.log.debug('API响应:', result);
             return result;
             
@@ -97,6 +164,11 @@ const API = {
             Utils.log.error('API错误:', error);
             
             if (error.name === 'AbortError') {
+                if (config.signal && config.signal.aborted) {
+                    const cancelled = new Error('请求已取消');
+                    cancelled.cancelled = true;
+                    throw cancelled;
+                }
                 throw new Error('请求超时');
             }
             
@@ -109,14 +181,121 @@ const API = {
         }
     },
     
+    // 记录校验值（按最近使用顺序淘汰）
+    rememberValidator(url, etag, data) {
+        this.validators.delete(url);
+        this.validators.set(url, { etag, data });
+        if (this.validators.size > this.maxValidators) {
+            this.validators.delete(this.validators.keys().next().value);
+        }
+    },
+    
+    // 清空条件请求缓存
+    clearValidators() {
+        this.validators.clear();
+    },
+    
+    // 完整请求地址
+    resolveUrl(url) {
+        return url.startsWith('http') ? url : this.joinUrl(this.baseURL, url);
+    },
+    
+    // 地址所属的资源（基础地址之后的第一段路径，如 /customers）
+    resourceOf(fullUrl) {
+        const path = fullUrl.startsWith(this.baseURL) ? fullUrl.slice(this.baseURL.length) : fullUrl;
+        const match = path.match(/^\/?([^/?#]+)/);
+        return match ? `/${match[1]}` : '/';
+    },
+    
+    // 写入GET结果缓存（按最近使用顺序淘汰）
+    storeCache(key, result) {
+        this.cache.delete(key);
+        this.cache.set(key, { result, time: Date.now() });
+        while (this.cache.size > this.cacheOptions.MAX_ENTRIES) {
+            this.cache.delete(this.cache.keys().next().value);
+        }
+    },
+    
+    // 使缓存失效：不传参数时清空；传入地址时失效该地址所属资源及汇总类资源的全部缓存
+    invalidate(url) {
+        if (!url) {
+            this.cache.clear();
+            return;
+        }
+        const resources = [this.resourceOf(this.resolveUrl(url)), ...this.aggregateResources];
+        for (const key of Array.from(this.cache.keys())) {
+            if (resources.includes(this.resourceOf(key))) {
+                this.cache.delete(key);
+            }
+        }
+    },
+    
+    // 发起GET请求，相同地址的并发请求共享同一个Promise，成功后写入缓存
+    fetchShared(key, url, options) {
+        if (this.inflight.has(key)) {
+            return this.inflight.get(key);
+        }
+        
+        const promise = this.request(url, { ...options, method: 'GET' })
+            .then(result => {
+                this.storeCache(key, result);
+                return result;
+            })
+            .finally(() => {
+                if (this.inflight.get(key) === promise) {
+                    this.inflight.delete(key);
+                }
+            });
+        this.inflight.set(key, promise);
+        return promise;
+    },
+    
     // GET请求
+    // options.useCache: 是否使用缓存（默认true；false时仍与进行中的相同请求共享结果）
+    // options.supersede: 取代键，同一键的新请求会中止尚未完成的旧请求（用于搜索输入）
     async get(url, params = {}, options = {}) {
         const queryString = Utils.url.buildQuery(params);
-        const fullUrl = queryString ? `${url}?${queryString}` : url;
+        const requestUrl = queryString ? `${url}?${queryString}` : url;
+        const key = this.resolveUrl(requestUrl);
+        const { useCache = true, supersede, ...requestOptions } = options;
+        
+        // 先中止被取代的旧请求，避免旧结果晚到后覆盖新结果
+        if (supersede) {
+            const previous = this.superseded.get(supersede);
+            if (previous && previous.key !== key) {
+                previous.controller.abort();
+                this.superseded.delete(supersede);
+            }
+        }
         
-        return this.request(fullUrl, {
-            method: 'GET',
-            ...options
+        if (useCache) {
+            const entry = this.cache.get(key);
+            const age = entry ? Date.now() - entry.time : Infinity;
+            if (age < this.cacheOptions.TTL) {
+                this.cache.delete(key);
+                this.cache.set(key, entry);
+                return entry.result;
+            }
+            if (age < this.cacheOptions.STALE_TTL) {
+                // 先返回旧数据，后台重新验证（有ETag时通常只是一次304）
+                this.fetchShared(key, requestUrl, requestOptions).catch(error => {
+                    Utils.log.warn('后台刷新缓存失败:', error);
+                });
+                return entry.result;
+            }
+        }
+        
+        if (!supersede || this.inflight.has(key)) {
+            return this.fetchShared(key, requestUrl, requestOptions);
+        }
+        
+        const controller = new AbortController();
+        this.superseded.set(supersede, { key, controller });
+        return this.fetchShared(key, requestUrl, { ...requestOptions, signal: controller.signal }).finally(() => {
+            const current = this.superseded.get(supersede);
+            if (current && current.controller === controller) {
+                this.superseded.delete(supersede);
+            }
         });
     },
     
@@ -228,6 +407,8 @@ const API = {
                 Utils.storage.remove(CONFIG.AUTH.TOKEN_KEY);
                 Utils.storage.remove(CONFIG.AUTH.REFRESH_TOKEN_KEY);
                 Utils.storage.remove(CONFIG.AUTH.USER_KEY);
+                API.clearValidators();
+                API.invalidate();
             }
         },
         
@@ -269,13 +450,23 @@ const API = {
     // 客户管理API
     customers: {
         // 获取客户列表
-        async getList(params = {}) {
-            return API.get('/customers', params);
+        async getList(params = {}, options = {}) {
+            return API.get('/customers', params, options);
+        },
+        
+        // 按游标获取客户列表（无限滚动）
+        async getFeed(params = {}, options = {}) {
+            return API.get('/customers/feed', params, options);
         },
         
         // 获取客户详情
-        async getById(id) {
-            return API.get(`/customers/${id}`);
+        async getById(id, params = {}) {
+            return API.get(`/customers/${id}`, params);
+        },
+        
+        // 获取客户概览（客户、报价/合同/订单统计和最近记录、未收款）
+        async getOverview(id, params = {}, options = {}) {
+            return API.get(`/customers/${id}/overview`, params, options);
         },
         
         // 创建客户
@@ -293,6 +484,11 @@ const API = {
             return API.delete(`/customers/${id}`);
         },
         
+        // 批量删除客户（返回已删除、因存在关联数据无法删除和不存在的ID）
+        async bulkDelete(ids) {
+            return API.post('/customers/bulk-delete', { ids });
+        },
+        
         // 更新最后接触日期
         async updateLastContact(id) {
             return API.patch(`/customers/${id}/last-contact`);
@@ -356,9 +552,24 @@ const API = {
             return API.post(`/quotes/${id}/copy`);
         },
         
+        // 由已接受的报价生成合同和订单
+        async convert(id, data = {}) {
+            return API.post(`/quotes/${id}/convert`, data);
+        },
+        
         // 导出报价
         async export(id, format = 'pdf') {
             return API.get(`/quotes/${id}/export`, { format });
+        },
+        
+        // 模拟不同折扣率/税率下的报价金额（scenarios 或 discount_rates × tax_rates）
+        async simulate(id, scenarioData) {
+            return API.post(`/quotes/${id}/simulate`, scenarioData);
+        },
+        
+        // 模拟一组报价（quote_ids 或 status/customer_id/sales_user_id 筛选）的合计金额
+        async simulatePortfolio(portfolioData) {
+            return API.post('/quotes/simulate', portfolioData);
         }
     },
     
@@ -6,6 +6,15 @@ const App = {
     // 页面数据缓存
     pageCache: {},
     
+    // 页面模块（源码运行时的路径；打包后以 window.ASSET_MANIFEST.pages 为准）
+    pageModules: {
+        dashboard: 'js/dashboard.js',
+        customers: 'js/customers.js'
+    },
+    
+    // 已加载/加载中的页面模块
+    loadedModules: {},
+    
     // 初始化应用
     init() {
         Auth.init();
@@ -166,6 +175,8 @@ const App = {
         UI.showLoading(contentArea, '加载中...');
         
         try {
+            await this.loadPageModule(page);
+            
             switch (page) {
                 case 'dashboard':
                     await this.loadDashboard();
@@ -214,6 +225,30 @@ const App = {
         }
     },
     
+    // 按需加载页面模块（同一模块只请求一次）
+    loadPageModule(page) {
+        const manifest = window.ASSET_MANIFEST;
+        const src = manifest ? manifest.pages[page] : this.pageModules[page];
+        if (!src) {
+            return Promise.resolve();
+        }
+        
+        if (!this.loadedModules[page]) {
+            this.loadedModules[page] = new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = manifest ? src : `${src}?v=${new Date().getTime()}`;
+                script.onload = resolve;
+                script.onerror = () => {
+                    delete this.loadedModules[page];
+                    script.remove();
+                    reject(new Error(`页面模块加载失败: ${page}`));
+                };
+                document.head.appendChild(script);
+            });
+        }
+        return this.loadedModules[page];
+    },
+    
     // 加载仪表盘
     async loadDashboard() {
         const contentArea = document.getElementById('contentArea');
@@ -341,7 +376,7 @@ const App = {
     async getDashboardStats() {
         try {
             const response = await API.dashboard.getDashboard();
-            return response.data;
+            return response.data.data;
         } catch (error) {
             Utils.log.error('获取仪表盘统计数据失败:', error);
             return null;
@@ -481,11 +516,11 @@ const App = {
         switch (action) {
             case 'add-customer':
                 this.navigateTo('customers');
-                setTimeout(() => {
+                this.loadPageModule('customers').then(() => {
                     if (window.CustomerManager && window.CustomerManager.showAddModal) {
                         window.CustomerManager.showAddModal();
                     }
-                }, 100);
+                }).catch(error => Utils.log.error('加载客户模块失败', error));
                 break;
             case 'create-quote':
                 this.navigateTo('quotes');
@@ -540,8 +575,9 @@ const App = {
     
     // 刷新当前页面
     refreshCurrentPage() {
-        // 清除页面缓存
+        // 清除页面缓存和接口缓存
         delete this.pageCache[this.currentPage];
+        API.invalidate();
         
         // 重新加载页面
         this.loadPage(this.currentPage);
@@ -554,6 +590,7 @@ const App = {
         // 每5分钟更新一次仪表盘数据
         setInterval(() => {
             if (this.currentPage === 'dashboard') {
+                API.invalidate('/stats');
                 this.loadRecentActivities();
             }
         }, 5 * 60 * 1000);
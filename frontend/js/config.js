@@ -5,7 +5,12 @@ const CONFIG = {
         BASE_URL: 'http://localhost:5000/api/v1',
         TIMEOUT: 30000, // 30秒超时
         RETRY_COUNT: 3, // 重试次数
-        RETRY_DELAY: 1000 // 重试延迟(毫秒)
+        RETRY_DELAY: 1000, // 重试延迟(毫秒)
+        CACHE: {
+            MAX_ENTRIES: 100, // GET结果缓存条数
+            TTL: 30 * 1000, // 30秒内直接使用缓存
+            STALE_TTL: 5 * 60 * 1000 // 5分钟内先返回旧数据再后台刷新
+        }
     },
 
     // 认证配置
@@ -1,11 +1,22 @@
 // 客户管理模块
 const CustomerManager = {
-    // 当前数据
+    // 当前数据（与虚拟表格共用同一数组）
     customers: [],
-    currentPage: 1,
-    totalPages: 1,
     totalCount: 0,
     
+    // 游标分页：每批条数、下一批游标、是否还有数据
+    batchSize: 50,
+    cursor: null,
+    hasMore: false,
+    loadingMore: false,
+    
+    // 筛选条件变化时递增，丢弃旧条件下晚到的追加结果
+    feedVersion: 0,
+    
+    // 虚拟滚动表格
+    table: null,
+    rowHeight: 64,
+    
     // 搜索和筛选条件
     filters: {
         search: '',
@@ -22,13 +33,48 @@ const CustomerManager = {
         order: 'desc'
     },
     
+    // 列表只请求表格用到的字段
+    listFields: [
+        'name', 'tags', 'company', 'contact_person', 'phone', 'email',
+        'industry', 'customer_type', 'level', 'status', 'last_contact_date'
+    ],
+    
     // 初始化
     async init() {
         this.renderPage();
+        this.initTable();
         this.bindEvents();
         await this.loadCustomers();
     },
     
+    // 初始化虚拟滚动表格（只渲染可视区域内的行，滚动到末尾附近时加载下一批）
+    initTable() {
+        if (this.table) {
+            this.table.destroy();
+        }
+        
+        const tableBody = document.getElementById('customersTableBody');
+        this.table = UI.createVirtualTable('customersTableWrapper', tableBody, {
+            rowHeight: this.rowHeight,
+            columns: 10,
+            renderRow: customer => this.renderCustomerRow(customer),
+            onNearEnd: () => this.loadMoreCustomers()
+        });
+        
+        // 行节点会被复用，工具提示用事件委托绑定在表体上
+        tableBody.addEventListener('mouseover', (e) => {
+            const element = e.target.closest('[data-tooltip]');
+            if (element) {
+                UI.showTooltip(element);
+            }
+        });
+        tableBody.addEventListener('mouseout', (e) => {
+            if (e.target.closest('[data-tooltip]')) {
+                UI.hideTooltip();
+            }
+        });
+    },
+    
     // 渲染页面
     renderPage() {
         const contentArea = document.getElementById('contentArea');
@@ -99,15 +145,14 @@ const CustomerManager = {
                         </div>
                         <div class="table-controls">
                             <select id="pageSizeSelect" class="page-size-select">
-                                <option value="10">10条/页</option>
-                                <option value="20" selected>20条/页</option>
-                                <option value="50">50条/页</option>
-                                <option value="100">100条/页</option>
+                                ${[50, 100, 200].map(size =>
+                                    `<option value="${size}" ${this.batchSize === size ? 'selected' : ''}>${size}条/批</option>`
+                                ).join('')}
                             </select>
                         </div>
                     </div>
                     
-                    <div class="table-wrapper">
+                    <div class="table-wrapper" id="customersTableWrapper">
                         <table class="data-table" id="customersTable">
                             <thead>
                                 <tr>
@@ -143,10 +188,8 @@ const CustomerManager = {
                         </table>
                     </div>
                     
-                    <!-- 分页 -->
-                    <div class="pagination-container" id="customersPagination">
-                        <!-- 分页组件将通过JavaScript动态生成 -->
-                    </div>
+                    <!-- 加载状态（滚动到底部时自动加载下一批） -->
+                    <div class="pagination-container" id="customersFeedStatus"></div>
                 </div>
             </div>
             
@@ -304,7 +347,6 @@ const CustomerManager = {
         if (searchInput) {
             searchInput.addEventListener('input', Utils.debounce((e) => {
                 this.filters.search = e.target.value;
-                this.currentPage = 1;
                 this.loadCustomers();
             }, 300));
         }
@@ -317,7 +359,6 @@ const CustomerManager = {
                 filterElement.addEventListener('change', (e) => {
                     const filterKey = filterId.replace('Filter', '');
                     this.filters[filterKey] = e.target.value;
-                    this.currentPage = 1;
                     this.loadCustomers();
                 });
             }
@@ -327,8 +368,7 @@ const CustomerManager = {
         const pageSizeSelect = document.getElementById('pageSizeSelect');
         if (pageSizeSelect) {
             pageSizeSelect.addEventListener('change', (e) => {
-                CONFIG.PAGINATION.PAGE_SIZE = parseInt(e.target.value);
-                this.currentPage = 1;
+                this.batchSize = parseInt(e.target.value);
                 this.loadCustomers();
             });
         }
@@ -352,45 +392,63 @@ const CustomerManager = {
         }
     },
     
-    // 加载客户列表
+    // 查询参数（筛选条件 + 列表字段）
+    buildFeedParams() {
+        const params = {
+            limit: this.batchSize,
+            ...this.filters,
+            sort_field: this.sort.field,
+            sort_order: this.sort.order,
+            fields: this.listFields.join(',')
+        };
+        
+        // 移除空值
+        Object.keys(params).forEach(key => {
+            if (params[key] === '' || params[key] === null || params[key] === undefined) {
+                delete params[key];
+            }
+        });
+        return params;
+    },
+    
+    // 加载客户列表（从第一批开始）
     async loadCustomers() {
         const tableBody = document.getElementById('customersTableBody');
-        const customerCount = document.getElementById('customerCount');
+        const version = ++this.feedVersion;
+        this.loadingMore = false;
         
         try {
             UI.showLoading(tableBody, '加载客户数据...');
             
-            const params = {
-                page: this.currentPage,
-                page_size: CONFIG.PAGINATION.PAGE_SIZE,
-                ...this.filters,
-                sort_field: this.sort.field,
-                sort_order: this.sort.order
-            };
-            
-            // 移除空值
-            Object.keys(params).forEach(key => {
-                if (params[key] === '' || params[key] === null || params[key] === undefined) {
-                    delete params[key];
-                }
-            });
-            
-            const response = await API.customers.getList(params);
+            // 新的筛选/搜索会中止尚未返回的旧请求
+            const response = await API.customers.getFeed(
+                { ...this.buildFeedParams(), with_total: 1 },
+                { supersede: 'customers-list' }
+            );
+            if (version !== this.feedVersion) {
+                return;
+            }
             const data = response.data;
             
-            this.customers = data.customers || [];
+            this.cursor = data.next_cursor;
+            this.hasMore = !!data.has_more;
             this.totalCount = data.total || 0;
-            this.totalPages = Math.ceil(this.totalCount / CONFIG.PAGINATION.PAGE_SIZE);
-            
-            this.renderCustomersTable();
-            this.renderPagination();
             
-            // 更新计数
-            if (customerCount) {
-                customerCount.textContent = `共 ${this.totalCount} 个客户`;
+            if (!data.customers || data.customers.length === 0) {
+                this.table.setItems([], 0);
+                this.customers = this.table.items;
+                UI.showEmptyState(tableBody, '暂无客户数据', 'fas fa-users');
+            } else {
+                this.table.setItems(data.customers, this.totalCount);
+                this.customers = this.table.items;
             }
+            this.renderFeedStatus();
             
         } catch (error) {
+            // 被新请求取代，由新请求负责渲染
+            if (error.cancelled) {
+                return;
+            }
             Utils.log.error('加载客户列表失败:', error);
             UI.showNotification('error', '加载失败', error.message || '加载客户列表时发生错误');
             UI.showEmptyState(tableBody, '加载失败', 'fas fa-exclamation-triangle');
@@ -399,17 +457,68 @@ const CustomerManager = {
         }
     },
     
-    // 渲染客户表格
-    renderCustomersTable() {
-        const tableBody = document.getElementById('customersTableBody');
-        
-        if (this.customers.length === 0) {
-            UI.showEmptyState(tableBody, '暂无客户数据', 'fas fa-users');
+    // 加载下一批（滚动到已加载数据末尾附近时由虚拟表格触发）
+    async loadMoreCustomers() {
+        if (!this.hasMore || this.loadingMore) {
             return;
         }
         
-        tableBody.innerHTML = this.customers.map(customer => `
-            <tr>
+        const version = this.feedVersion;
+        this.loadingMore = true;
+        this.renderFeedStatus();
+        
+        try {
+            const response = await API.customers.getFeed({ ...this.buildFeedParams(), after: this.cursor });
+            if (version !== this.feedVersion) {
+                return;
+            }
+            const data = response.data;
+            
+            this.cursor = data.next_cursor;
+            this.hasMore = !!data.has_more;
+            this.table.appendItems(data.customers || [], this.hasMore ? this.totalCount : 0);
+            this.customers = this.table.items;
+            
+        } catch (error) {
+            if (version === this.feedVersion) {
+                Utils.log.error('加载更多客户失败:', error);
+                UI.showNotification('error', '加载失败', error.message || '加载更多客户时发生错误');
+            }
+        } finally {
+            if (version === this.feedVersion) {
+                this.loadingMore = false;
+                this.renderFeedStatus();
+            }
+        }
+    },
+    
+    // 更新计数和加载状态
+    renderFeedStatus() {
+        const customerCount = document.getElementById('customerCount');
+        if (customerCount) {
+            customerCount.textContent = `共 ${this.totalCount} 个客户，已加载 ${this.customers.length} 个`;
+        }
+        
+        const status = document.getElementById('customersFeedStatus');
+        if (status) {
+            status.textContent = this.loadingMore ? '加载中...' : (this.hasMore ? '向下滚动加载更多' : '');
+        }
+    },
+    
+    // 重新获取单个客户并只更新表格中的这一行
+    async refreshCustomerRow(customerId) {
+        try {
+            const response = await API.customers.getById(customerId, { fields: this.listFields.join(',') });
+            this.table.updateItem(response.data.customer);
+        } catch (error) {
+            Utils.log.error('刷新客户行失败:', error);
+            this.loadCustomers();
+        }
+    },
+    
+    // 渲染客户行（单元格HTML，行节点由虚拟表格复用）
+    renderCustomerRow(customer) {
+        return `
                 <td>
                     <div class="customer-name">
                         <strong>${Utils.string.escapeHtml(customer.name)}</strong>
@@ -445,11 +554,7 @@ const CustomerManager = {
                         </button>
                     </div>
                 </td>
-            </tr>
-        `).join('');
-        
-        // 重新初始化工具提示
-        UI.initTooltips();
+        `;
     },
     
     // 渲染标签
@@ -480,20 +585,6 @@ const CustomerManager = {
         return level || '-';
     },
     
-    // 渲染分页
-    renderPagination() {
-        const paginationContainer = document.getElementById('customersPagination');
-        UI.createPagination(
-            paginationContainer,
-            this.currentPage,
-            this.totalPages,
-            (page) => {
-                this.currentPage = page;
-                this.loadCustomers();
-            }
-        );
-    },
-    
     // 处理排序
     handleSort(field) {
         if (this.sort.field === field) {
@@ -503,7 +594,6 @@ const CustomerManager = {
             this.sort.order = 'asc';
         }
         
-        this.currentPage = 1;
         this.loadCustomers();
         
         // 更新排序图标
@@ -543,7 +633,6 @@ const CustomerManager = {
         document.getElementById('levelFilter').value = '';
         document.getElementById('industryFilter').value = '';
         
-        this.currentPage = 1;
         this.loadCustomers();
     },
     
@@ -605,11 +694,12 @@ const CustomerManager = {
             UI.showLoading('customerDetailContent', '加载客户详情...');
             UI.showModal('customerDetailModal');
             
-            const response = await API.customers.getById(customerId);
-            const customer = response.data.customer;
+            // 概览接口一次返回客户和相关单据
+            const response = await API.customers.getOverview(customerId);
+            const overview = response.data;
             
             // 渲染客户详情
-            this.renderCustomerDetail(customer);
+            this.renderCustomerDetail(overview.customer, overview);
             
         } catch (error) {
             Utils.log.error('获取客户详情失败:', error);
@@ -621,7 +711,7 @@ const CustomerManager = {
     },
     
     // 渲染客户详情
-    renderCustomerDetail(customer) {
+    renderCustomerDetail(customer, overview = null) {
         const content = document.getElementById('customerDetailContent');
         content.innerHTML = `
             <div class="customer-detail">
@@ -760,10 +850,7 @@ const CustomerManager = {
                         </div>
                         
                         <div class="tab-content" id="relatedData">
-                            <div class="coming-soon">
-                                <i class="fas fa-link"></i>
-                                <p>相关数据功能即将上线</p>
-                            </div>
+                            ${this.renderRelatedData(overview)}
                         </div>
                     </div>
                 </div>
@@ -771,6 +858,58 @@ const CustomerManager = {
         `;
     },
     
+    // 渲染客户相关数据（报价、合同、订单统计和最近记录）
+    renderRelatedData(overview) {
+        if (!overview) {
+            return '<div class="empty-state"><p>暂无相关数据</p></div>';
+        }
+        
+        const documents = [
+            { key: 'quotes', label: '报价', status: 'quote', number: 'quote_number', date: 'quote_date', amount: 'total_amount' },
+            { key: 'contracts', label: '合同', status: 'contract', number: 'contract_number', date: 'contract_date', amount: 'contract_amount' },
+            { key: 'orders', label: '订单', status: 'order', number: 'order_number', date: 'order_date', amount: 'total_amount' }
+        ];
+        const receivables = overview.receivables || {};
+        
+        return `
+            <div class="info-grid">
+                ${documents.map(doc => {
+                    const summary = (overview.summary || {})[doc.key] || {};
+                    return `
+                        <div class="info-item">
+                            <label>${doc.label}</label>
+                            <span>${summary.count || 0} 份 / ${Utils.number.formatCurrency(summary.amount || 0)}</span>
+                        </div>
+                    `;
+                }).join('')}
+                <div class="info-item">
+                    <label>未收款</label>
+                    <span>${Utils.number.formatCurrency(receivables.amount || 0)}（逾期 ${Utils.number.formatCurrency(receivables.overdue_amount || 0)}）</span>
+                </div>
+            </div>
+            
+            ${documents.map(doc => {
+                const items = (overview.recent || {})[doc.key] || [];
+                if (items.length === 0) return '';
+                return `
+                    <div class="info-section">
+                        <h4>最近${doc.label}</h4>
+                        <ul class="related-list">
+                            ${items.map(item => `
+                                <li>
+                                    <span>${Utils.string.escapeHtml(item[doc.number] || '')}</span>
+                                    ${UI.createStatusBadge(item.status, doc.status).outerHTML}
+                                    <span>${item[doc.date] ? Utils.date.format(item[doc.date], CONFIG.DATE_FORMAT.DATE_ONLY) : '-'}</span>
+                                    <span>${Utils.number.formatCurrency(item[doc.amount] || 0)}</span>
+                                </li>
+                            `).join('')}
+                        </ul>
+                    </div>
+                `;
+            }).join('')}
+        `;
+    },
+    
     // 保存客户
     async saveCustomer() {
         const form = document.getElementById('customerForm');
@@ -820,7 +959,11 @@ const CustomerManager = {
             }
             
             UI.closeModal('customerModal');
-            this.loadCustomers();
+            if (isEdit) {
+                this.refreshCustomerRow(parseInt(customerId));
+            } else {
+                this.loadCustomers();
+            }
             
         } catch (error) {
             Utils.log.error('保存客户失败:', error);
@@ -840,7 +983,9 @@ const CustomerManager = {
                 try {
                     await API.customers.delete(customerId);
                     UI.showNotification('success', '删除成功', '客户已删除');
-                    this.loadCustomers();
+                    this.table.removeItem(customerId);
+                    this.totalCount = Math.max(0, this.totalCount - 1);
+                    this.renderFeedStatus();
                 } catch (error) {
                     Utils.log.error('删除客户失败:', error);
                     UI.showNotification('error', '删除失败', error.message || '删除客户时发生错误');
@@ -854,7 +999,7 @@ const CustomerManager = {
         try {
             await API.customers.updateLastContact(customerId);
             UI.showNotification('success', '更新成功', '最后联系时间已更新');
-            this.loadCustomers();
+            this.refreshCustomerRow(customerId);
         } catch (error) {
             Utils.log.error('更新联系时间失败:', error);
             UI.showNotification('error', '更新失败', error.message || '更新联系时间时发生错误');
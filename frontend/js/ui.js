@@ -539,6 +539,161 @@ const UI = {
         });
     },
     
+    // 创建虚拟滚动表格：只渲染可视区域内的行，滚动时复用行节点，数据变化时只更新变化的行
+    // options: rowHeight 行高(px)，columns 列数，renderRow(item) 返回单元格HTML，
+    //          keyOf(item) 行标识，overscan 可视区域外多渲染的行数，onNearEnd() 接近已加载数据末尾时回调
+    createVirtualTable(scroller, tbody, options = {}) {
+        if (typeof scroller === 'string') {
+            scroller = document.getElementById(scroller);
+        }
+        if (typeof tbody === 'string') {
+            tbody = document.getElementById(tbody);
+        }
+        
+        const rowHeight = options.rowHeight || 56;
+        const overscan = options.overscan || 8;
+        const keyOf = options.keyOf || (item => item.id);
+        
+        // 上下占位行撑开滚动高度，总高度按total计算（含尚未加载的行）
+        const createSpacer = () => {
+            const spacer = document.createElement('tr');
+            spacer.className = 'virtual-spacer';
+            spacer.innerHTML = `<td colspan="${options.columns || 1}"></td>`;
+            return spacer;
+        };
+        const topSpacer = createSpacer();
+        const bottomSpacer = createSpacer();
+        
+        const table = {
+            items: [],
+            total: 0,
+            rendered: new Map(), // 数据下标 -> 行节点
+            frame: null,
+            
+            // 替换全部数据并回到顶部
+            setItems(items, total = items.length) {
+                this.items = items;
+                this.total = Math.max(total, items.length);
+                scroller.scrollTop = 0;
+                this.render();
+            },
+            
+            // 追加数据（无限滚动）
+            appendItems(items, total = this.total) {
+                this.items = this.items.concat(items);
+                this.total = Math.max(total, this.items.length);
+                this.render();
+            },
+            
+            // 更新单行数据，只重新渲染这一行
+            updateItem(item) {
+                const index = this.items.findIndex(existing => keyOf(existing) === keyOf(item));
+                if (index >= 0) {
+                    this.items[index] = item;
+                    this.render();
+                }
+            },
+            
+            // 删除单行数据
+            removeItem(key) {
+                const index = this.items.findIndex(existing => keyOf(existing) === key);
+                if (index >= 0) {
+                    this.items.splice(index, 1);
+                    this.total = Math.max(0, this.total - 1);
+                    // 之后的行下标整体前移，清除下标映射后按数据引用复用
+                    this.render(true);
+                }
+            },
+            
+            // 合并同一帧内的多次渲染请求
+            scheduleRender() {
+                if (this.frame === null) {
+                    this.frame = requestAnimationFrame(() => {
+                        this.frame = null;
+                        this.render();
+                    });
+                }
+            },
+            
+            render(reindex = false) {
+                // tbody被其他代码清空（如空状态）时重新挂载占位行
+                if (topSpacer.parentNode !== tbody) {
+                    tbody.innerHTML = '';
+                    tbody.appendChild(topSpacer);
+                    tbody.appendChild(bottomSpacer);
+                    this.rendered.clear();
+                }
+                
+                const count = this.items.length;
+                const viewport = scroller.clientHeight || rowHeight * 10;
+                const start = Math.min(count, Math.max(0, Math.floor(scroller.scrollTop / rowHeight) - overscan));
+                const end = Math.min(count, Math.ceil((scroller.scrollTop + viewport) / rowHeight) + overscan);
+                
+                topSpacer.firstChild.style.height = `${start * rowHeight}px`;
+                bottomSpacer.firstChild.style.height = `${Math.max(0, this.total - end) * rowHeight}px`;
+                
+                // 回收移出可视区域的行节点
+                const free = [];
+                if (reindex) {
+                    free.push(...this.rendered.values());
+                    this.rendered.clear();
+                } else {
+                    for (const [index, row] of this.rendered) {
+                        if (index < start || index >= end) {
+                            free.push(row);
+                            this.rendered.delete(index);
+                        }
+                    }
+                }
+                
+                let previous = topSpacer;
+                for (let index = start; index < end; index++) {
+                    const item = this.items[index];
+                    let row = this.rendered.get(index);
+                    if (!row) {
+                        // 优先复用仍显示同一条数据的节点，其次任意空闲节点
+                        const sameIndex = free.findIndex(candidate => candidate._item === item);
+                        row = sameIndex >= 0 ? free.splice(sameIndex, 1)[0] : free.pop();
+                        if (!row) {
+                            row = document.createElement('tr');
+                            row.className = 'virtual-row';
+                            row.style.height = `${rowHeight}px`;
+                        }
+                        this.rendered.set(index, row);
+                    }
+                    if (row._item !== item) {
+                        row.innerHTML = options.renderRow(item);
+                        row.dataset.key = keyOf(item);
+                        row._item = item;
+                    }
+                    if (previous.nextSibling !== row) {
+                        tbody.insertBefore(row, previous.nextSibling);
+                    }
+                    previous = row;
+                }
+                free.forEach(row => row.remove());
+                
+                if (options.onNearEnd && count < this.total && end >= count - overscan) {
+                    options.onNearEnd();
+                }
+            },
+            
+            // 解除滚动监听
+            destroy() {
+                scroller.removeEventListener('scroll', onScroll);
+                if (this.frame !== null) {
+                    cancelAnimationFrame(this.frame);
+                }
+            }
+        };
+        
+        const onScroll = () => table.scheduleRender();
+        scroller.classList.add('virtual-scroller');
+        scroller.addEventListener('scroll', onScroll, { passive: true });
+        
+        return table;
+    },
+    
     // 显示空状态
     showEmptyState(container, message = '暂无数据', icon = 'fas fa-inbox') {
         if (typeof container === 'string') {
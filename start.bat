@@ -48,7 +48,7 @@ echo [提示] 按 Ctrl+C 停止服务
 echo.
 
 cd backend
-python app.py
+python serve.py
 
 echo.
 echo [信息] 服务已停止